@@ -0,0 +1,185 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+
+# Lower number = served first
+PRIORITY_EMERGENCY = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+PRIORITY_NAMES = {PRIORITY_EMERGENCY: 'emergency', PRIORITY_NORMAL: 'normal', PRIORITY_LOW: 'low'}
+
+
+def priority_for(screening):
+    """Queue priority from a local symptom screen (symptom_rules.screen_symptoms)"""
+    severity = (screening or {}).get('severity')
+    if severity == 'Emergency':
+        return PRIORITY_EMERGENCY
+    if severity == 'Self-care':
+        return PRIORITY_LOW
+    # OPD matches and unmatched text: unknown is not assumed to be mild
+    return PRIORITY_NORMAL
+
+
+class Waiter:
+    def __init__(self, priority, enqueued_at):
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.state = 'waiting'  # -> 'admitted' | 'shed'
+
+
+class AdmissionController:
+    """
+    Caps concurrent outbound LLM calls. Callers beyond the cap wait in a
+    priority queue (suspected emergencies first, then arrival order). When
+    the queue is full a newcomer displaces the lowest-priority waiter, or is
+    shed itself if nothing queued ranks below it; waiters are also shed
+    once they have waited max_wait seconds.
+    """
+
+    def __init__(self, max_concurrency=8, max_queue=64, max_wait=5.0, clock=time.monotonic):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.active = 0
+        self.queue = []  # (priority, seq, waiter)
+        self.queued = 0
+        self.counter = itertools.count()
+        self.counters = {
+            'admitted': 0, 'queued': 0, 'shed_queue_full': 0, 'shed_timeout': 0,
+            'shed_displaced': 0, 'max_queue_depth': 0
+        }
+        self.shed_by_priority = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        # Per thread: one flag per call() on the stack, False once its slot is handed off
+        self.local = threading.local()
+
+    def acquire(self, priority=PRIORITY_NORMAL):
+        """Wait for a call slot. Returns False if the request was shed."""
+        with self.condition:
+            if self.active < self.max_concurrency and not self.queued:
+                self.active += 1
+                self.counters['admitted'] += 1
+                return True
+
+            if self.queued >= self.max_queue and not self.displace(priority):
+                self.shed(priority, 'shed_queue_full')
+                return False
+
+            waiter = Waiter(priority, self.clock())
+            heapq.heappush(self.queue, (priority, next(self.counter), waiter))
+            self.queued += 1
+            self.counters['queued'] += 1
+            self.counters['max_queue_depth'] = max(self.counters['max_queue_depth'], self.queued)
+
+            deadline = waiter.enqueued_at + self.max_wait
+            while waiter.state == 'waiting':
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    waiter.state = 'shed'
+                    self.queued -= 1  # left in the heap, skipped when popped
+                    self.shed(priority, 'shed_timeout')
+                    break
+                self.condition.wait(remaining)
+
+            waited = self.clock() - waiter.enqueued_at
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+            return waiter.state == 'admitted'
+
+    def try_acquire(self):
+        """Take a free slot without waiting or jumping the queue; False if none"""
+        with self.condition:
+            if self.active < self.max_concurrency and not self.queued:
+                self.active += 1
+                self.counters['admitted'] += 1
+                return True
+            return False
+
+    def displace(self, priority):
+        """Shed the lowest-priority, newest waiter if it ranks below `priority`"""
+        live = [entry for entry in self.queue if entry[2].state == 'waiting']
+        if not live:
+            return False
+        victim = max(live, key=lambda entry: (entry[0], entry[1]))
+        if victim[0] <= priority:
+            return False
+        victim[2].state = 'shed'
+        self.queued -= 1
+        self.shed(victim[0], 'shed_displaced')
+        self.condition.notify_all()
+        return True
+
+    def shed(self, priority, reason):
+        self.counters[reason] += 1
+        self.shed_by_priority[PRIORITY_NAMES.get(priority, 'normal')] += 1
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            while self.queue and self.active < self.max_concurrency:
+                _, _, waiter = heapq.heappop(self.queue)
+                if waiter.state != 'waiting':
+                    continue
+                waiter.state = 'admitted'
+                self.queued -= 1
+                self.active += 1
+                self.counters['admitted'] += 1
+            self.condition.notify_all()
+
+    def call(self, fn, priority, *args, **kwargs):
+        """Run fn under admission control. Returns (admitted, result)."""
+        if not self.acquire(priority):
+            return False, None
+        held = getattr(self.local, 'held', None)
+        if held is None:
+            held = self.local.held = []
+        held.append(True)
+        try:
+            return True, fn(*args, **kwargs)
+        finally:
+            if held.pop():
+                self.release()
+
+    def hand_off(self):
+        """
+        From inside fn: keep call()'s slot past its return, for work fn
+        started that is still running. Returns the function that releases
+        it, or None outside call().
+        """
+        held = getattr(self.local, 'held', None)
+        if not held or not held[-1]:
+            return None
+        held[-1] = False
+        return self.release
+
+    def stats(self):
+        with self.condition:
+            stats = dict(self.counters)
+            stats['active'] = self.active
+            stats['queue_depth'] = self.queued
+            stats['max_concurrency'] = self.max_concurrency
+            stats['max_queue'] = self.max_queue
+            waits = stats['queued']
+            stats['avg_wait_ms'] = round(self.wait_total / waits * 1000, 2) if waits else 0.0
+            stats['max_wait_ms'] = round(self.wait_max * 1000, 2)
+            stats['shed'] = stats['shed_queue_full'] + stats['shed_timeout'] + stats['shed_displaced']
+            stats['shed_by_priority'] = dict(self.shed_by_priority)
+        return stats
+
+
+def controller_from_env():
+    """
+    Admission controller configured from LLM_MAX_CONCURRENCY / LLM_MAX_QUEUE / LLM_MAX_QUEUE_WAIT.
+    The limits are per process: under gunicorn they apply to each worker.
+    """
+    return AdmissionController(
+        max_concurrency=int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+        max_queue=int(os.getenv('LLM_MAX_QUEUE', '64')),
+        max_wait=float(os.getenv('LLM_MAX_QUEUE_WAIT', '5'))
+    )
@@ -1,14 +1,31 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
-from gemini_handler import analyze_symptoms
-from hospital_finder import find_nearest_hospitals
+import gemini_handler
+from gemini_handler import admission, analyze_symptoms_batch, breaker, hedger, streaming_stats, triage_cache, warm_up
+from hospital_finder import find_nearest_hospitals, rank_hospitals, hospital_data
+import triage_pipeline
+from triage_pipeline import run_triage
 from ayushman_checker import check_ayushman_eligibility
 from data_manager import data_manager
+from sms_dispatcher import BulkSmsDispatcher
+from reminder_scheduler import ReminderScheduler
+from notification_handler import send_many
+import metrics
+from metrics import log_event, timed, verbose
+import atexit
 import os
+import threading
+import time
 from dotenv import load_dotenv
 from pathlib import Path
 from datetime import datetime
-from twilio.rest import Client
+from notification_transport import get_transport, reset_transport
+from triage_analytics import GEOHASH_PRECISION, GROUP_FIELDS, location_cell
+
+try:
+    import fcntl
+except ImportError:  # Windows: no multi-process server, nothing to coordinate
+    fcntl = None
 # Load environment variables from root directory
 env_path = Path(__file__).parent.parent / '.env'
 load_dotenv(env_path)
@@ -23,18 +40,157 @@ if GEMINI_API_KEY:
 else:
     print("Gemini API Key not found!")
 
+# Build the shared Gemini client now so the first triage is not slower
+warm_up(ping=os.getenv('GEMINI_WARMUP_PING') == '1')
+
 # Twilio Configuration
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
 
-# Initialize Twilio client
-if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
-    twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+# Twilio client comes from the shared notification transport (pooled connections)
+twilio_client = get_transport().client
+if twilio_client:
     print("✅ Twilio SMS service configured successfully")
 else:
     print("❌ Twilio credentials not found")
-    twilio_client = None
+
+# Bulk SMS goes out in the background, rate limited per sender number; jobs, the
+# send queue and the rate limit are shared by all server workers through SQLite
+sms_dispatcher = BulkSmsDispatcher(
+    twilio_client,
+    TWILIO_PHONE_NUMBER,
+    db_path=os.path.join(data_manager.data_dir, 'sms_jobs.db'),
+    workers=int(os.getenv('SMS_WORKERS', '8')),
+    rate_per_sender=float(os.getenv('SMS_RATE_PER_SENDER', '1'))
+)
+
+# Medication reminders fire from an in-memory heap in exactly one process; it picks up
+# schedules saved by other workers by row id and writes each new slot back
+reminder_scheduler = ReminderScheduler(
+    send_batch=lambda messages: send_many('sms', messages),
+    persist=data_manager.save_reminder_progress,
+    source=data_manager.new_medication_schedules
+)
+# Under a multi-process server the first worker to take this lock runs the scheduler
+REMINDER_LOCK_PATH = os.path.join(data_manager.data_dir, 'reminder_scheduler.lock')
+reminder_lock_file = None
+
+# Pick up edits to the hospital data files without a restart (0 disables polling)
+HOSPITAL_DATA_RELOAD_SECONDS = float(os.getenv('HOSPITAL_DATA_RELOAD_SECONDS', '30'))
+
+# How long shutdown waits for queued history writes and bulk SMS
+SHUTDOWN_DRAIN_SECONDS = float(os.getenv('SHUTDOWN_DRAIN_SECONDS', '20'))
+
+# Set by gunicorn.conf.py: the app is imported once in the master and forked,
+# so threads and network clients are started per worker in after_fork()
+PREFORK = os.getenv('SWASTHYA_PREFORK') == '1'
+
+def claim_reminder_scheduler():
+    """True if this process should run the reminder scheduler (non-blocking file lock)"""
+    global reminder_lock_file
+    if fcntl is None:
+        return True
+    lock_file = open(REMINDER_LOCK_PATH, 'a')
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    # Held until this process exits; a replacement worker can then take it
+    reminder_lock_file = lock_file
+    return True
+
+def start_background_services():
+    """Threads that must run inside the serving process (never in a preloading master)"""
+    if os.getenv('ENABLE_REMINDER_SCHEDULER') == '1' and claim_reminder_scheduler():
+        loaded = reminder_scheduler.load(data_manager.new_medication_schedules())
+        data_manager.reminder_scheduler = reminder_scheduler
+        reminder_scheduler.start(interval=float(os.getenv('REMINDER_TICK_SECONDS', '30')))
+        print(f"✅ Reminder scheduler running with {loaded} schedules (pid {os.getpid()})")
+    # Every worker sends from the shared queue, so jobs outlive the worker that took them
+    sms_dispatcher.start()
+    if HOSPITAL_DATA_RELOAD_SECONDS > 0:
+        hospital_data.start(interval=HOSPITAL_DATA_RELOAD_SECONDS)
+    if data_manager.triage_store.rollup_status()['backfill_pending']:
+        # History from before the analytics rollups; safe to run in every worker
+        threading.Thread(target=data_manager.triage_store.backfill_rollups, name='rollup-backfill', daemon=True).start()
+
+def after_fork():
+    """
+    Called in each server worker right after fork. Data loaded by the master
+    (hospitals, snapshot, symptom rules) stays shared copy-on-write; network
+    clients, thread pools and background threads are rebuilt here.
+    """
+    global twilio_client, shutdown_done
+    shutdown_done = False
+    reset_transport()
+    twilio_client = get_transport().client
+    sms_dispatcher.reinit_after_fork(twilio_client)
+    gemini_handler.reinit_after_fork()
+    triage_pipeline.reinit_after_fork()
+    warm_up()
+    start_background_services()
+
+shutdown_lock = threading.Lock()
+# A preloading master never serves requests, so it has nothing to drain
+shutdown_done = PREFORK
+
+def shutdown(timeout=None):
+    """
+    Graceful stop: halt the pollers and wait (bounded) for queued history
+    writes and bulk SMS to finish. Safe to call more than once.
+    """
+    global shutdown_done
+    with shutdown_lock:
+        if shutdown_done:
+            return
+        shutdown_done = True
+    timeout = SHUTDOWN_DRAIN_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    reminder_scheduler.stop()
+    hospital_data.stop()
+    sms_drained = sms_dispatcher.drain(max(0.0, deadline - time.monotonic()))
+    history_drained = data_manager.history_writer.drain(max(0.0, deadline - time.monotonic()))
+    if sms_drained and history_drained:
+        print(f"✅ Background queues drained (pid {os.getpid()})")
+    else:
+        log_event('shutdown_incomplete', level='warning', pid=os.getpid(), sms_drained=sms_drained,
+                  history_pending=data_manager.history_writer.stats()['queue_depth'])
+
+atexit.register(shutdown)
+
+if not PREFORK:
+    start_background_services()
+
+# Point-in-time values read when /metrics is scraped
+metrics.registry.gauge('swasthya_llm_active', 'Gemini calls in flight', lambda: admission.stats()['active'])
+metrics.registry.gauge('swasthya_llm_queue_depth', 'Requests waiting for a Gemini slot', lambda: admission.stats()['queue_depth'])
+metrics.registry.gauge('swasthya_llm_shed_total', 'Requests shed to the fallback', lambda: admission.stats()['shed'], kind='counter')
+metrics.registry.gauge('swasthya_llm_circuit_open', '1 while the Gemini circuit breaker is open', lambda: breaker.stats()['state'] == 'open')
+metrics.registry.gauge('swasthya_triage_cache_hit_rate', 'Triage cache hit rate', lambda: triage_cache.stats()['hit_rate'])
+metrics.registry.gauge('swasthya_history_queue_depth', 'Triage records waiting to be written', lambda: data_manager.history_writer.stats()['queue_depth'])
+metrics.registry.gauge('swasthya_history_dropped_total', 'Triage records dropped on a full queue', lambda: data_manager.history_writer.stats()['dropped'], kind='counter')
+metrics.registry.gauge('swasthya_hospital_count', 'Hospitals in the serving data set', lambda: hospital_data.status()['hospital_count'])
+
+@app.before_request
+def start_request_trace():
+    g.request_start = time.perf_counter()
+    g.trace = metrics.start_trace(request.headers.get('X-Request-ID'))
+
+@app.after_request
+def record_request_metrics(response):
+    trace = g.get('trace')
+    if trace is not None:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        elapsed = time.perf_counter() - g.request_start
+        metrics.http_requests.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        metrics.http_seconds.observe(elapsed, endpoint=endpoint)
+        response.headers['X-Request-ID'] = trace.trace_id
+        if trace.spans:
+            log_event('request', endpoint=endpoint, status=response.status_code,
+                      ms=round(elapsed * 1000, 2), stages=trace.summary())
+    return response
 
 @app.route('/api/send-sms', methods=['POST'])
 def send_sms():
@@ -49,12 +205,12 @@ def send_sms():
         if not to_number or not message:
             return jsonify({'success': False, 'error': 'Missing phone number or message'}), 400
         
-        print(f"📱 Attempting to send SMS to: {to_number}")
-        print(f"💬 Message: {message}")
+        verbose(f"📱 Attempting to send SMS to: {to_number}")
+        verbose(f"💬 Message: {message}")
         
         # Check if Twilio is configured
         if not twilio_client:
-            print("❌ Twilio not configured - running in demo mode")
+            log_event('notify_demo', channel='sms')
             return jsonify({
                 'success': True, 
                 'demo_mode': True,
@@ -64,13 +220,14 @@ def send_sms():
             })
         
         # Send SMS via Twilio
-        message = twilio_client.messages.create(
-            body=message,
-            from_=TWILIO_PHONE_NUMBER,
-            to=to_number
-        )
+        with timed('sms'):
+            message = twilio_client.messages.create(
+                body=message,
+                from_=TWILIO_PHONE_NUMBER,
+                to=to_number
+            )
         
-        print(f"✅ SMS sent successfully! SID: {message.sid}")
+        log_event('sms_sent', status=message.status)
         return jsonify({
             'success': True,
             'message_sid': message.sid,
@@ -79,7 +236,9 @@ def send_sms():
         })
         
     except Exception as e:
-        print(f"❌ SMS sending failed: {str(e)}")
+        # Twilio's message names the destination number: detail only in verbose logs
+        log_event('sms_failed', level='error', error=type(e).__name__, code=getattr(e, 'code', None))
+        verbose(f"SMS error: {str(e)}")
         return jsonify({
             'success': False,
             'error': str(e),
@@ -89,7 +248,7 @@ def send_sms():
 @app.route('/api/send-bulk-sms', methods=['POST'])
 def send_bulk_sms():
     """
-    Send SMS to multiple numbers
+    Queue SMS to multiple numbers; returns a job id to poll for progress
     """
     try:
         data = request.get_json()
@@ -99,48 +258,81 @@ def send_bulk_sms():
         if not phone_numbers or not message:
             return jsonify({'success': False, 'error': 'Missing phone numbers or message'}), 400
         
-        results = []
-        
-        for phone_number in phone_numbers:
-            try:
-                if twilio_client:
-                    # Send actual SMS
-                    sent_message = twilio_client.messages.create(
-                        body=message,
-                        from_=TWILIO_PHONE_NUMBER,
-                        to=phone_number
-                    )
-                    results.append({
-                        'phone': phone_number,
-                        'success': True,
-                        'message_sid': sent_message.sid,
-                        'status': sent_message.status
-                    })
-                else:
-                    # Demo mode
-                    results.append({
-                        'phone': phone_number,
-                        'success': True,
-                        'demo_mode': True,
-                        'status': 'queued'
-                    })
-                    
-            except Exception as e:
-                results.append({
-                    'phone': phone_number,
-                    'success': False,
-                    'error': str(e)
-                })
+        job_id = sms_dispatcher.submit(phone_numbers, message)
+        job = sms_dispatcher.get_job(job_id)
         
         return jsonify({
             'success': True,
-            'results': results,
-            'total_sent': len([r for r in results if r['success']])
-        })
+            'job_id': job_id,
+            'status': job['status'],
+            'total': job['total'],
+            'duplicates_removed': job['duplicates_removed'],
+            'demo_mode': twilio_client is None,
+            'status_url': f"/api/send-bulk-sms/{job_id}"
+        }), 202
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/send-bulk-sms/<job_id>', methods=['GET'])
+def bulk_sms_status(job_id):
+    """
+    Progress of a bulk SMS job
+    """
+    include_results = request.args.get('results') == '1'
+    job = sms_dispatcher.get_job(job_id, include_results=include_results)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job id'}), 404
+    return jsonify(dict(job, success=True))
+
+@app.route('/api/hospital-data', methods=['GET'])
+def hospital_data_status():
+    """
+    Current hospital data version and reload stats
+    """
+    return jsonify(dict(hospital_data.status(), success=True))
+
+@app.route('/api/hospital-data/reload', methods=['POST'])
+def reload_hospital_data():
+    """
+    Rebuild the hospital indexes from disk in the background
+    """
+    hospital_data.reload_async(force=True)
+    return jsonify(dict(hospital_data.status(), success=True, reload_started=True)), 202
+
+@app.route('/api/triage/admission', methods=['GET'])
+def triage_admission_stats():
+    """
+    Gemini admission control: queue depth, wait times and shed counts
+    """
+    return jsonify(dict(admission.stats(), success=True))
+
+@app.route('/api/triage/circuit', methods=['GET'])
+def triage_circuit_stats():
+    """
+    Gemini circuit breaker state and hedging stats
+    """
+    return jsonify({
+        'success': True,
+        'circuit': breaker.stats(),
+        'hedging': hedger.stats() if hedger is not None else None
+    })
+
+@app.route('/api/triage/streaming', methods=['GET'])
+def triage_streaming_stats():
+    """
+    Time to first severity vs full Gemini response (streaming mode)
+    """
+    return jsonify(dict(streaming_stats(), success=True))
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    Prometheus scrape endpoint: per-stage latency histograms, request counters and queue gauges.
+    Under gunicorn these are the answering worker's numbers only.
+    """
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def home():
     """Root endpoint - returns API status"""
@@ -163,7 +355,8 @@ def health_check():
         "status": "healthy", 
         "timestamp": datetime.now().isoformat(),
         "service": "Swasthya Saathi Backend",
-        "gemini_status": "configured" if GEMINI_API_KEY else "not_configured"
+        "gemini_status": "configured" if GEMINI_API_KEY else "not_configured",
+        "hospital_data_version": hospital_data.current_version()
     })
 
 @app.route('/triage', methods=['POST', 'GET'])
@@ -193,30 +386,28 @@ def triage_symptoms():
         user_location = data.get('location', {})
         user_phone = data.get('user_phone', '')
         
-        print(f"Received symptoms: {symptoms}")
+        verbose(f"Received symptoms: {symptoms}")
         
         if not symptoms:
             return jsonify({"error": "Symptoms are required"}), 400
         
-        # Step 1: Analyze symptoms with Gemini
-        triage_result = analyze_symptoms(symptoms, language)
-        
-        # Step 2: Find hospitals if needed
-        hospitals = []
-        if triage_result['severity'] in ['Emergency', 'OPD Visit']:
-            hospitals = find_nearest_hospitals(
-                user_location.get('lat', 28.6139),
-                user_location.get('lng', 77.2090),
-                ayushman_card
-            )
+        # Steps 1-2: Rule-based fast path or Gemini (under a deadline), with the
+        # hospital search started alongside
+        triage_result, hospitals = run_triage(
+            symptoms, language,
+            user_location.get('lat', 28.6139),
+            user_location.get('lng', 77.2090),
+            ayushman_card
+        )
         
-        # Step 3: Save to history
+        # Step 3: Save to history off the request path
         user_data = {
             'phone': user_phone,
             'location': user_location,
-            'ayushman_card': ayushman_card
+            'ayushman_card': ayushman_card,
+            'language': language
         }
-        session_id = data_manager.save_triage_record(user_data, symptoms, triage_result)
+        session_id = data_manager.save_triage_record(user_data, symptoms, triage_result, background=True)
         
         # Step 4: Prepare response
         response = {
@@ -228,14 +419,17 @@ def triage_symptoms():
             'hospitals': hospitals[:5],
             'ayushman_eligible': ayushman_card,
             'timestamp': datetime.now().isoformat(),
-            'gemini_used': bool(GEMINI_API_KEY)
+            'gemini_used': bool(GEMINI_API_KEY) and triage_result.get('source') not in ('rules', 'fallback'),
+            'triage_source': triage_result.get('source', 'gemini')
         }
         
-        print(f"Triage result: {triage_result['severity']}")
+        log_event('triage_result', severity=triage_result['severity'],
+                  source=triage_result.get('source', 'gemini'), hospitals=len(hospitals))
         return jsonify(response)
         
     except Exception as e:
-        print(f"Error in triage: {str(e)}")
+        log_event('triage_error', level='error', error=type(e).__name__)
+        verbose(f"Error in triage: {str(e)}")
         return jsonify({
             'error': 'Analysis failed',
             'severity': 'Unknown',
@@ -243,18 +437,116 @@ def triage_symptoms():
             'details': str(e)
         }), 500
 
+# Upper bound on one bulk triage upload
+BATCH_TRIAGE_MAX_ITEMS = int(os.getenv('BATCH_TRIAGE_MAX_ITEMS', '1000'))
+
+@app.route('/triage/batch', methods=['POST'])
+def triage_batch():
+    """
+    Bulk triage for health camps: {"entries": [{"symptoms": ..., "user_phone": ...}, ...]}
+    """
+    try:
+        data = request.get_json()
+        entries = (data or {}).get('entries')
+        if not isinstance(entries, list) or not entries:
+            return jsonify({'success': False, 'error': 'entries must be a non-empty list'}), 400
+        if len(entries) > BATCH_TRIAGE_MAX_ITEMS:
+            return jsonify({
+                'success': False,
+                'error': f'At most {BATCH_TRIAGE_MAX_ITEMS} entries per request'
+            }), 400
+        
+        entries = [entry if isinstance(entry, dict) else {'symptoms': entry} for entry in entries]
+        if not all(entry.get('symptoms') for entry in entries):
+            return jsonify({'success': False, 'error': 'Every entry needs symptoms'}), 400
+        
+        results, stats = analyze_symptoms_batch(entries, data.get('language', 'en'))
+        
+        for entry, result in zip(entries, results):
+            user_data = {
+                'phone': entry.get('user_phone', ''),
+                'location': entry.get('location', {}),
+                'ayushman_card': entry.get('ayushman_card', False),
+                'language': entry.get('language') or data.get('language', 'en')
+            }
+            result['session_id'] = data_manager.save_triage_record(
+                user_data, entry['symptoms'], dict(result), background=True
+            )
+            if 'id' in entry:
+                result['id'] = entry['id']
+        
+        log_event('triage_batch', items=stats['items'], model_calls=stats['model_calls'], seconds=stats['seconds'])
+        return jsonify({'success': True, 'results': results, 'stats': stats})
+        
+    except Exception as e:
+        log_event('triage_batch_error', level='error', error=type(e).__name__)
+        verbose(f"Error in batch triage: {str(e)}")
+        return jsonify({'success': False, 'error': 'Batch analysis failed', 'details': str(e)}), 500
+
 @app.route('/hospitals', methods=['GET'])
 def get_hospitals():
-    """Get list of hospitals"""
+    """Get list of hospitals, optionally ranked (?specialty=&emergency=1&icu=1&profile=emergency)"""
     try:
-        hospitals = find_nearest_hospitals(28.6139, 77.2090, False)
+        lat = float(request.args.get('lat', 28.6139))
+        lng = float(request.args.get('lng', 77.2090))
+        ayushman_only = request.args.get('ayushman') == '1'
+        ranking = {
+            'specialty': request.args.get('specialty'),
+            'emergency': request.args.get('emergency') == '1',
+            'icu': request.args.get('icu') == '1',
+            'ambulance': request.args.get('ambulance') == '1',
+            'weights': request.args.get('profile')
+        }
+        if any(ranking.values()):
+            hospitals = rank_hospitals(lat, lng, ayushman_only, **ranking)
+        else:
+            hospitals = find_nearest_hospitals(lat, lng, ayushman_only)
         return jsonify({
             'hospitals': hospitals,
             'count': len(hospitals)
         })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/analytics', methods=['GET'])
+def triage_analytics():
+    """
+    Triage counts for outbreak dashboards, from the rollups:
+    ?start=2025-10-01&end=2025-10-08&lat=28.61&lng=77.21&precision=4&group_by=day,severity
+    (or cell=<geohash prefix> instead of lat/lng; group_by any of severity, language, cell, hour, day)
+    """
+    try:
+        group_by = [field for field in request.args.get('group_by', 'severity').split(',') if field]
+        unknown = [field for field in group_by if field not in GROUP_FIELDS]
+        if unknown:
+            return jsonify({'success': False, 'error': f"Unknown group_by: {', '.join(unknown)}"}), 400
+        precision = int(request.args.get('precision', GEOHASH_PRECISION))
+        if not 1 <= precision <= GEOHASH_PRECISION:
+            return jsonify({'success': False, 'error': f'precision must be 1-{GEOHASH_PRECISION}'}), 400
+        cell = request.args.get('cell')
+        if cell is None and 'lat' in request.args and 'lng' in request.args:
+            cell = location_cell({'lat': request.args['lat'], 'lng': request.args['lng']}, precision)
+            if not cell:
+                return jsonify({'success': False, 'error': 'Invalid lat/lng'}), 400
+        if cell and len(cell) > GEOHASH_PRECISION:
+            return jsonify({'success': False, 'error': f'cell is stored to {GEOHASH_PRECISION} characters'}), 400
+
+        groups = data_manager.get_triage_analytics(
+            start=request.args.get('start'), end=request.args.get('end'),
+            cell=cell, group_by=group_by, precision=precision
+        )
+        return jsonify({
+            'success': True,
+            'cell': cell,
+            'total': sum(group['count'] for group in groups),
+            'groups': groups,
+            'rollups': data_manager.triage_store.rollup_status()
+        })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
 @app.route('/ayushman/check', methods=['POST'])
 def check_ayushman():
     """Check Ayushman card eligibility"""
@@ -276,5 +568,7 @@ if __name__ == '__main__':
     print("   GET  /health        - Health check") 
     print("   POST /triage        - Analyze symptoms")
     print("   GET  /hospitals     - List hospitals")
+    print("   GET  /analytics     - Triage counts by area, time, severity")
     print("   POST /ayushman/check - Verify Ayushman card")
+    print("Development server; for production run: gunicorn -c gunicorn.conf.py")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
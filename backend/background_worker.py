@@ -0,0 +1,76 @@
+import os
+import queue
+import threading
+
+from metrics import log_event, verbose
+
+
+class BackgroundWorker:
+    """
+    Bounded queue drained by one daemon thread. submit() never blocks: when
+    the queue is full the item is dropped and counted, so a slow handler
+    (disk, network) can't stall request threads.
+    """
+
+    def __init__(self, name, handler, maxsize=1000):
+        self.name = name
+        self.handler = handler
+        self.queue = queue.Queue(maxsize)
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+        self.stats_counters = {'submitted': 0, 'processed': 0, 'failed': 0, 'dropped': 0}
+
+    def ensure_started(self):
+        # Started lazily, and restarted in forked children where the thread is gone
+        if self.thread is not None and self.pid == os.getpid() and self.thread.is_alive():
+            return
+        with self.lock:
+            if self.thread is None or self.pid != os.getpid() or not self.thread.is_alive():
+                self.pid = os.getpid()
+                self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                self.thread.start()
+
+    def submit(self, item):
+        """Queue an item for the handler. Returns False if it had to be dropped."""
+        self.ensure_started()
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.count('dropped')
+            log_event('worker_dropped', level='warning', worker=self.name)
+            return False
+        self.count('submitted')
+        return True
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                self.handler(item)
+                self.count('processed')
+            except Exception as e:
+                self.count('failed')
+                log_event('worker_failed', level='error', worker=self.name, error=type(e).__name__)
+                verbose(f"{self.name} failed: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def drain(self, timeout=None):
+        """Wait until everything queued so far is handled. Returns False on timeout."""
+        with self.queue.all_tasks_done:
+            if timeout is None:
+                while self.queue.unfinished_tasks:
+                    self.queue.all_tasks_done.wait()
+                return True
+            return self.queue.all_tasks_done.wait_for(lambda: not self.queue.unfinished_tasks, timeout)
+
+    def count(self, name):
+        with self.lock:
+            self.stats_counters[name] += 1
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.stats_counters)
+        stats['queue_depth'] = self.queue.qsize()
+        return stats
@@ -0,0 +1,74 @@
+import numpy as np
+
+from geo_index import EARTH_RADIUS_KM
+
+# Rough bytes of float64 scratch held per (user, hospital) pair while a chunk is in flight
+BYTES_PER_PAIR = 8 * 6
+
+
+class BatchHaversine:
+    """Vectorised nearest-hospital search for many user points at once"""
+
+    def __init__(self, lats, lngs, ayushman_flags, memory_budget_mb=256):
+        self.size = len(lats)
+        self.lat_rad = np.ascontiguousarray(np.radians(np.asarray(lats, dtype=np.float64)))
+        self.lng_rad = np.ascontiguousarray(np.radians(np.asarray(lngs, dtype=np.float64)))
+        self.cos_lat = np.cos(self.lat_rad)
+        self.ayushman_mask = np.asarray(ayushman_flags, dtype=bool)
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+
+    def chunk_rows(self):
+        """How many user points fit in one chunk under the memory budget"""
+        return max(1, self.memory_budget // max(1, self.size * BYTES_PER_PAIR))
+
+    def distances(self, lats, lngs):
+        """Full (users x hospitals) Haversine distance matrix in km"""
+        user_lat = np.radians(np.asarray(lats, dtype=np.float64))[:, None]
+        user_lng = np.radians(np.asarray(lngs, dtype=np.float64))[:, None]
+
+        sin_dlat = np.sin((self.lat_rad - user_lat) / 2)
+        sin_dlng = np.sin((self.lng_rad - user_lng) / 2)
+        a = sin_dlat * sin_dlat + np.cos(user_lat) * self.cos_lat * sin_dlng * sin_dlng
+        np.clip(a, 0.0, 1.0, out=a)
+        return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    def nearest(self, points, k=10, ayushman_only=False, max_distance_km=50, chunk_size=None):
+        """
+        Top-k hospitals per point. Returns (indices, distances) arrays of shape
+        (n_points, k); slots without a hospital in range hold -1 and inf.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        n_points = len(points)
+
+        indices = np.full((n_points, k), -1, dtype=np.int64)
+        distances = np.full((n_points, k), np.inf, dtype=np.float64)
+        # Columns past the hospital count stay as padding
+        k = min(k, self.size)
+        if k == 0 or n_points == 0:
+            return indices, distances
+
+        chunk_size = chunk_size or self.chunk_rows()
+        for start in range(0, n_points, chunk_size):
+            chunk = points[start:start + chunk_size]
+            dist = self.distances(chunk[:, 0], chunk[:, 1])
+
+            dist[dist > max_distance_km] = np.inf
+            if ayushman_only:
+                dist[:, ~self.ayushman_mask] = np.inf
+
+            if k < self.size:
+                top = np.argpartition(dist, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(self.size), dist.shape).copy()
+            top_dist = np.take_along_axis(dist, top, axis=1)
+
+            # Order each row by distance, breaking ties by hospital position
+            order = np.lexsort((top, top_dist), axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_dist = np.take_along_axis(top_dist, order, axis=1)
+            top[np.isinf(top_dist)] = -1
+
+            indices[start:start + len(chunk), :k] = top
+            distances[start:start + len(chunk), :k] = top_dist
+
+        return indices, distances
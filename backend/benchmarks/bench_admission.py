@@ -0,0 +1,99 @@
+"""
+Admission control under an outbreak-style burst against a slow fake model:
+per-priority latency and shed counts, priority queue vs plain FIFO.
+
+    cd backend && python -m benchmarks.bench_admission --requests 200 --latency 0.2
+"""
+import contextlib
+import io
+import random
+import threading
+import time
+
+import gemini_handler
+from admission_control import PRIORITY_NORMAL, AdmissionController, priority_for
+from benchmarks.common import parse_args, report
+from benchmarks.fakes import FakeGenerativeModel
+
+# (share of traffic, symptom text) - mostly mild queries, a few emergencies
+TRAFFIC_MIX = [
+    (0.1, 'severe chest pain and difficulty breathing'),
+    (0.3, 'fever and body ache'),
+    (0.6, 'mild cold and runny nose'),
+]
+
+
+def build_burst(count, seed=0):
+    rng = random.Random(seed)
+    burst = []
+    for i in range(count):
+        roll = rng.random()
+        for share, text in TRAFFIC_MIX:
+            if roll < share:
+                break
+            roll -= share
+        burst.append(f"{text} (case {i})")  # unique text, so no cache hits
+    return burst
+
+
+def run_burst(burst, args, prioritised):
+    gemini_handler.admission = AdmissionController(args.concurrency, args.queue, args.max_wait)
+    gemini_handler.triage_cache.clear()
+    gemini_handler.priority_for = priority_for if prioritised else (lambda screening: PRIORITY_NORMAL)
+    outcomes = [None] * len(burst)
+
+    def worker(index, symptoms):
+        start = time.perf_counter()
+        result = gemini_handler.analyze_symptoms(symptoms)
+        outcomes[index] = (symptoms, time.perf_counter() - start, result.get('source') == 'fallback')
+
+    threads = [threading.Thread(target=worker, args=(i, symptoms)) for i, symptoms in enumerate(burst)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for thread in threads:
+            thread.start()
+            time.sleep(args.arrival_gap)
+        for thread in threads:
+            thread.join()
+
+    by_kind = {}
+    for symptoms, elapsed, shed in outcomes:
+        kind = next(text for _, text in TRAFFIC_MIX if symptoms.startswith(text)).split(' and ')[0]
+        by_kind.setdefault(kind, []).append((elapsed, shed))
+
+    summary = {}
+    for kind, samples in by_kind.items():
+        served = sorted(elapsed for elapsed, shed in samples if not shed)
+        summary[kind] = {
+            'requests': len(samples),
+            'shed': sum(1 for _, shed in samples if shed),
+            'served_p50_ms': round(served[len(served) // 2] * 1000, 1) if served else None,
+            'served_max_ms': round(served[-1] * 1000, 1) if served else None,
+        }
+    return {'by_kind': summary, 'controller': gemini_handler.admission.stats()}
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        requests={'type': int, 'default': 200},
+        latency={'type': float, 'default': 0.2, 'help': 'fake model latency in seconds'},
+        concurrency={'type': int, 'default': 4},
+        queue={'type': int, 'default': 16},
+        max_wait={'type': float, 'default': 2.0},
+        arrival_gap={'type': float, 'default': 0.005}
+    )
+
+    gemini_handler.GEMINI_API_KEY = 'benchmark'
+    gemini_handler.model = FakeGenerativeModel(latency=args.latency)
+    burst = build_burst(args.requests)
+
+    report('admission', {
+        'requests': args.requests,
+        'model_latency_s': args.latency,
+        'priority_queue': run_burst(burst, args, prioritised=True),
+        'fifo': run_burst(burst, args, prioritised=False),
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Outbreak analytics over triage history of N records:
+
+  * rollups: /analytics-style queries (one week by severity, one day by
+    hour, one district by day, the whole range by region) against the
+    hourly and daily rollup tables;
+  * scan: the same counts by streaming the whole history, the only option
+    before rollups (and still far cheaper than re-reading triage_history.json);
+  * append: cost of a history save with and without its rollup upsert;
+  * backfill: rollups for a history written before they existed.
+
+Patients are clustered around a few hundred district centres, as real
+traffic is, and arrive at --per-day triages a day. Rollups shrink as that
+rate grows: at a few thousand a day nationwide most (hour, cell, severity,
+language) combinations hold a single record.
+
+    cd backend && python -m benchmarks.bench_analytics --sizes 10000,100000,1000000 --per-day 20000
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from benchmarks.common import parse_args, report
+from benchmarks.synthetic import LAT_RANGE, LNG_RANGE, generate_triage_records
+from triage_analytics import ROLLUP_TABLES, location_cell, rollup_key
+from triage_store import TriageHistoryStore
+
+HISTORY_START = datetime(2025, 10, 1)
+INSERT = 'INSERT INTO triage_history (session_id, phone, timestamp, record) VALUES (?, ?, ?, ?)'
+
+
+def clustered_records(count, districts, per_day, seed, chunk=50000):
+    rng = random.Random(seed)
+    centres = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(districts)]
+    for start in range(0, count, chunk):
+        records = generate_triage_records(min(chunk, count - start), seed=start)
+        for offset, record in enumerate(records):
+            lat, lng = rng.choice(centres)
+            record['user_data']['location'] = {'lat': lat + rng.gauss(0, 0.05), 'lng': lng + rng.gauss(0, 0.05)}
+            record['session_id'] = f"SYN{start + offset:010d}"
+            record['timestamp'] = (HISTORY_START + timedelta(days=(start + offset) / per_day)).isoformat()
+        yield records
+
+
+def timed_query(fn, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return result, {
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3)
+    }
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        sizes={'default': '10000,100000,1000000'},
+        districts={'type': int, 'default': 300, 'help': 'Cluster centres for patient locations'},
+        per_day={'type': int, 'default': 20000, 'help': 'Triages per day across all districts'},
+        repeats={'type': int, 'default': 50},
+        scan_max={'type': int, 'default': 1000000, 'help': 'Largest history for the full-scan baseline'}
+    )
+
+    results = []
+    for size in [int(value) for value in args.sizes.split(',')]:
+        workdir = tempfile.mkdtemp(prefix='bench-analytics-')
+        try:
+            store = TriageHistoryStore(os.path.join(workdir, 'triage_history.db'))
+            conn = store.connection()
+            probe = None
+
+            # Seed as a pre-rollup deployment would have: history rows only
+            for records in clustered_records(size, args.districts, args.per_day, seed=size):
+                probe = probe or records[len(records) // 2]
+                with conn:
+                    conn.execute('BEGIN IMMEDIATE')
+                    conn.executemany(INSERT, (store.row_values(record) for record in records))
+            conn.execute("DELETE FROM store_meta WHERE key LIKE 'rollup_%'")
+            store.init_rollup_backfill()
+
+            start = time.perf_counter()
+            backfilled = store.backfill_rollups()
+            backfill_seconds = time.perf_counter() - start
+            rollup_rows = {
+                period: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+                for period, table in ROLLUP_TABLES.items()
+            }
+
+            week_start = probe['timestamp'][:10]
+            day_end = (datetime.fromisoformat(week_start) + timedelta(days=1)).isoformat()[:10]
+            week_end = (datetime.fromisoformat(week_start) + timedelta(days=7)).isoformat()[:10]
+            district = location_cell(probe['user_data']['location'], 3)
+            queries = {
+                'week_by_severity': dict(start=week_start, end=week_end, group_by=('severity',)),
+                'day_by_hour': dict(start=week_start, end=day_end, group_by=('hour', 'severity')),
+                'district_by_day': dict(cell=district, group_by=('day', 'severity')),
+                'all_by_region': dict(group_by=('cell',), precision=3),
+            }
+            run = {
+                'records': size,
+                'rollup_rows': rollup_rows,
+                'backfill': {'records': backfilled, 'seconds': round(backfill_seconds, 2),
+                             'records_per_s': round(backfilled / max(backfill_seconds, 1e-9))},
+                'queries': {}
+            }
+            answers = {}
+            for name, filters in queries.items():
+                answers[name], latency = timed_query(lambda: store.query_rollups(**filters), args.repeats)
+                run['queries'][name] = dict(latency, groups=len(answers[name]))
+
+            if size <= args.scan_max:
+                # Same week/severity answer by streaming every record
+                start = time.perf_counter()
+                counts = Counter()
+                for record in store.iter_records(batch_size=5000):
+                    hour, _, severity, _ = rollup_key(record)
+                    if week_start <= hour < week_end:
+                        counts[severity] += 1
+                run['scan_week_by_severity_ms'] = round((time.perf_counter() - start) * 1000, 1)
+                run['scan_matches_rollups'] = counts == Counter(
+                    {group['severity']: group['count'] for group in answers['week_by_severity']}
+                )
+                run['speedup'] = round(run['scan_week_by_severity_ms'] / max(run['queries']['week_by_severity']['p50_ms'], 1e-6))
+
+            # Per-save cost of keeping the rollups current
+            extra = next(clustered_records(500, args.districts, args.per_day, seed=size + 1))
+            for record in extra:
+                record['session_id'] += 'X'
+            start = time.perf_counter()
+            for record in extra:
+                conn.execute(INSERT, store.row_values(record))
+            plain = time.perf_counter() - start
+            start = time.perf_counter()
+            for record in extra:
+                store.append(record)
+            with_rollups = time.perf_counter() - start
+            run['append_ms'] = {'history_only': round(plain / len(extra) * 1000, 4),
+                                'with_rollups': round(with_rollups / len(extra) * 1000, 4)}
+            results.append(run)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report('analytics', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+analyze_symptoms end to end with a deterministic local fake model (no network):
+cache misses over the blocking and streaming call paths, and cache hits,
+from several threads at once. Checks every answer against the fake's rules.
+
+    cd backend && python -m benchmarks.bench_analyze_symptoms --requests 400 --threads 8
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gemini_handler
+from admission_control import AdmissionController
+from benchmarks.common import parse_args, report
+from benchmarks.fakes import DeterministicTriageModel, FakeGeminiTriage
+from resilience import CircuitBreaker
+
+SYMPTOMS = ['chest pain and sweating', 'fever and cough', 'mild headache', 'difficulty breathing',
+            'runny nose', 'cough for three days', 'back pain', 'itchy rash']
+
+
+def run(requests, threads, unique):
+    expected = FakeGeminiTriage(latency=0)
+    texts = [f"{SYMPTOMS[i % len(SYMPTOMS)]} case {i if unique else 0}" for i in range(requests)]
+
+    def one(symptoms):
+        start = time.perf_counter()
+        result = gemini_handler.analyze_symptoms(symptoms)
+        elapsed = time.perf_counter() - start
+        assert result['severity'] == expected(symptoms)['severity'], (symptoms, result)
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(one, texts))
+    wall = time.perf_counter() - start
+    return {
+        'requests': requests,
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3),
+        'throughput_per_s': round(requests / wall, 1)
+    }
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        requests={'type': int, 'default': 400},
+        threads={'type': int, 'default': 8},
+        latency={'type': float, 'default': 0.05, 'help': 'fake model time to first chunk (s)'},
+        chunk_latency={'type': float, 'default': 0.005, 'help': 'fake model time between chunks (s)'}
+    )
+
+    gemini_handler.GEMINI_API_KEY = 'benchmark'
+    gemini_handler.hedger = None
+    gemini_handler.breaker = CircuitBreaker(slow_call_seconds=10)
+    gemini_handler.admission = AdmissionController(max_concurrency=args.threads, max_queue=args.threads * 4)
+
+    results = {}
+    for name, streaming in [('miss_blocking', False), ('miss_streaming', True)]:
+        gemini_handler.STREAMING = streaming
+        gemini_handler.model = DeterministicTriageModel(args.latency, args.chunk_latency)
+        gemini_handler.triage_cache.clear()
+        results[name] = run(args.requests, args.threads, unique=True)
+        results[name]['model_calls'] = gemini_handler.model.calls
+
+    # Same few texts over and over: everything after the first of each is a cache hit
+    gemini_handler.triage_cache.clear()
+    gemini_handler.model = DeterministicTriageModel(args.latency, args.chunk_latency)
+    results['cached'] = run(args.requests, args.threads, unique=False)
+    results['cached']['model_calls'] = gemini_handler.model.calls
+    results['streaming'] = gemini_handler.streaming_stats()
+
+    report('analyze_symptoms', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Bulk triage throughput with a fake model (fixed cost per call plus a cost
+per patient): one call per report vs micro-batches of several sizes, on an
+upload with duplicate reports and a share of items dropped from responses.
+
+    cd backend && python -m benchmarks.bench_batch_triage --items 300
+"""
+import contextlib
+import io
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import gemini_handler
+from benchmarks.common import parse_args, report
+from benchmarks.fakes import FakeBatchModel
+
+# Vague reports that the rule fast path leaves to the model
+PHRASES = ['feeling unwell since {n} days', 'body ache and tiredness for {n} days', 'not eating well for {n} days',
+           'weakness and dizziness since {n} days', 'stomach upset for {n} days', 'pain in legs for {n} days']
+
+
+def build_upload(count, duplicate_rate, seed=0):
+    rng = random.Random(seed)
+    upload = []
+    for i in range(count):
+        if upload and rng.random() < duplicate_rate:
+            upload.append(rng.choice(upload))
+        else:
+            upload.append(rng.choice(PHRASES).format(n=i))
+    return upload
+
+
+def reset(args):
+    gemini_handler.model = FakeBatchModel(args.call_latency, args.item_latency, args.drop_rate)
+    gemini_handler.triage_cache.clear()
+    return gemini_handler.model
+
+
+def one_call_per_item(upload, args):
+    model = reset(args)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+        list(pool.map(gemini_handler.request_gemini_triage, upload))
+    elapsed = time.perf_counter() - start
+    return {
+        'model_calls': model.calls,
+        'seconds': round(elapsed, 3),
+        'items_per_second': round(len(upload) / elapsed, 1),
+        'items_per_model_call': 1.0
+    }
+
+
+def batched(upload, args, items_per_call):
+    reset(args)
+    results, stats = gemini_handler.analyze_symptoms_batch(
+        upload, items_per_call=items_per_call, max_parallel=args.parallel
+    )
+    assert len(results) == len(upload)
+    assert [result['index'] for result in results] == list(range(len(upload)))
+    return stats
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        items={'type': int, 'default': 300},
+        duplicate_rate={'type': float, 'default': 0.2},
+        drop_rate={'type': float, 'default': 0.02},
+        call_latency={'type': float, 'default': 0.3},
+        item_latency={'type': float, 'default': 0.02},
+        parallel={'type': int, 'default': 4},
+        batch_sizes={'default': '5,10,20,40'}
+    )
+    gemini_handler.GEMINI_API_KEY = 'benchmark'
+    gemini_handler.STREAMING = False
+    upload = build_upload(args.items, args.duplicate_rate)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = {'one_call_per_item': one_call_per_item(upload, args)}
+        for size in [int(value) for value in args.batch_sizes.split(',')]:
+            results[f'batch_{size}'] = batched(upload, args, size)
+    report('batch_triage', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
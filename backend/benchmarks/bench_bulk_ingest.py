@@ -0,0 +1,129 @@
+"""
+Onboarding a village roster, on a throwaway SQLite database (needs Django):
+
+  * per-row: register_user / set_medication_reminder once per patient, as
+    the app did before (one create_user + profile insert per request);
+  * bulk: one CSV upload to bulk_register_users / bulk_set_medication_reminders,
+    chunked bulk_create with password hashing in a thread pool, run with one
+    hashing thread and with BULK_HASH_WORKERS.
+
+A few rows in every upload are invalid, to check they are reported without
+failing the rest. --hasher md5 takes password cost out to show the database
+side; the default PBKDF2 is what production pays.
+
+    cd backend && python -m benchmarks.bench_bulk_ingest --rows 200,1000
+"""
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.bench_dashboard import APP, setup_django
+from benchmarks.common import parse_args, report
+
+HASHERS = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'md5': 'django.contrib.auth.hashers.MD5PasswordHasher'
+}
+
+
+def roster(size, tag, invalid_every):
+    patients, reminders = [], []
+    for i in range(size):
+        bad = invalid_every and i % invalid_every == invalid_every - 1
+        phone = f'+91{tag}{i:07d}'
+        patients.append({
+            'email': 'not-an-email' if bad else f'patient{tag}-{i}@example.com',
+            'password': f'secret-{i}', 'phone': phone, 'name': f'Patient {i}'
+        })
+        reminders.append({
+            'phone': phone, 'medicine_name': 'Metformin', 'dosage': '500mg',
+            'frequency': 'fortnightly' if bad else 'twice_daily', 'reminder_time': '09:00'
+        })
+    return patients, reminders
+
+
+def to_csv(rows):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue()
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        rows={'default': '200,1000', 'help': 'Roster sizes'},
+        hasher={'default': 'pbkdf2', 'choices': list(HASHERS)},
+        invalid_every={'type': int, 'default': 50, 'help': 'Every Nth row is invalid (0 for none)'}
+    )
+
+    workdir = tempfile.mkdtemp(prefix='bench-bulk-')
+    try:
+        setup_django(workdir, PASSWORD_HASHERS=[HASHERS[args.hasher]])
+        from django.test import RequestFactory
+        models = __import__(f'{APP}.models', fromlist=['models'])
+        views = __import__(f'{APP}.views', fromlist=['views'])
+
+        factory = RequestFactory()
+        staff = models.User.objects.create_user(username='asha', email='asha@example.com', password='x',
+                                                phone_number='+910000000000', is_staff=True)
+        pool_workers = views.BULK_HASH_WORKERS
+
+        def per_row(patients, reminders):
+            start = time.perf_counter()
+            for row in patients:
+                views.register_user(factory.post('/register', json.dumps(row), content_type='application/json'))
+            users = dict(models.User.objects.values_list('phone_number', 'id'))
+            for row in reminders:
+                if row['phone'] not in users:
+                    continue
+                request = factory.post('/reminders', json.dumps(row), content_type='application/json')
+                request.user = models.User(id=users[row['phone']])
+                try:
+                    views.set_medication_reminder(request)
+                except Exception:
+                    pass
+            return time.perf_counter() - start
+
+        def bulk(view, rows):
+            request = factory.post('/bulk', to_csv(rows), content_type='text/csv')
+            request.user = staff
+            return json.loads(view(request).content)
+
+        results = {'hasher': args.hasher, 'cpu_count': os.cpu_count(), 'hash_workers': pool_workers, 'runs': []}
+        for index, size in enumerate(int(value) for value in args.rows.split(',')):
+            run = {'rows': size}
+
+            patients, reminders = roster(size, f'{index}0', args.invalid_every)
+            elapsed = per_row(patients, reminders)
+            run['per_row'] = {'seconds': round(elapsed, 3), 'rows_per_second': round(2 * size / elapsed, 1)}
+
+            for label, workers, tag in (('bulk_1_thread', 1, f'{index}1'), ('bulk_pool', pool_workers, f'{index}2')):
+                views.BULK_HASH_WORKERS = workers
+                patients, reminders = roster(size, tag, args.invalid_every)
+                users = bulk(views.bulk_register_users, patients)
+                added = bulk(views.bulk_set_medication_reminders, reminders)
+                elapsed = users['seconds'] + added['seconds']
+                run[label] = {
+                    'seconds': round(elapsed, 3),
+                    'rows_per_second': round(2 * size / elapsed, 1),
+                    'users': {key: users[key] for key in ('created', 'failed', 'rows_per_second')},
+                    'reminders': {key: added[key] for key in ('created', 'failed', 'rows_per_second')}
+                }
+            views.BULK_HASH_WORKERS = pool_workers
+
+            run['speedup'] = round(run['bulk_pool']['rows_per_second'] / run['per_row']['rows_per_second'], 1)
+            results['runs'].append(run)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report('bulk_ingest', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""
+get_user_dashboard with thousands of triage sessions per user, on a
+throwaway SQLite database (needs Django installed):
+
+  * the previous view: full rows including the complete symptoms text,
+    truncation and get_frequency_display() in Python, no composite index;
+  * build_dashboard(): (patient, created_at) index, values() projection and
+    a symptoms preview cut in SQL;
+  * the cached view after the first request, and after a write invalidated it.
+
+Query counts are reported for each, to show they stay flat as history grows.
+
+    cd backend && python -m benchmarks.bench_dashboard --sessions 100,1000,5000
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, time as clock_time, timedelta, timezone
+
+from benchmarks.common import parse_args, report
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = 'swasthya_dashboard'
+
+
+def setup_django(workdir, **overrides):
+    """models.py / views.py are not in a Django project here: mount them as a temporary app"""
+    package = os.path.join(workdir, APP)
+    os.makedirs(package)
+    open(os.path.join(package, '__init__.py'), 'w').close()
+    for name in ('models.py', 'views.py'):
+        os.symlink(os.path.join(BACKEND_DIR, name), os.path.join(package, name))
+    sys.path.insert(0, workdir)
+
+    import django
+    from django.conf import settings
+    settings.configure(
+        DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': os.path.join(workdir, 'db.sqlite3')}},
+        INSTALLED_APPS=['django.contrib.contenttypes', 'django.contrib.auth', APP],
+        AUTH_USER_MODEL=f'{APP}.User',
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        USE_TZ=True,
+        DEFAULT_AUTO_FIELD='django.db.models.AutoField',
+        **overrides
+    )
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', run_syncdb=True, verbosity=0)
+
+
+def legacy_dashboard(user, TriageSession, MedicationReminder):
+    """The view body before projection, SQL-side truncation and caching"""
+    triage_sessions = TriageSession.objects.filter(patient=user).order_by('-created_at')[:10]
+    reminders = MedicationReminder.objects.filter(patient=user, is_active=True)
+    return {
+        'user': {'name': user.first_name, 'email': user.email, 'phone': user.phone_number},
+        'triage_history': [
+            {
+                'symptoms': session.symptoms[:100] + '...' if len(session.symptoms) > 100 else session.symptoms,
+                'severity': session.severity,
+                'date': session.created_at.strftime('%Y-%m-%d %H:%M'),
+                'session_id': session.session_id
+            }
+            for session in triage_sessions
+        ],
+        'active_reminders': [
+            {
+                'medicine_name': reminder.medicine_name,
+                'dosage': reminder.dosage,
+                'time': reminder.reminder_time.strftime('%H:%M'),
+                'frequency': reminder.get_frequency_display()
+            }
+            for reminder in reminders
+        ]
+    }
+
+
+def timed_queries(fn, repeats):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    latencies = []
+    with CaptureQueriesContext(connection) as captured:
+        fn()
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        'queries': len(captured.captured_queries),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 3),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 3)
+    }
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        sessions={'default': '100,1000,5000', 'help': 'Triage sessions per user'},
+        users={'type': int, 'default': 20, 'help': 'Users sharing the tables'},
+        symptoms_chars={'type': int, 'default': 2000, 'help': 'Length of each stored symptoms text'},
+        repeats={'type': int, 'default': 200}
+    )
+
+    workdir = tempfile.mkdtemp(prefix='bench-dashboard-')
+    try:
+        setup_django(workdir)
+        from django.core.cache import cache
+        from django.db import connection
+        from django.test import RequestFactory
+        models = __import__(f'{APP}.models', fromlist=['models'])
+        views = __import__(f'{APP}.views', fromlist=['views'])
+
+        rng = random.Random(0)
+        factory = RequestFactory()
+        results = []
+        start_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        for size in [int(value) for value in args.sessions.split(',')]:
+            models.TriageSession.objects.all().delete()
+            models.MedicationReminder.objects.all().delete()
+            models.User.objects.all().delete()
+            users = [
+                models.User.objects.create(username=f'user{size}-{i}', email=f'u{i}@example.com',
+                                           phone_number=f'+9198{size:04d}{i:04d}', first_name=f'User {i}')
+                for i in range(args.users)
+            ]
+            sessions = []
+            for user in users:
+                for i in range(size):
+                    sessions.append(models.TriageSession(
+                        patient=user, symptoms=('fever and cough ' * args.symptoms_chars)[:args.symptoms_chars],
+                        severity=rng.choice(['Emergency', 'OPD Visit', 'Self-care']), advice='Rest.', reasoning='Synthetic.',
+                        session_id=f'S{user.id}-{i}', created_at=start_at + timedelta(minutes=rng.randrange(10 ** 6))
+                    ))
+                for i in range(5):
+                    models.MedicationReminder.objects.create(
+                        patient=user, medicine_name=f'Medicine {i}', dosage='500mg',
+                        frequency=rng.choice(['once_daily', 'twice_daily', 'weekly']), reminder_time=clock_time(9, 0)
+                    )
+            models.TriageSession.objects.bulk_create(sessions, batch_size=2000)
+            user = users[len(users) // 2]
+
+            assert views.build_dashboard(user) == legacy_dashboard(user, models.TriageSession, models.MedicationReminder)
+
+            def view():
+                request = factory.get('/dashboard')
+                request.user = user
+                return views.get_user_dashboard(request)
+
+            optimized = timed_queries(lambda: views.build_dashboard(user), args.repeats)
+            cache.clear()
+            view()
+            cached = timed_queries(view, args.repeats)
+
+            # A new triage for this user must invalidate the cached dashboard
+            models.TriageSession.objects.create(patient=user, symptoms='new', severity='Self-care', advice='-',
+                                                reasoning='-', session_id=f'NEW{size}', created_at=start_at + timedelta(days=3650))
+            invalidated = b'"session_id": "NEW' in view().content
+
+            with connection.cursor() as cursor:
+                cursor.execute('DROP INDEX triage_patient_created_idx')
+            legacy = timed_queries(
+                lambda: legacy_dashboard(user, models.TriageSession, models.MedicationReminder), args.repeats
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(f'CREATE INDEX triage_patient_created_idx ON {APP}_triagesession (patient_id, created_at DESC)')
+
+            results.append({
+                'sessions_per_user': size,
+                'legacy_unindexed': legacy,
+                'optimized': optimized,
+                'cached_view': cached,
+                'invalidated_on_write': invalidated,
+                'speedup_p50': round(legacy['p50_ms'] / max(optimized['p50_ms'], 1e-6), 1)
+            })
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report('dashboard', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
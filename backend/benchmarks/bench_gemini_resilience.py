@@ -0,0 +1,128 @@
+"""
+Gemini call path under injected faults, with a local fake model:
+
+  * breaker: healthy -> outage (calls hang, then fail) -> recovered, with
+    and without the circuit breaker; time per request and calls that
+    reached the model in each phase.
+  * hedging: a model with a slow tail, with and without hedged requests.
+
+    cd backend && python -m benchmarks.bench_gemini_resilience
+"""
+import contextlib
+import io
+import threading
+import time
+
+import gemini_handler
+from admission_control import AdmissionController
+from benchmarks.common import parse_args, report
+from benchmarks.fakes import FaultyGenerativeModel
+from resilience import CircuitBreaker, Hedger
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else None
+
+
+def run_phase(model, seconds, threads, counter):
+    """Requests from `threads` callers for `seconds`; returns per-request latencies and fallbacks"""
+    latencies, fallbacks = [], []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def caller():
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            result = gemini_handler.analyze_symptoms(f"fever for {next(counter)} days")
+            with lock:
+                latencies.append(time.perf_counter() - start)
+                fallbacks.append(result.get('source') == 'fallback' or result == gemini_handler.FALLBACK_RESPONSE)
+
+    calls_before = model.calls
+    workers = [threading.Thread(target=caller) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return {
+        'requests': len(latencies),
+        'fallbacks': sum(fallbacks),
+        'model_calls': model.calls - calls_before,
+        'mean_ms': round(sum(latencies) / max(1, len(latencies)) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1) if latencies else None,
+        'breaker_state_after': gemini_handler.breaker.state
+    }
+
+
+def breaker_scenario(args, enabled):
+    model = FaultyGenerativeModel(latency=0.02, outage_latency=args.outage_latency)
+    gemini_handler.model = model
+    gemini_handler.hedger = None
+    gemini_handler.admission = AdmissionController(max_concurrency=args.threads, max_queue=args.threads)
+    # A breaker that can never trip stands in for "no breaker"
+    gemini_handler.breaker = CircuitBreaker(
+        failure_threshold=0.5 if enabled else 2.0, slow_call_seconds=1.0,
+        window=20, min_calls=5, open_seconds=args.open_seconds
+    )
+    counter = iter(range(10 ** 9))
+    phases = {}
+    phases['healthy'] = run_phase(model, args.phase_seconds, args.threads, counter)
+    model.outage = True
+    phases['outage'] = run_phase(model, args.outage_seconds, args.threads, counter)
+    model.outage = False
+    phases['recovered'] = run_phase(model, args.phase_seconds + args.open_seconds, args.threads, counter)
+    phases['breaker'] = gemini_handler.breaker.stats()
+    return phases
+
+
+def hedging_scenario(args, enabled):
+    model = FaultyGenerativeModel(latency=0.02, slow_rate=0.05, slow_latency=0.5, seed=3)
+    gemini_handler.model = model
+    gemini_handler.breaker = CircuitBreaker(slow_call_seconds=10)
+    gemini_handler.admission = AdmissionController(max_concurrency=64, max_queue=64)
+    gemini_handler.hedger = Hedger(min_delay=0.03, min_samples=20) if enabled else None
+    gemini_handler.triage_cache.clear()
+
+    latencies = []
+    for i in range(args.hedge_calls):
+        start = time.perf_counter()
+        gemini_handler.analyze_symptoms(f"cough for {i} hours")
+        latencies.append(time.perf_counter() - start)
+    return {
+        'calls': len(latencies),
+        'model_calls': model.calls,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 1),
+        'hedging': gemini_handler.hedger.stats() if enabled else None
+    }
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        threads={'type': int, 'default': 8},
+        phase_seconds={'type': float, 'default': 3.0},
+        outage_seconds={'type': float, 'default': 10.0},
+        outage_latency={'type': float, 'default': 1.0},
+        open_seconds={'type': float, 'default': 1.0},
+        hedge_calls={'type': int, 'default': 300}
+    )
+
+    gemini_handler.GEMINI_API_KEY = 'benchmark'
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = {
+            'breaker': {
+                'without_breaker': breaker_scenario(args, enabled=False),
+                'with_breaker': breaker_scenario(args, enabled=True),
+            },
+            'hedging': {
+                'without_hedging': hedging_scenario(args, enabled=False),
+                'with_hedging': hedging_scenario(args, enabled=True),
+            }
+        }
+    report('gemini_resilience', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
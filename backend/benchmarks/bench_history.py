@@ -0,0 +1,116 @@
+"""
+DataManager.save_triage_record as the history grows: latency of one save
+on top of an existing history of N records, synchronous and queued
+(background=True), against the old load/append/rewrite of
+triage_history.json as a baseline.
+
+    cd backend && python -m benchmarks.bench_history --sizes 0,10000,100000,1000000
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import parse_args, report
+from benchmarks.synthetic import generate_triage_records
+from data_manager import DataManager
+
+USER_DATA = {'phone': '+919876543210', 'location': {'lat': 28.61, 'lng': 77.21}, 'ayushman_card': True}
+RESULT = {'severity': 'OPD Visit', 'advice': 'See a doctor.', 'reasoning': 'Benchmark record.'}
+
+
+def summarize(latencies):
+    latencies = sorted(latencies)
+    return {
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 4),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 4)
+    }
+
+
+def seed_history(manager, count, chunk=50000):
+    for start in range(0, count, chunk):
+        records = generate_triage_records(min(chunk, count - start), seed=start)
+        for offset, record in enumerate(records):
+            record['session_id'] = f"SYN{start + offset:010d}"
+        manager.triage_store.append_many(records)
+
+
+def json_rewrite_save(path, record):
+    """The original save: read the whole history file, append, write it all back"""
+    history = []
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            history = json.load(f)
+    history.append(record)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        sizes={'default': '0,10000,100000,1000000'},
+        saves={'type': int, 'default': 500, 'help': 'Saves timed per size'},
+        json_max={'type': int, 'default': 100000, 'help': 'Largest history for the JSON rewrite baseline'}
+    )
+
+    results = []
+    cwd = os.getcwd()
+    for size in [int(value) for value in args.sizes.split(',')]:
+        workdir = tempfile.mkdtemp(prefix=f'bench-history-{size}-')
+        try:
+            # DataManager keeps its files under ./data
+            os.chdir(workdir)
+            manager = DataManager()
+            start = time.perf_counter()
+            seed_history(manager, size)
+            seed_seconds = time.perf_counter() - start
+
+            sync = []
+            for i in range(args.saves):
+                start = time.perf_counter()
+                manager.save_triage_record(USER_DATA, f'benchmark symptoms {i}', RESULT)
+                sync.append(time.perf_counter() - start)
+
+            queued = []
+            drain_start = time.perf_counter()
+            for i in range(args.saves):
+                start = time.perf_counter()
+                manager.save_triage_record(USER_DATA, f'benchmark symptoms {i}', RESULT, background=True)
+                queued.append(time.perf_counter() - start)
+            manager.history_writer.drain()
+            drain_seconds = time.perf_counter() - drain_start
+
+            result = {
+                'history_records': size,
+                'seed_seconds': round(seed_seconds, 2),
+                'sqlite_sync': summarize(sync),
+                'sqlite_queued': summarize(queued),
+                'queued_drain_seconds': round(drain_seconds, 3),
+                'records_after': manager.triage_store.count()
+            }
+
+            if size <= args.json_max:
+                path = os.path.join(workdir, 'triage_history.json')
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(generate_triage_records(size), f)
+                rewrite = []
+                for i in range(max(3, args.saves // 50)):
+                    record = {'timestamp': 'now', 'user_data': USER_DATA, 'symptoms': f'benchmark {i}',
+                              'triage_result': RESULT, 'session_id': f'JSON{i}'}
+                    start = time.perf_counter()
+                    json_rewrite_save(path, record)
+                    rewrite.append(time.perf_counter() - start)
+                result['json_rewrite'] = summarize(rewrite)
+
+            results.append(result)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report('history', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+HospitalFinder.find_nearest_hospitals at increasing dataset sizes, over
+synthetic data written in the backend/data schema:
+
+  * load + index build time, from JSON and from the compiled snapshot;
+  * query latency (p50/p99) for all hospitals and Ayushman-only, with half the
+    query points near a hospital and half anywhere in India;
+  * the old linear scan (distance to every hospital, sort) as a baseline.
+
+    cd backend && python -m benchmarks.bench_hospital_search --sizes 10,1000,100000,1000000
+"""
+import contextlib
+import gc
+import io
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from benchmarks.common import parse_args, report
+from benchmarks.synthetic import LAT_RANGE, LNG_RANGE, write_data_dir
+from data_snapshot import build_snapshot
+from hospital_finder import HospitalFinder
+
+
+def query_points(finder, count, seed=0):
+    rng = random.Random(seed)
+    points = []
+    for i in range(count):
+        if i % 2 == 0:
+            hospital = finder.hospitals[rng.randrange(len(finder.hospitals))]
+            points.append((hospital['lat'] + rng.uniform(-0.2, 0.2), hospital['lng'] + rng.uniform(-0.2, 0.2)))
+        else:
+            points.append((rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)))
+    return points
+
+
+def latency(run, points):
+    latencies = []
+    found = 0
+    for lat, lng in points:
+        start = time.perf_counter()
+        found += len(run(lat, lng))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        'p50_ms': round(latencies[len(latencies) // 2], 4),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 4),
+        'avg_results': round(found / len(points), 2)
+    }
+
+
+def linear_scan(finder, lat, lng, ayushman_only=False, max_distance_km=50, limit=10):
+    """The original implementation: distance to every hospital, filter, sort"""
+    eligible = []
+    for hospital in finder.hospitals:
+        if ayushman_only and not hospital.get('ayushman', False):
+            continue
+        distance = finder.calculate_distance(lat, lng, hospital['lat'], hospital['lng'])
+        if distance <= max_distance_km:
+            eligible.append((distance, hospital))
+    eligible.sort(key=lambda item: item[0])
+    return eligible[:limit]
+
+
+def load(data_dir):
+    gc.collect()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        finder = HospitalFinder(data_dir, strict=True)
+    return finder, time.perf_counter() - start
+
+
+def measure(finder, load_seconds, mode, size, args):
+    points = query_points(finder, args.queries)
+    result = {
+        'hospitals': size,
+        'mode': mode,
+        'load_seconds': round(load_seconds, 3),
+        'nearest': latency(lambda lat, lng: finder.find_nearest_hospitals(lat, lng), points),
+        'nearest_ayushman': latency(lambda lat, lng: finder.find_nearest_hospitals(lat, lng, True), points)
+    }
+    if mode == 'json' and size <= args.scan_max:
+        scan_points = points[:max(10, args.queries // 10)]
+        result['linear_scan'] = latency(lambda lat, lng: linear_scan(finder, lat, lng), scan_points)
+    return result
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        sizes={'default': '10,1000,100000,1000000'},
+        queries={'type': int, 'default': 500},
+        json_max={'type': int, 'default': 100000, 'help': 'Largest size also loaded from JSON (memory heavy)'},
+        scan_max={'type': int, 'default': 100000, 'help': 'Largest size for the linear-scan baseline'}
+    )
+
+    results = []
+    for size in [int(value) for value in args.sizes.split(',')]:
+        data_dir = tempfile.mkdtemp(prefix=f'bench-hospitals-{size}-')
+        try:
+            write_data_dir(data_dir, size)
+            os.environ['DATA_SNAPSHOT'] = '0'
+            if size <= args.json_max:
+                finder, seconds = load(data_dir)
+                results.append(measure(finder, seconds, 'json', size, args))
+                del finder
+
+            os.environ.pop('DATA_SNAPSHOT')
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_snapshot(data_dir)
+            finder, seconds = load(data_dir)
+            assert finder.snapshot is not None, 'snapshot was not picked up'
+            results.append(measure(finder, seconds, 'snapshot', size, args))
+            del finder
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    report('hospital_search', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Cost of the metrics/tracing instrumentation on the hot path:
+
+  * per-call overhead of timed() with METRICS_ENABLED on and off, against a bare loop;
+  * a sampled-out log_event() and a disabled verbose() print;
+  * a traced request through the Flask test client (/hospitals), on and off;
+  * rendering /metrics.
+
+    cd backend && python -m benchmarks.bench_metrics --iterations 200000
+"""
+import contextlib
+import io
+import time
+
+import metrics
+from benchmarks.common import parse_args, report
+
+
+def per_call_ns(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+def bare():
+    pass
+
+
+def with_timer():
+    with metrics.timed('bench'):
+        pass
+
+
+def sampled_out_event():
+    metrics.log_event('bench', value=1)
+
+
+def verbose_print():
+    metrics.verbose('bench message')
+
+
+def request_us(client, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/hospitals?lat=28.6&lng=77.2')
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        iterations={'type': int, 'default': 200000, 'help': 'Calls per micro-benchmark'},
+        requests={'type': int, 'default': 2000, 'help': 'HTTP requests per mode'}
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    client = app.app.test_client()
+
+    results = {'micro_ns': {}, 'request_us': {}}
+    baseline = per_call_ns(bare, args.iterations)
+    results['micro_ns']['bare_call'] = round(baseline, 1)
+
+    metrics.LOG_SAMPLE_RATE = 0.0
+    for enabled in (False, True):
+        metrics.METRICS_ENABLED = enabled
+        mode = 'enabled' if enabled else 'disabled'
+        results['micro_ns'][f'timed_{mode}'] = round(per_call_ns(with_timer, args.iterations) - baseline, 1)
+        results['micro_ns'][f'log_event_sampled_out_{mode}'] = round(per_call_ns(sampled_out_event, args.iterations) - baseline, 1)
+        client.get('/hospitals?lat=28.6&lng=77.2')
+        results['request_us'][mode] = round(request_us(client, args.requests), 1)
+    results['micro_ns']['verbose_off'] = round(per_call_ns(verbose_print, args.iterations) - baseline, 1)
+    results['request_us']['overhead'] = round(results['request_us']['enabled'] - results['request_us']['disabled'], 1)
+
+    start = time.perf_counter()
+    body = metrics.registry.render()
+    results['render'] = {
+        'ms': round((time.perf_counter() - start) * 1000, 3),
+        'bytes': len(body),
+        'series': sum(1 for line in body.splitlines() if line and not line.startswith('#'))
+    }
+
+    report('metrics', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Per-call overhead of the Gemini path with a stubbed model: rebuilding the
+model, configs and prompt on every call versus the shared client.
+
+    cd backend && python -m benchmarks.bench_model_reuse --calls 5000
+"""
+import contextlib
+import io
+import time
+
+import gemini_handler
+from benchmarks.common import parse_args, report
+from benchmarks.fakes import FakeGenerativeModel
+
+
+def per_call_rebuild(symptoms):
+    """What every call used to do before the model was shared"""
+    model = gemini_handler.build_model()
+    model.generate_content = FakeGenerativeModel().generate_content
+    prompt = f"{gemini_handler.PROMPT_PREFIX}{symptoms}{gemini_handler.PROMPT_SUFFIX}"
+    return model.generate_content(prompt)
+
+
+def time_calls(fn, calls):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(calls):
+            fn(f"fever and headache for {i % 7} days")
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    args = parse_args(__doc__, calls={'type': int, 'default': 5000})
+
+    rebuild_us = time_calls(per_call_rebuild, args.calls)
+
+    gemini_handler.model = FakeGenerativeModel()
+    shared_us = time_calls(
+        lambda symptoms: gemini_handler.get_model().generate_content(gemini_handler.build_prompt(symptoms)),
+        args.calls
+    )
+    full_path_us = time_calls(gemini_handler.request_gemini_triage, args.calls)
+
+    report('model_reuse', {
+        'calls': args.calls,
+        'rebuild_per_call_us': round(rebuild_us, 2),
+        'shared_model_per_call_us': round(shared_us, 2),
+        'request_gemini_triage_us': round(full_path_us, 2),
+        'speedup': round(rebuild_us / shared_us, 1)
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
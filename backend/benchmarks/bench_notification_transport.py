@@ -0,0 +1,71 @@
+"""
+Per-message latency of a new Twilio client per message (old behaviour)
+versus the shared pooled NotificationTransport, against a local stand-in.
+
+    cd backend && python -m benchmarks.bench_notification_transport --messages 300
+"""
+import time
+
+from twilio.rest import Client
+
+from benchmarks.common import parse_args, report
+from benchmarks.twilio_standin import TwilioStandIn
+from notification_transport import NotificationTransport
+
+ACCOUNT_SID = 'AC' + '0' * 32
+AUTH_TOKEN = 'benchmark-token'
+FROM_NUMBER = '+15005550006'
+
+
+def client_per_message(standin, count):
+    start = time.perf_counter()
+    for i in range(count):
+        client = Client(ACCOUNT_SID, AUTH_TOKEN)
+        client.api.base_url = standin.base_url
+        client.messages.create(body='Take your medicine', from_=FROM_NUMBER, to=f'+9198765{i:05d}')
+    return time.perf_counter() - start
+
+
+def shared_transport(standin, count):
+    transport = NotificationTransport(ACCOUNT_SID, AUTH_TOKEN, FROM_NUMBER, base_url=standin.base_url)
+    start = time.perf_counter()
+    for i in range(count):
+        transport.send('sms', f'+9198765{i:05d}', 'Take your medicine')
+    return time.perf_counter() - start
+
+
+def batched_transport(standin, count):
+    transport = NotificationTransport(ACCOUNT_SID, AUTH_TOKEN, FROM_NUMBER, base_url=standin.base_url)
+    messages = [{'to': f'+9198765{i:05d}', 'body': 'Take your medicine'} for i in range(count)]
+    start = time.perf_counter()
+    results = transport.send_many('sms', messages)
+    assert all(result['success'] for result in results)
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        messages={'type': int, 'default': 300},
+        latency={'type': float, 'default': 0.0, 'help': 'stand-in server latency (s)'}
+    )
+
+    results = {'messages': args.messages}
+    for name, fn in [('client_per_message', client_per_message),
+                     ('shared_transport', shared_transport),
+                     ('send_many', batched_transport)]:
+        with TwilioStandIn(latency=args.latency) as standin:
+            elapsed = fn(standin, args.messages)
+            results[name] = {
+                'per_message_ms': round(elapsed / args.messages * 1000, 3),
+                'tcp_connections': standin.connections
+            }
+
+    results['per_message_speedup'] = round(
+        results['client_per_message']['per_message_ms'] / results['shared_transport']['per_message_ms'], 2
+    )
+    report('notification_transport', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
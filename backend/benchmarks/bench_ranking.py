@@ -0,0 +1,106 @@
+"""
+Multi-criteria ranking: inverted filter indexes vs a full scan that filters
+and scores every hospital, across dataset sizes.
+
+    cd backend && python -m benchmarks.bench_ranking --sizes 1000,10000,100000
+"""
+import random
+import time
+
+from benchmarks.common import parse_args, report
+from benchmarks.synthetic import generate_hospitals
+from geo_index import GridIndex
+from hospital_finder import hospital_finder
+from hospital_ranking import ICU_BEDS_SATURATION, HospitalRanker, resolve_weights
+
+QUERIES = {
+    'ayushman_cardiology_icu': {'specialty': 'Cardiology', 'ayushman': True, 'icu': True},
+    'emergency_ambulance': {'emergency': True, 'ambulance': True},
+    'unfiltered': {},
+}
+
+
+def full_scan(hospitals, distance_fn, lat, lng, max_distance_km, limit, weights, specialty=None,
+              emergency=False, icu=False, ambulance=False, ayushman=False):
+    """The per-request way: lowercase and check every hospital, score, sort"""
+    scored = []
+    for position, hospital in enumerate(hospitals):
+        if specialty and specialty.lower() not in [s.lower() for s in hospital.get('specialties', [])]:
+            continue
+        if emergency and not hospital.get('emergency_services'):
+            continue
+        if icu and not hospital.get('icu_beds', 0) > 0:
+            continue
+        if ambulance and not hospital.get('ambulance_service'):
+            continue
+        if ayushman and not hospital.get('ayushman'):
+            continue
+        distance = distance_fn(lat, lng, hospital['lat'], hospital['lng'])
+        if distance > max_distance_km:
+            continue
+        score = (weights['distance'] * (1 - distance / max_distance_km)
+                 + weights['emergency'] * bool(hospital.get('emergency_services'))
+                 + weights['icu'] * min(1.0, hospital.get('icu_beds', 0) / ICU_BEDS_SATURATION)
+                 + weights['ambulance'] * bool(hospital.get('ambulance_service'))
+                 + weights['rating'] * hospital.get('rating', 2.5) / 5)
+        scored.append((-score, distance, position))
+    scored.sort()
+    return scored[:limit]
+
+
+def time_queries(run, points):
+    latencies = []
+    for lat, lng in points:
+        start = time.perf_counter()
+        run(lat, lng)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        'p50_ms': round(latencies[len(latencies) // 2], 4),
+        'p99_ms': round(latencies[int(len(latencies) * 0.99)], 4),
+    }
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        sizes={'default': '1000,10000,100000'},
+        queries={'type': int, 'default': 200},
+        radius={'type': float, 'default': 100}
+    )
+    distance_fn = hospital_finder.calculate_distance
+    weights = resolve_weights('emergency')
+    rng = random.Random(7)
+    points = [(rng.uniform(8, 35), rng.uniform(68, 97)) for _ in range(args.queries)]
+
+    results = []
+    for size in [int(value) for value in args.sizes.split(',')]:
+        hospitals = generate_hospitals(size)
+        start = time.perf_counter()
+        ranker = HospitalRanker(hospitals, GridIndex.from_hospitals(hospitals))
+        build_seconds = time.perf_counter() - start
+
+        for name, filters in QUERIES.items():
+            matches = ranker.filter_positions(**filters)
+            indexed = time_queries(
+                lambda lat, lng: ranker.rank(lat, lng, distance_fn, args.radius, 10, weights, **filters), points
+            )
+            scan = time_queries(
+                lambda lat, lng: full_scan(hospitals, distance_fn, lat, lng, args.radius, 10, weights, **filters),
+                points[:max(10, args.queries // 10)]
+            )
+            results.append({
+                'hospitals': size,
+                'query': name,
+                'index_build_seconds': round(build_seconds, 3),
+                'matching_hospitals': size if matches is None else len(matches),
+                'indexed': indexed,
+                'full_scan': scan,
+                'speedup_p50': round(scan['p50_ms'] / max(indexed['p50_ms'], 1e-6), 1)
+            })
+
+    report('ranking', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""
+Throughput of the production server (gunicorn.conf.py) as the worker count
+grows, each count in a fresh gunicorn with the fake Gemini model:
+
+  * hospitals: GET /hospitals with ranking filters, CPU bound, so it
+    should scale with worker processes up to the number of cores;
+  * triage: POST /triage against a fake model that waits on "the network",
+    bounded by threads and LLM admission slots more than by cores.
+
+The load generator runs on the same machine, so leave it some cores.
+
+    cd backend && python -m benchmarks.bench_serving --workers 1,2,4 --requests 2000
+"""
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.common import parse_args, report
+from benchmarks.load_test import SYMPTOMS, summarize
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_CONFIG = os.path.join(BACKEND_DIR, 'benchmarks', 'gunicorn_bench.conf.py')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers, args):
+    port = free_port()
+    env = dict(os.environ, **{
+        'WEB_CONCURRENCY': str(workers),
+        'GUNICORN_THREADS': str(args.threads),
+        'BIND': f'127.0.0.1:{port}',
+        'GEMINI_API_KEY': os.environ.get('GEMINI_API_KEY') or 'bench',
+        'BENCH_MODEL_LATENCY': str(args.model_latency),
+        'HOSPITAL_DATA_RELOAD_SECONDS': '0',
+        'ENABLE_REMINDER_SCHEDULER': '0',
+        'LOG_SAMPLE_RATE': '0'
+    })
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', BENCH_CONFIG],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(base_url + '/health', timeout=1).ok:
+                return process, base_url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'gunicorn with {workers} workers did not come up')
+
+
+def stop_server(process):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def hammer(send, count, concurrency):
+    local = threading.local()
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            ok = send(session, i).ok
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            errors += not ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(count)))
+    wall = time.perf_counter() - start
+    return dict(summarize(latencies), throughput_per_s=round(count / wall, 1), errors=errors)
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        workers={'default': '1,2,4', 'help': 'Worker counts to try'},
+        requests={'type': int, 'default': 2000},
+        concurrency={'type': int, 'default': 32},
+        threads={'type': int, 'default': 8, 'help': 'gthread threads per worker'},
+        model_latency={'type': float, 'default': 0.2, 'help': 'Fake Gemini time to first chunk (s)'}
+    )
+
+    rng = random.Random(0)
+    points = [(28.6139 + rng.uniform(-0.3, 0.3), 77.2090 + rng.uniform(-0.3, 0.3)) for _ in range(args.requests)]
+
+    def hospitals(session, i):
+        lat, lng = points[i]
+        return session.get(f'{base_url}/hospitals', params={
+            'lat': lat, 'lng': lng, 'emergency': '1', 'icu': '1', 'profile': 'emergency'
+        }, timeout=60)
+
+    def triage(session, i):
+        return session.post(f'{base_url}/triage', json={
+            'symptoms': f'{SYMPTOMS[i % len(SYMPTOMS)]}, case {i}',
+            'location': {'lat': points[i][0], 'lng': points[i][1]}
+        }, timeout=60)
+
+    results = {'cpu_count': os.cpu_count(), 'concurrency': args.concurrency, 'runs': []}
+    for workers in [int(value) for value in args.workers.split(',')]:
+        process, base_url = start_server(workers, args)
+        try:
+            results['runs'].append({
+                'workers': workers,
+                'hospitals': hammer(hospitals, args.requests, args.concurrency),
+                'triage': hammer(triage, max(1, args.requests // 4), args.concurrency)
+            })
+        finally:
+            stop_server(process)
+
+    first = results['runs'][0]
+    for run in results['runs']:
+        run['hospitals_speedup'] = round(run['hospitals']['throughput_per_s'] / first['hospitals']['throughput_per_s'], 2)
+        run['triage_speedup'] = round(run['triage']['throughput_per_s'] / first['triage']['throughput_per_s'], 2)
+
+    report('serving', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Session id stress benchmark: many threads and processes generating ids at
+once, checking for collisions and per-thread ordering.
+
+    cd backend && python -m benchmarks.bench_session_ids --per-worker 200000
+"""
+import multiprocessing
+import threading
+import time
+
+from benchmarks.common import parse_args, report
+from session_ids import session_id_generator
+
+
+def generate_in_threads(count, threads):
+    """Generate ids from several threads of this process; returns (ids, seconds, ordered)"""
+    results = [None] * threads
+
+    def worker(slot):
+        generate = session_id_generator.generate
+        results[slot] = [generate() for _ in range(count)]
+
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    start = time.perf_counter()
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    elapsed = time.perf_counter() - start
+
+    ordered = all(ids == sorted(ids) for ids in results)
+    return [session_id for ids in results for session_id in ids], elapsed, ordered
+
+
+def process_worker(args):
+    count, threads = args
+    ids, elapsed, ordered = generate_in_threads(count, threads)
+    return ids, elapsed, ordered
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        per_worker={'type': int, 'default': 200000, 'help': 'ids per thread'},
+        threads={'type': int, 'default': 4},
+        processes={'type': int, 'default': 4}
+    )
+
+    # Single thread throughput
+    ids, elapsed, ordered = generate_in_threads(args.per_worker, 1)
+    single_rate = len(ids) / elapsed
+
+    # Many processes x many threads, all ids pooled to check for collisions
+    start = time.perf_counter()
+    with multiprocessing.get_context('fork').Pool(args.processes) as pool:
+        outputs = pool.map(process_worker, [(args.per_worker, args.threads)] * args.processes)
+    total_elapsed = time.perf_counter() - start
+
+    all_ids = [session_id for ids, _, _ in outputs for session_id in ids]
+    collisions = len(all_ids) - len(set(all_ids))
+    per_process_rates = [len(ids) / elapsed for ids, elapsed, _ in outputs]
+
+    results = {
+        'single_thread_ids_per_sec': round(single_rate),
+        'single_thread_ordered': ordered,
+        'processes': args.processes,
+        'threads_per_process': args.threads,
+        'total_ids': len(all_ids),
+        'collisions': collisions,
+        'per_thread_ordered': all(ok for _, _, ok in outputs),
+        'per_process_ids_per_sec': [round(rate) for rate in per_process_rates],
+        'aggregate_ids_per_sec': round(len(all_ids) / total_elapsed)
+    }
+    report('session_ids', results, args.output)
+
+    if collisions:
+        raise SystemExit(f"{collisions} colliding session ids")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Cold start and memory: HospitalFinder from JSON vs from the memory-mapped
+snapshot, each measured in a fresh interpreter over a synthetic dataset.
+
+    cd backend && python -m benchmarks.bench_snapshot --hospitals 200000
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import parse_args, report
+from benchmarks.synthetic import write_data_dir
+from data_snapshot import build_snapshot
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a child process so each mode starts from a cold interpreter
+CHILD = """
+import json, sys, time
+
+def memory_mb():
+    # /proc rather than ru_maxrss, which Linux carries over from the parent across exec
+    values = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith(('VmRSS:', 'VmHWM:')):
+                name, kb = line.split()[:2]
+                values[name.rstrip(':')] = int(kb) / 1024
+    return values
+
+start = time.perf_counter()
+from hospital_finder import HospitalFinder
+finder = HospitalFinder(sys.argv[1])
+loaded = time.perf_counter() - start
+first = time.perf_counter()
+finder.find_nearest_hospitals(28.6, 77.2, max_distance_km=100)
+first_query = time.perf_counter() - first
+print(json.dumps({
+    'snapshot': finder.snapshot is not None,
+    'startup_seconds': loaded,
+    'first_query_ms': first_query * 1000,
+    'rss_mb': memory_mb().get('VmRSS'),
+    'peak_rss_mb': memory_mb().get('VmHWM')
+}))
+"""
+
+
+def measure(data_dir, snapshot, runs):
+    env = dict(os.environ, DATA_SNAPSHOT='1' if snapshot else '0')
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD, data_dir], cwd=BACKEND_DIR, env=env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    best = min(samples, key=lambda sample: sample['startup_seconds'])
+    best['runs'] = runs
+    return best
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        hospitals={'type': int, 'default': 200000},
+        runs={'type': int, 'default': 3}
+    )
+
+    data_dir = tempfile.mkdtemp(prefix='swasthya-snapshot-')
+    try:
+        write_data_dir(data_dir, args.hospitals)
+        manifest = build_snapshot(data_dir)
+        json_mode = measure(data_dir, snapshot=False, runs=args.runs)
+        snapshot_mode = measure(data_dir, snapshot=True, runs=args.runs)
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    report('snapshot', {
+        'hospitals': args.hospitals,
+        'strings': manifest['string_count'],
+        'json': json_mode,
+        'snapshot': snapshot_mode,
+        'startup_speedup': round(json_mode['startup_seconds'] / snapshot_mode['startup_seconds'], 2),
+        'rss_saved_mb': round(json_mode['rss_mb'] - snapshot_mode['rss_mb'], 1),
+        'peak_rss_saved_mb': round(json_mode['peak_rss_mb'] - snapshot_mode['peak_rss_mb'], 1)
+    }, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Streaming triage parsing, replayed from recorded chunk sequences (no network):
+
+  * checks the incremental parser against json.loads on every recording,
+    as recorded and re-chunked at random boundaries;
+  * measures time to first severity vs the full response for the
+    streaming path, and the non-streaming path for comparison.
+
+    cd backend && python -m benchmarks.bench_streaming --chunk-delay 0.04
+"""
+import contextlib
+import io
+import json
+import os
+import random
+import time
+
+import gemini_handler
+from benchmarks.common import parse_args, report
+from benchmarks.fakes import RecordedStreamModel
+from stream_parser import IncrementalJsonParser
+
+RECORDINGS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recorded_streams.json')
+
+
+def expected_fields(chunks):
+    text = ''.join(chunks)
+    return json.loads(text[text.index('{'):text.rindex('}') + 1])
+
+
+def check_parser(name, chunks, rechunkings, seed=0):
+    """Parse as recorded and re-chunked; raises AssertionError on any mismatch"""
+    expected = expected_fields(chunks)
+    text = ''.join(chunks)
+    rng = random.Random(seed)
+    variants = [chunks] + [
+        [text[i:i + size] for i, size in split_points(len(text), rng)] for _ in range(rechunkings)
+    ]
+    for variant in variants:
+        parser = IncrementalJsonParser()
+        emitted = {}
+        for chunk in variant:
+            emitted.update(parser.feed(chunk))
+        assert parser.complete, f"{name}: parser did not finish ({parser.error})"
+        assert parser.fields == expected, f"{name}: parsed {parser.fields!r}"
+        assert emitted == expected, f"{name}: emitted {emitted!r}"
+    return len(variants)
+
+
+def split_points(length, rng):
+    position = 0
+    while position < length:
+        size = rng.randint(1, 24)
+        yield position, size
+        position += size
+
+
+def time_call(request, chunks, args):
+    gemini_handler.model = RecordedStreamModel(chunks, args.first_chunk_delay, args.chunk_delay)
+    severity_at = []
+    start = time.perf_counter()
+    result = request('recorded symptoms', lambda severity: severity_at.append(time.perf_counter() - start))
+    total = time.perf_counter() - start
+    assert result is not None and result['severity'] == expected_fields(chunks)['severity']
+    return round(severity_at[0] * 1000, 1), round(total * 1000, 1)
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        first_chunk_delay={'type': float, 'default': 0.3, 'help': 'seconds before the first chunk'},
+        chunk_delay={'type': float, 'default': 0.04, 'help': 'seconds between later chunks'},
+        rechunkings={'type': int, 'default': 500}
+    )
+    with open(RECORDINGS, 'r', encoding='utf-8') as f:
+        recordings = json.load(f)
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name, chunks in recordings.items():
+            checked = check_parser(name, chunks, args.rechunkings)
+            severity_ms, stream_total_ms = time_call(gemini_handler.request_gemini_triage_stream, chunks, args)
+            blocking_severity_ms, blocking_total_ms = time_call(gemini_handler.request_gemini_triage, chunks, args)
+            results[name] = {
+                'chunks': len(chunks),
+                'parser_variants_checked': checked,
+                'stream_first_severity_ms': severity_ms,
+                'stream_total_ms': stream_total_ms,
+                'blocking_first_severity_ms': blocking_severity_ms,
+                'blocking_total_ms': blocking_total_ms,
+            }
+    report('streaming', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
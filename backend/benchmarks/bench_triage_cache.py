@@ -0,0 +1,70 @@
+"""
+Triage cache hit-rate benchmark with a fake model (no network).
+Replays a skewed workload of common symptom phrasings through analyze_symptoms.
+
+    cd backend && python -m benchmarks.bench_triage_cache --requests 2000
+"""
+import random
+import time
+
+import gemini_handler
+from benchmarks.common import parse_args, report
+from benchmarks.fakes import FakeGeminiTriage
+from triage_cache import TriageCache
+
+PHRASES = [
+    ['fever', 'headache'],
+    ['cough', 'cold', 'sore throat'],
+    ['stomach ache', 'vomiting'],
+    ['body ache', 'tiredness'],
+    ['chest pain', 'sweating'],
+    ['rash', 'itching'],
+    ['back pain'],
+    ['difficulty breathing'],
+]
+
+
+def phrasing(tokens, rng):
+    """Same symptoms, different surface form: case, punctuation, spacing (word order matters)"""
+    joiner = rng.choice([', ', ' ', ' , ', ';  '])
+    text = joiner.join(tokens)
+    if rng.random() < 0.5:
+        text = text.upper()
+    return text + rng.choice(['', '.', '!', '  '])
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        requests={'type': int, 'default': 2000},
+        latency={'type': float, 'default': 0.002, 'help': 'fake model latency (s)'},
+        emergency_ttl={'type': float, 'default': 0}
+    )
+    rng = random.Random(42)
+    fake = FakeGeminiTriage(latency=args.latency)
+
+    gemini_handler.GEMINI_API_KEY = gemini_handler.GEMINI_API_KEY or 'benchmark'
+    gemini_handler.request_gemini_triage = fake
+    gemini_handler.STREAMING = False
+    gemini_handler.triage_cache = TriageCache('benchmark', emergency_ttl=args.emergency_ttl)
+
+    # Zipf-like popularity: a few symptom sets dominate real traffic
+    weights = [1 / (rank + 1) for rank in range(len(PHRASES))]
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        tokens = rng.choices(PHRASES, weights)[0]
+        gemini_handler.analyze_symptoms(phrasing(tokens, rng), rng.choice(['en', 'hi']))
+    elapsed = time.perf_counter() - start
+
+    results = gemini_handler.triage_cache.stats()
+    results.update({
+        'requests': args.requests,
+        'model_calls': fake.calls,
+        'avg_latency_ms': round(elapsed / args.requests * 1000, 3),
+        'uncached_latency_ms': args.latency * 1000
+    })
+    report('triage_cache', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import json
+import platform
+import sys
+import time
+
+
+def parse_args(description, **extra):
+    """Shared CLI: every benchmark accepts --output for a JSON results file"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--output', help='Write JSON results to this file')
+    for name, options in extra.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", **options)
+    return parser.parse_args()
+
+
+def report(name, results, output=None):
+    """Print results as JSON (and optionally save them) so runs can be diffed"""
+    payload = {
+        'benchmark': name,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': results
+    }
+    text = json.dumps(payload, indent=2)
+    print(text)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    return payload
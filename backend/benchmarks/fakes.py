@@ -0,0 +1,240 @@
+import time
+
+
+class FakeGeminiTriage:
+    """Deterministic stand-in for the Gemini triage call, with fixed latency"""
+
+    def __init__(self, latency=0.05):
+        self.latency = latency
+        self.calls = 0
+
+    def __call__(self, symptoms, *args, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        text = symptoms.lower()
+        if 'chest pain' in text or 'breathing' in text:
+            severity = 'Emergency'
+        elif 'fever' in text or 'cough' in text:
+            severity = 'OPD Visit'
+        else:
+            severity = 'Self-care'
+        return {
+            'severity': severity,
+            'advice': f'Fake advice for {severity}',
+            'reasoning': 'Deterministic fake model'
+        }
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Stand-in for genai.GenerativeModel: returns canned JSON, optionally after a delay"""
+
+    def __init__(self, *args, latency=0, **kwargs):
+        self.calls = 0
+        self.latency = latency
+
+    TEXT = ('```json\n{"severity": "OPD Visit", "advice": "See a doctor.", '
+            '"reasoning": "Fake model response."}\n```')
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if stream:
+            return [FakeResponse(self.TEXT[i:i + 16]) for i in range(0, len(self.TEXT), 16)]
+        return FakeResponse(self.TEXT)
+
+    def count_tokens(self, prompt):
+        return {'total_tokens': len(prompt.split())}
+
+
+class FakeBatchModel(FakeGenerativeModel):
+    """
+    Answers multi-patient prompts: reads the patient array out of the prompt
+    and returns one result per id (minus drop_rate of them, to exercise the
+    retry path). Latency is a fixed cost plus a cost per patient.
+    """
+
+    def __init__(self, call_latency=0.3, item_latency=0.02, drop_rate=0.0, seed=0):
+        import random
+        import threading
+        super().__init__()
+        self.call_latency = call_latency
+        self.item_latency = item_latency
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.triage = FakeGeminiTriage(latency=0)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        import json
+        with self.lock:
+            self.calls += 1
+        marker = 'PATIENTS (JSON array of {"id": ..., "symptoms": ...}): '
+        if marker not in prompt:
+            time.sleep(self.call_latency + self.item_latency)
+            return [FakeResponse(self.TEXT)] if stream else FakeResponse(self.TEXT)
+
+        start = prompt.index(marker) + len(marker)
+        patients, _ = json.JSONDecoder().raw_decode(prompt[start:])
+        time.sleep(self.call_latency + self.item_latency * len(patients))
+        results = []
+        for patient in patients:
+            with self.lock:
+                dropped = self.random.random() < self.drop_rate
+            if not dropped:
+                results.append(dict(self.triage(patient['symptoms']), id=patient['id']))
+        return FakeResponse('```json\n' + json.dumps({'results': results}) + '\n```')
+
+
+class DeterministicTriageModel(FakeGenerativeModel):
+    """
+    Gemini stand-in whose answer depends on the symptoms in the prompt (same
+    rules as FakeGeminiTriage), so repeated runs classify identically. Takes
+    `latency` before the first chunk and `chunk_latency` between streamed chunks.
+    """
+
+    MARKER = 'PATIENT SYMPTOMS: '
+
+    def __init__(self, latency=0.05, chunk_latency=0.0, chunk_size=24):
+        import threading
+        super().__init__(latency=latency)
+        self.chunk_latency = chunk_latency
+        self.chunk_size = chunk_size
+        self.triage = FakeGeminiTriage(latency=0)
+        self.lock = threading.Lock()
+
+    def answer(self, prompt):
+        import json
+        start = prompt.find(self.MARKER)
+        symptoms = prompt[start + len(self.MARKER):].split('\n\n', 1)[0] if start >= 0 else prompt
+        return json.dumps(self.triage(symptoms))
+
+    def stream(self, text):
+        for i in range(0, len(text), self.chunk_size):
+            if i and self.chunk_latency:
+                time.sleep(self.chunk_latency)
+            yield FakeResponse(text[i:i + self.chunk_size])
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        with self.lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        text = self.answer(prompt)
+        if stream:
+            return self.stream(text)
+        # A blocking call returns once the whole answer has been generated
+        chunks = -(-len(text) // self.chunk_size)
+        if self.chunk_latency and chunks > 1:
+            time.sleep(self.chunk_latency * (chunks - 1))
+        return FakeResponse(text)
+
+
+class RecordedStreamModel:
+    """
+    Replays a recorded chunk sequence the way generate_content(stream=True)
+    yields it: first_chunk_delay before the first chunk, chunk_delay between
+    the rest. Without stream=True it returns the joined text after the same
+    total time.
+    """
+
+    def __init__(self, chunks, first_chunk_delay=0.0, chunk_delay=0.0):
+        self.chunks = chunks
+        self.first_chunk_delay = first_chunk_delay
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+
+    def stream(self):
+        for i, text in enumerate(self.chunks):
+            time.sleep(self.first_chunk_delay if i == 0 else self.chunk_delay)
+            yield FakeResponse(text)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        if stream:
+            return self.stream()
+        return FakeResponse(''.join(chunk.text for chunk in self.stream()))
+
+
+class FaultyGenerativeModel(FakeGenerativeModel):
+    """
+    FakeGenerativeModel with injected faults: a share of calls that raise,
+    a share that stall (slow tail), and an outage switch where every call
+    hangs for outage_latency and then raises.
+    """
+
+    def __init__(self, latency=0.05, error_rate=0.0, slow_rate=0.0, slow_latency=1.0,
+                 outage_latency=2.0, seed=0):
+        import random
+        import threading
+        super().__init__(latency=latency)
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.outage_latency = outage_latency
+        self.outage = False
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def generate_content(self, prompt, **kwargs):
+        if self.outage:
+            self.calls += 1
+            time.sleep(self.outage_latency)
+            raise ConnectionError('fake Gemini outage')
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.error_rate:
+            self.calls += 1
+            raise ConnectionError('fake Gemini error')
+        if roll < self.error_rate + self.slow_rate:
+            time.sleep(self.slow_latency)
+        return super().generate_content(prompt, **kwargs)
+
+
+class FakeTwilioError(Exception):
+    def __init__(self, status, message='fake twilio error'):
+        super().__init__(message)
+        self.status = status
+
+
+class FakeMessage:
+    def __init__(self, sid):
+        self.sid = sid
+        self.status = 'queued'
+
+
+class FakeTwilioClient:
+    """
+    Local stand-in for twilio.rest.Client with configurable latency and a
+    fraction of transient (HTTP 503) failures. `failures` scripts errors per
+    number: {to: [503, 503]} fails the first two sends to `to`, then succeeds.
+    """
+
+    def __init__(self, latency=0.0, transient_failure_rate=0.0, seed=0, failures=None):
+        import random
+        import threading
+        self.latency = latency
+        self.transient_failure_rate = transient_failure_rate
+        self.failures = {to: list(statuses) for to, statuses in (failures or {}).items()}
+        self.attempts = []
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sent = []
+        self.messages = self
+
+    def create(self, body, from_, to):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.attempts.append(to)
+            if self.failures.get(to):
+                raise FakeTwilioError(self.failures[to].pop(0))
+            if self.random.random() < self.transient_failure_rate:
+                raise FakeTwilioError(503)
+            self.sent.append((from_, to, body))
+            return FakeMessage(f"SM{len(self.sent):032d}")
@@ -0,0 +1,20 @@
+"""
+gunicorn.conf.py plus the deterministic fake Gemini model in every worker,
+for benchmarks.bench_serving (no network or API key needed).
+"""
+import os
+import runpy
+
+globals().update(runpy.run_path(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                             'gunicorn.conf.py')))
+serve_post_fork = post_fork
+
+
+def post_fork(server, worker):
+    serve_post_fork(server, worker)
+    import gemini_handler
+    from benchmarks.fakes import DeterministicTriageModel
+    gemini_handler.model = DeterministicTriageModel(
+        float(os.getenv('BENCH_MODEL_LATENCY', '0.2')),
+        float(os.getenv('BENCH_CHUNK_LATENCY', '0.01'))
+    )
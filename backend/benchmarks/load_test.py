@@ -0,0 +1,198 @@
+"""
+End-to-end load generator for the Flask API over real HTTP.
+
+By default the app is served in-process with werkzeug, with the Gemini
+model replaced by the deterministic fake and Twilio pointed at the local
+stand-in, so no network or credentials are needed. Pass --url to drive a
+server that is already running instead (its Gemini/Twilio setup is then
+whatever that server uses).
+
+Traffic is a mix of POST /triage (a pool of symptom texts, some repeated
+so the cache sees hits) and POST /api/send-bulk-sms; bulk jobs are polled
+until every message has reached the stand-in.
+
+    cd backend && python -m benchmarks.load_test --requests 1000 --concurrency 16 --sms-share 0.05
+"""
+import contextlib
+import io
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.common import parse_args, report
+from benchmarks.fakes import DeterministicTriageModel
+from benchmarks.twilio_standin import TwilioStandIn
+
+SYMPTOMS = ['chest pain and sweating', 'fever and cough for two days', 'mild headache', 'difficulty breathing',
+            'runny nose and sneezing', 'stomach ache after food', 'back pain', 'itchy rash on arms']
+
+
+def summarize(latencies):
+    if not latencies:
+        return None
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 2),
+        'p99_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2)
+    }
+
+
+def start_local_server(args, standin):
+    """Import the app against the stand-ins and serve it on an ephemeral port"""
+    os.environ.update({
+        'GEMINI_API_KEY': os.environ.get('GEMINI_API_KEY') or 'load-test',
+        'TWILIO_ACCOUNT_SID': 'AC' + '0' * 32,
+        'TWILIO_AUTH_TOKEN': 'load-test-token',
+        'TWILIO_PHONE_NUMBER': '+15005550006',
+        'TWILIO_API_BASE_URL': standin.base_url,
+        'SMS_RATE_PER_SENDER': str(args.sms_rate),
+        'HOSPITAL_DATA_RELOAD_SECONDS': '0',
+        'LOG_SAMPLE_RATE': os.environ.get('LOG_SAMPLE_RATE', '0')
+    })
+    from werkzeug.serving import make_server
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+        import gemini_handler
+    gemini_handler.model = DeterministicTriageModel(args.model_latency, args.chunk_latency)
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}", gemini_handler.model
+
+
+def build_plan(args):
+    rng = random.Random(args.seed)
+    plan = []
+    for i in range(args.requests):
+        if rng.random() < args.sms_share:
+            numbers = [f"+9198{rng.randint(0, 99999999):08d}" for _ in range(args.sms_batch)]
+            plan.append(('bulk_sms', {'phone_numbers': numbers, 'message': 'Health camp tomorrow at 10 AM'}))
+        else:
+            text = rng.choice(SYMPTOMS)
+            if rng.random() >= args.repeat_share:
+                text = f"{text}, case {i}"
+            plan.append(('triage', {
+                'symptoms': text,
+                'language': 'en',
+                'ayushman_card': rng.random() < 0.5,
+                'location': {'lat': 28.6139 + rng.uniform(-0.2, 0.2), 'lng': 77.2090 + rng.uniform(-0.2, 0.2)},
+                'user_phone': f"+9198{rng.randint(0, 99999999):08d}"
+            }))
+    return plan
+
+
+def drive(base_url, plan, concurrency):
+    local = threading.local()
+    latencies = {'triage': [], 'bulk_sms': []}
+    statuses = {}
+    job_ids = []
+    lock = threading.Lock()
+
+    def one(step):
+        kind, payload = step
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        path = '/triage' if kind == 'triage' else '/api/send-bulk-sms'
+        start = time.perf_counter()
+        try:
+            response = session.post(base_url + path, json=payload, timeout=60)
+            status = response.status_code
+        except requests.RequestException as e:
+            response, status = None, type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[kind].append(elapsed)
+            statuses[f"{kind}:{status}"] = statuses.get(f"{kind}:{status}", 0) + 1
+            if kind == 'bulk_sms' and status == 202:
+                job_ids.append(response.json()['job_id'])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, plan))
+    return time.perf_counter() - start, latencies, statuses, job_ids
+
+
+def wait_for_jobs(base_url, job_ids, timeout):
+    deadline = time.monotonic() + timeout
+    pending = list(job_ids)
+    totals = {'sent': 0, 'failed': 0, 'unfinished': 0}
+    with requests.Session() as session:
+        while pending:
+            job = session.get(f"{base_url}/api/send-bulk-sms/{pending[0]}", timeout=10).json()
+            if job.get('status') == 'completed':
+                totals['sent'] += job['sent']
+                totals['failed'] += job['failed']
+                pending.pop(0)
+            elif time.monotonic() >= deadline:
+                totals['unfinished'] = len(pending)
+                break
+            else:
+                time.sleep(0.05)
+    return totals
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        url={'help': 'Drive this running server instead of an in-process one'},
+        requests={'type': int, 'default': 1000},
+        concurrency={'type': int, 'default': 16},
+        sms_share={'type': float, 'default': 0.05, 'help': 'Share of requests that are bulk SMS'},
+        sms_batch={'type': int, 'default': 20, 'help': 'Recipients per bulk SMS request'},
+        sms_rate={'type': float, 'default': 1000, 'help': 'SMS per second per sender (in-process server)'},
+        repeat_share={'type': float, 'default': 0.3, 'help': 'Share of triage texts drawn from a small repeated pool'},
+        model_latency={'type': float, 'default': 0.2, 'help': 'Fake Gemini time to first chunk (s)'},
+        chunk_latency={'type': float, 'default': 0.01, 'help': 'Fake Gemini time between chunks (s)'},
+        twilio_latency={'type': float, 'default': 0.02, 'help': 'Stand-in Twilio latency (s)'},
+        job_timeout={'type': float, 'default': 120},
+        seed={'type': int, 'default': 0}
+    )
+
+    plan = build_plan(args)
+    with TwilioStandIn(latency=args.twilio_latency) as standin:
+        server = model = None
+        base_url = args.url
+        if base_url is None:
+            server, base_url, model = start_local_server(args, standin)
+        try:
+            requests.get(base_url + '/health', timeout=10).raise_for_status()
+            wall, latencies, statuses, job_ids = drive(base_url, plan, args.concurrency)
+            jobs_start = time.perf_counter()
+            delivery = wait_for_jobs(base_url, job_ids, args.job_timeout)
+            delivery['seconds_after_load'] = round(time.perf_counter() - jobs_start, 2)
+
+            results = {
+                'target': 'in-process' if server else base_url,
+                'requests': len(plan),
+                'concurrency': args.concurrency,
+                'wall_seconds': round(wall, 2),
+                'throughput_per_s': round(len(plan) / wall, 1),
+                'triage': summarize(latencies['triage']),
+                'bulk_sms': summarize(latencies['bulk_sms']),
+                'statuses': statuses,
+                'sms_delivery': delivery
+            }
+            if server is not None:
+                results['model_calls'] = model.calls
+                results['twilio_messages'] = len(standin.messages)
+                results['twilio_connections'] = standin.connections
+        finally:
+            if server is not None:
+                server.shutdown()
+
+    report('load_test', results, args.output)
+
+
+if __name__ == '__main__':
+    main()
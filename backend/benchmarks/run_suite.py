@@ -0,0 +1,91 @@
+"""
+Run the benchmark suite, each benchmark in its own interpreter, and write
+one combined JSON file so runs can be compared for regressions.
+
+    cd backend && python -m benchmarks.run_suite --output results.json
+    cd backend && python -m benchmarks.run_suite --quick --only hospital_search,history
+
+--quick uses small sizes (a couple of minutes in total); the default
+profile covers the full 10 / 1k / 100k / 1M hospital range.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import parse_args, report
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (module, full profile args, quick profile args)
+SUITE = {
+    'hospital_search': ('bench_hospital_search', ['--sizes', '10,1000,100000,1000000'],
+                        ['--sizes', '10,1000,10000', '--queries', '200']),
+    'ranking': ('bench_ranking', ['--sizes', '1000,10000,100000'],
+                ['--sizes', '1000,10000', '--queries', '100']),
+    'snapshot': ('bench_snapshot', ['--hospitals', '200000'], ['--hospitals', '20000']),
+    'history': ('bench_history', ['--sizes', '0,10000,100000,1000000'],
+                ['--sizes', '0,10000', '--saves', '200']),
+    'analytics': ('bench_analytics', ['--sizes', '10000,100000,1000000'],
+                  ['--sizes', '10000,100000', '--repeats', '10']),
+    'analyze_symptoms': ('bench_analyze_symptoms', ['--requests', '400'], ['--requests', '100']),
+    'triage_cache': ('bench_triage_cache', ['--requests', '2000'], ['--requests', '500']),
+    'batch_triage': ('bench_batch_triage', ['--items', '300'], ['--items', '60']),
+    'streaming': ('bench_streaming', [], ['--chunk-delay', '0.005']),
+    'admission': ('bench_admission', [], ['--requests', '60']),
+    'gemini_resilience': ('bench_gemini_resilience', [], []),
+    'notification_transport': ('bench_notification_transport', ['--messages', '300'], ['--messages', '50']),
+    'metrics': ('bench_metrics', [], ['--iterations', '50000', '--requests', '300']),
+    'load_test': ('load_test', ['--requests', '2000'], ['--requests', '200']),
+    'serving': ('bench_serving', ['--workers', '1,2,4'], ['--workers', '1,2', '--requests', '300']),
+}
+
+
+def run_one(module, extra_args, timeout):
+    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+        output = f.name
+    start = time.perf_counter()
+    try:
+        completed = subprocess.run(
+            [sys.executable, '-m', f'benchmarks.{module}', '--output', output] + extra_args,
+            cwd=BACKEND_DIR, capture_output=True, text=True, timeout=timeout
+        )
+        elapsed = round(time.perf_counter() - start, 1)
+        if completed.returncode != 0:
+            return {'ok': False, 'seconds': elapsed, 'error': completed.stderr.strip()[-2000:]}
+        with open(output, 'r', encoding='utf-8') as f:
+            return {'ok': True, 'seconds': elapsed, 'results': json.load(f)['results']}
+    except subprocess.TimeoutExpired:
+        return {'ok': False, 'seconds': timeout, 'error': f'timed out after {timeout}s'}
+    finally:
+        os.unlink(output)
+
+
+def main():
+    args = parse_args(
+        __doc__,
+        only={'help': f"Comma-separated subset of: {','.join(SUITE)}"},
+        quick={'action': 'store_true', 'help': 'Small sizes for a fast smoke run'},
+        timeout={'type': float, 'default': 1800, 'help': 'Per-benchmark timeout (s)'}
+    )
+    names = args.only.split(',') if args.only else list(SUITE)
+    unknown = [name for name in names if name not in SUITE]
+    if unknown:
+        sys.exit(f"Unknown benchmarks: {', '.join(unknown)}")
+
+    results = {'profile': 'quick' if args.quick else 'full', 'benchmarks': {}}
+    for name in names:
+        module, full_args, quick_args = SUITE[name]
+        print(f"Running {name}...", file=sys.stderr)
+        results['benchmarks'][name] = run_one(module, quick_args if args.quick else full_args, args.timeout)
+    results['failed'] = [name for name, result in results['benchmarks'].items() if not result['ok']]
+
+    report('suite', results, args.output)
+    if results['failed']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
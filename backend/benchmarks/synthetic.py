@@ -0,0 +1,108 @@
+"""
+Synthetic datasets with the same schema as backend/data/*.json, for
+benchmarks at sizes the real files don't reach.
+"""
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+SPECIALTIES = ['Cardiology', 'Neurology', 'Emergency', 'General Medicine', 'Surgery', 'Pediatrics',
+               'Orthopedics', 'Oncology', 'Gynecology', 'Nephrology', 'Pulmonology', 'Dermatology']
+TYPES = ['Government', 'Private', 'Trust', 'Community Health Centre']
+STATES = ['DEL', 'UP', 'BR', 'MH', 'KA', 'TN', 'WB', 'RJ', 'GJ', 'PB']
+LANGUAGES = ['hi', 'en', 'hi', 'bn', 'ta', 'mr']
+
+# India's rough bounding box
+LAT_RANGE = (8.0, 35.0)
+LNG_RANGE = (68.0, 97.0)
+
+
+def generate_hospitals(count, seed=0):
+    rng = random.Random(seed)
+    hospitals = []
+    for hospital_id in range(1, count + 1):
+        emergency = rng.random() < 0.6
+        hospitals.append({
+            'id': hospital_id,
+            'name': f"Hospital {hospital_id}",
+            'type': rng.choice(TYPES),
+            'address': f"{rng.randint(1, 999)} Main Road, District {rng.randint(1, 700)}",
+            'lat': round(rng.uniform(*LAT_RANGE), 4),
+            'lng': round(rng.uniform(*LNG_RANGE), 4),
+            'phone': f"+91-{rng.randint(10, 99)}-{rng.randint(10000000, 99999999)}",
+            'emergency_services': emergency,
+            'opd_timing': rng.choice(['8:00 AM - 4:00 PM', '9:00 AM - 1:00 PM', '24 Hours']),
+            'specialties': rng.sample(SPECIALTIES, rng.randint(1, 5)),
+            'ayushman': rng.random() < 0.5,
+            'beds': rng.randint(10, 2500),
+            'icu_beds': rng.randint(0, 150) if emergency else 0,
+            'ambulance_service': rng.random() < 0.7,
+            'rating': round(rng.uniform(2.5, 5.0), 1)
+        })
+    return hospitals
+
+
+def generate_empanelments(hospitals, seed=0):
+    rng = random.Random(seed + 1)
+    empanelments = []
+    for hospital in hospitals:
+        if not hospital['ayushman']:
+            continue
+        start = datetime(2023, 1, 1) + timedelta(days=rng.randint(0, 700))
+        empanelments.append({
+            'hospital_id': hospital['id'],
+            'empanelment_id': f"AB-PMJAY-{rng.choice(STATES)}-{hospital['id']:06d}",
+            'empanelment_date': start.strftime('%Y-%m-%d'),
+            'valid_until': (start + timedelta(days=rng.randint(365, 1500))).strftime('%Y-%m-%d'),
+            'package_rates': {
+                'general_medicine': rng.randint(2000, 6000),
+                'normal_delivery': rng.randint(6000, 12000)
+            },
+            'claims_processed': rng.randint(0, 5000),
+            'success_rate': round(rng.uniform(80, 99), 1)
+        })
+    return empanelments
+
+
+def generate_triage_records(count, seed=0):
+    rng = random.Random(seed + 2)
+    severities = ['Emergency', 'OPD Visit', 'Self-care']
+    start = datetime(2025, 10, 1)
+    records = []
+    for i in range(count):
+        records.append({
+            'timestamp': (start + timedelta(seconds=i * 37)).isoformat(),
+            'user_data': {
+                'phone': f"+9198765{rng.randint(0, 99999):05d}" if rng.random() < 0.5 else '',
+                'location': {'lat': rng.uniform(*LAT_RANGE), 'lng': rng.uniform(*LNG_RANGE)},
+                'ayushman_card': rng.random() < 0.5,
+                'language': LANGUAGES[i % len(LANGUAGES)]
+            },
+            'symptoms': rng.choice(['fever and headache', 'cough for 3 days', 'chest pain', 'mild cold']),
+            'triage_result': {
+                'severity': rng.choice(severities),
+                'advice': 'Synthetic advice',
+                'reasoning': 'Synthetic reasoning'
+            },
+            'session_id': f"SYN{i:010d}"
+        })
+    return records
+
+
+def write_data_dir(path, hospital_count, seed=0):
+    """Write hospitals.json / ayushman_hospitals.json (+ copies of reference files)"""
+    os.makedirs(path, exist_ok=True)
+    hospitals = generate_hospitals(hospital_count, seed)
+    with open(os.path.join(path, 'hospitals.json'), 'w', encoding='utf-8') as f:
+        json.dump({'hospitals': hospitals}, f)
+    with open(os.path.join(path, 'ayushman_hospitals.json'), 'w', encoding='utf-8') as f:
+        json.dump({'ayushman_empaneled': generate_empanelments(hospitals, seed)}, f)
+
+    real_data = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+    for name in ('symptoms_db.json', 'medications.json'):
+        source = os.path.join(real_data, name)
+        if os.path.exists(source):
+            with open(source, 'rb') as src, open(os.path.join(path, name), 'wb') as dst:
+                dst.write(src.read())
+    return path
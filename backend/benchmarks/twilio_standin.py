@@ -0,0 +1,75 @@
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class TwilioStandIn:
+    """
+    Local HTTP server answering Twilio's Messages.json endpoint, so the real
+    twilio client can be exercised without network access. Counts TCP
+    connections to show how many sends reused a pooled connection.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.connections = 0
+        self.messages = []
+        self.lock = threading.Lock()
+        self.sids = itertools.count(1)
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Send headers and body in one segment; otherwise Nagle plus delayed
+            # ACK adds ~40ms to every keep-alive response
+            wbufsize = 64 * 1024
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with standin.lock:
+                    standin.connections += 1
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                form = parse_qs(self.rfile.read(length).decode())
+                if standin.latency:
+                    time.sleep(standin.latency)
+                with standin.lock:
+                    sid = f"SM{next(standin.sids):032d}"
+                    standin.messages.append(form)
+                body = json.dumps({
+                    'sid': sid,
+                    'status': 'queued',
+                    'to': form.get('To', [''])[0],
+                    'from': form.get('From', [''])[0],
+                    'body': form.get('Body', [''])[0]
+                }).encode()
+                self.send_response(201)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,19 +1,47 @@
 import json
 import os
 from datetime import datetime
+from background_worker import BackgroundWorker
+from metrics import timed
+from reminder_scheduler import next_fire_time
+from schedule_store import MedicationScheduleStore
+from session_ids import generate_session_id
+from triage_store import TriageHistoryStore
 
 class DataManager:
     def __init__(self):
         self.data_dir = 'data'
         self.ensure_data_directory()
+        self.triage_store = TriageHistoryStore(
+            os.path.join(self.data_dir, 'triage_history.db'),
+            legacy_json_path=os.path.join(self.data_dir, 'triage_history.json')
+        )
+        # medication_schedules.json is only read once, to import it
+        self.schedule_store = MedicationScheduleStore(
+            os.path.join(self.data_dir, 'medication_schedules.db'),
+            legacy_json_path=os.path.join(self.data_dir, 'medication_schedules.json')
+        )
+        # History writes leave the request path through this bounded queue
+        self.history_writer = BackgroundWorker(
+            'triage-history-writer',
+            self.write_triage_record,
+            maxsize=int(os.getenv('HISTORY_QUEUE_SIZE', '10000'))
+        )
+        # Set by the app when a ReminderScheduler is running
+        self.reminder_scheduler = None
+        # Newest schedule row handed to the scheduler
+        self.schedules_cursor = 0
     
     def ensure_data_directory(self):
         """Create data directory if it doesn't exist"""
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
     
-    def save_triage_record(self, user_data, symptoms, triage_result):
-        """Save triage session to history"""
+    def save_triage_record(self, user_data, symptoms, triage_result, background=False):
+        """
+        Save triage session to history.
+        With background=True the write is queued and the session id returned at once.
+        """
         record = {
             "timestamp": datetime.now().isoformat(),
             "user_data": user_data,
@@ -22,20 +50,40 @@ class DataManager:
             "session_id": self.generate_session_id()
         }
         
-        # Load existing history
-        history = self.load_data('triage_history.json', [])
-        history.append(record)
+        if background:
+            self.history_writer.submit(record)
+            return record['session_id']
         
-        # Save updated history
-        self.save_data('triage_history.json', history)
+        # Append-only insert, no rewrite of the whole history
+        self.write_triage_record(record)
         
         return record['session_id']
     
+    def write_triage_record(self, record):
+        with timed('history_write'):
+            self.triage_store.append(record)
+    
+    def get_triage_record(self, session_id):
+        """Look up a triage session by its id"""
+        records = self.triage_store.get_by_session_id(session_id)
+        return records[-1] if records else None
+    
+    def get_triage_history(self, phone=None, start=None, end=None, limit=50):
+        """Triage history for a phone number or an ISO timestamp range"""
+        if phone:
+            return self.triage_store.get_by_phone(phone, limit)
+        return self.triage_store.get_between(start, end, limit)
+    
+    def get_triage_analytics(self, start=None, end=None, cell=None, group_by=('severity',), precision=None):
+        """Triage counts from the rollups by severity, area (geohash), hour/day and language"""
+        return self.triage_store.query_rollups(
+            start=start, end=end, cell=cell, group_by=group_by, precision=precision
+        )
+    
     def save_medication_schedule(self, user_phone, medication_data):
         """Save medication schedule for reminders"""
-        schedules = self.load_data('medication_schedules.json', [])
-        
         schedule = {
+            "schedule_id": self.generate_session_id(),
             "user_phone": user_phone,
             "medication": medication_data,
             "created_at": datetime.now().isoformat(),
@@ -44,11 +92,26 @@ class DataManager:
             "missed_doses": 0
         }
         
-        schedules.append(schedule)
-        self.save_data('medication_schedules.json', schedules)
+        self.schedule_store.add(schedule)
+        
+        # Other workers' schedules reach the scheduler through new_medication_schedules()
+        if self.reminder_scheduler is not None:
+            self.reminder_scheduler.add(schedule['schedule_id'], schedule)
         
         return schedule
     
+    def new_medication_schedules(self):
+        """Schedules saved (by any worker) since the last call, by row id; the first call returns all"""
+        schedules = []
+        for row_id, schedule in self.schedule_store.iter_rows(after_id=self.schedules_cursor):
+            self.schedules_cursor = row_id
+            schedules.append(schedule)
+        return schedules
+    
+    def save_reminder_progress(self, updates):
+        """Save the scheduler's new next_reminder / sent_reminders, touching only those rows"""
+        self.schedule_store.update_progress(updates)
+    
     def load_data(self, filename, default=None):
         """Load data from JSON file"""
         try:
@@ -65,14 +128,12 @@ class DataManager:
             json.dump(data, f, indent=2, ensure_ascii=False)
     
     def generate_session_id(self):
-        """Generate unique session ID"""
-        return datetime.now().strftime("%Y%m%d%H%M%S")
+        """Generate unique, time-sortable session ID (ULID style)"""
+        return generate_session_id()
     
     def calculate_next_reminder(self, medication_data):
         """Calculate next reminder time based on medication schedule"""
-        # Simplified implementation
-        from datetime import timedelta
-        return (datetime.now() + timedelta(hours=8)).isoformat()
+        return next_fire_time(medication_data, datetime.now()).isoformat()
 
 # Global instance
 data_manager = DataManager()
\ No newline at end of file
@@ -0,0 +1,439 @@
+"""
+Compiled, memory-mapped snapshot of the hospital and reference data.
+
+Build it after changing any file in data/:
+
+    cd backend && python data_snapshot.py
+
+Workers then open data/snapshot/ lazily instead of parsing the JSON files.
+Columns are .npy files opened with mmap, and strings live in one interned
+table, so every gunicorn worker shares the same page-cache pages.
+"""
+import json
+import mmap
+import os
+import sys
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+
+import numpy as np
+
+FORMAT_VERSION = 1
+SNAPSHOT_DIRNAME = 'snapshot'
+SOURCE_FILES = {
+    'hospitals': 'hospitals.json',
+    'ayushman': 'ayushman_hospitals.json',
+    'symptoms_db': 'symptoms_db.json',
+    'medications': 'medications.json',
+}
+# Never stored as typed columns: needed as arrays or handled separately
+RESERVED_KEYS = {'id', 'lat', 'lng'}
+
+
+def default_data_dir():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+def source_stamp(data_dir):
+    """mtime/size of each source file, used to detect a stale snapshot"""
+    stamp = {}
+    for name, filename in SOURCE_FILES.items():
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path):
+            stat = os.stat(path)
+            stamp[name] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    return stamp
+
+
+class StringInterner:
+    """Collects unique strings and hands out stable integer ids"""
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def intern(self, value):
+        string_id = self.ids.get(value)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.ids[value] = string_id
+            self.strings.append(value)
+        return string_id
+
+    def write(self, out_dir):
+        encoded = [value.encode('utf-8') for value in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        np.cumsum([len(blob) for blob in encoded], out=offsets[1:])
+        with open(os.path.join(out_dir, 'strings.bin'), 'wb') as f:
+            for blob in encoded:
+                f.write(blob)
+        np.save(os.path.join(out_dir, 'string_offsets.npy'), offsets)
+
+
+def column_kind(values):
+    """Typed column for homogeneous values, or None to keep them in the row's extras"""
+    kinds = set()
+    for value in values:
+        if isinstance(value, bool):
+            kinds.add('bool')
+        elif isinstance(value, int):
+            kinds.add('int')
+        elif isinstance(value, float):
+            kinds.add('float')
+        elif isinstance(value, str):
+            kinds.add('str')
+        elif isinstance(value, list) and all(isinstance(item, str) for item in value):
+            kinds.add('str_list')
+        else:
+            return None
+    return kinds.pop() if len(kinds) == 1 else None
+
+
+def build_snapshot(data_dir=None, out_dir=None):
+    """Compile the JSON data files into a versioned snapshot directory"""
+    data_dir = data_dir or default_data_dir()
+    out_dir = out_dir or os.path.join(data_dir, SNAPSHOT_DIRNAME)
+    tmp_dir = out_dir + '.tmp'
+    os.makedirs(tmp_dir, exist_ok=True)
+
+    def load(name):
+        path = os.path.join(data_dir, SOURCE_FILES[name])
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    stamp = source_stamp(data_dir)
+    strings = StringInterner()
+    hospitals = (load('hospitals') or {}).get('hospitals', [])
+    empanelments = (load('ayushman') or {}).get('ayushman_empaneled', [])
+
+    def save(name, array):
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), array)
+
+    # Hospitals: coordinates and ids as plain arrays, other keys as typed columns
+    save('hospital_id', np.array([h['id'] for h in hospitals], dtype=np.int64))
+    save('hospital_lat', np.array([h['lat'] for h in hospitals], dtype=np.float64))
+    save('hospital_lng', np.array([h['lng'] for h in hospitals], dtype=np.float64))
+    save('hospital_ayushman', np.array([bool(h.get('ayushman', False)) for h in hospitals], dtype=np.bool_))
+    id_order = np.argsort(np.array([h['id'] for h in hospitals], dtype=np.int64), kind='stable')
+    save('hospital_id_order', id_order.astype(np.int64))
+
+    key_order = []
+    for hospital in hospitals:
+        for key in hospital:
+            if key not in key_order:
+                key_order.append(key)
+
+    columns = {}
+    for key in key_order:
+        if key in RESERVED_KEYS or not all(key in h for h in hospitals):
+            continue
+        kind = column_kind(h[key] for h in hospitals)
+        if kind is None:
+            continue
+        values = [h[key] for h in hospitals]
+        if kind == 'str':
+            save(f'col_{key}', np.array([strings.intern(v) for v in values], dtype=np.uint32))
+        elif kind == 'str_list':
+            offsets = np.zeros(len(values) + 1, dtype=np.int64)
+            np.cumsum([len(v) for v in values], out=offsets[1:])
+            save(f'col_{key}', np.array([strings.intern(item) for v in values for item in v], dtype=np.uint32))
+            save(f'col_{key}_offsets', offsets)
+        else:
+            dtype = {'bool': np.bool_, 'int': np.int64, 'float': np.float64}[kind]
+            save(f'col_{key}', np.array(values, dtype=dtype))
+        columns[key] = kind
+
+    # Anything irregular rides along as a small JSON object per row
+    extras = []
+    for hospital in hospitals:
+        rest = {k: v for k, v in hospital.items() if k not in columns and k not in RESERVED_KEYS}
+        extras.append(strings.intern(json.dumps(rest, ensure_ascii=False, separators=(',', ':'))))
+    save('hospital_extras', np.array(extras, dtype=np.uint32))
+
+    # Empanelments: first per hospital wins, same as HospitalFinder
+    first = {}
+    for empaneled in empanelments:
+        first.setdefault(empaneled['hospital_id'], empaneled)
+    kept = list(first.values())
+    save('emp_hospital_id', np.array([e['hospital_id'] for e in kept], dtype=np.int64))
+    save('emp_row', np.array([
+        strings.intern(json.dumps(e, ensure_ascii=False, separators=(',', ':'))) for e in kept
+    ], dtype=np.uint32))
+    valid_until = [e.get('valid_until') or '9999-12-31' for e in kept]
+    save('emp_valid_until', np.array([strings.intern(v) for v in valid_until], dtype=np.uint32))
+    save('emp_hospital_order', np.argsort(np.array([e['hospital_id'] for e in kept], dtype=np.int64), kind='stable'))
+    expiry_order = sorted(range(len(kept)), key=lambda position: (valid_until[position], position))
+    save('emp_expiry_order', np.array(expiry_order, dtype=np.int64))
+
+    # Reference data is small: keep the raw JSON text, parsed on first use
+    references = {}
+    for name in ('symptoms_db', 'medications'):
+        data = load(name)
+        if data is not None:
+            references[name] = strings.intern(json.dumps(data, ensure_ascii=False))
+
+    strings.write(tmp_dir)
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'sources': stamp,
+        'hospital_count': len(hospitals),
+        'empanelment_count': len(kept),
+        'hospital_keys': key_order,
+        'columns': columns,
+        'references': references,
+        'string_count': len(strings.strings)
+    }
+    with open(os.path.join(tmp_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Swap the finished snapshot into place
+    if os.path.exists(out_dir):
+        old_dir = out_dir + '.old'
+        if os.path.exists(old_dir):
+            remove_dir(old_dir)
+        os.rename(out_dir, old_dir)
+        os.rename(tmp_dir, out_dir)
+        remove_dir(old_dir)
+    else:
+        os.rename(tmp_dir, out_dir)
+    return manifest
+
+
+def remove_dir(path):
+    for name in os.listdir(path):
+        os.remove(os.path.join(path, name))
+    os.rmdir(path)
+
+
+class StringTable:
+    def __init__(self, snapshot_dir):
+        self.offsets = np.load(os.path.join(snapshot_dir, 'string_offsets.npy'), mmap_mode='r')
+        path = os.path.join(snapshot_dir, 'strings.bin')
+        if os.path.getsize(path):
+            with open(path, 'rb') as f:
+                self.blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.blob = b''
+        self.get = lru_cache(maxsize=65536)(self.decode)
+
+    def decode(self, string_id):
+        start = int(self.offsets[string_id])
+        end = int(self.offsets[string_id + 1])
+        return self.blob[start:end].decode('utf-8')
+
+
+class HospitalTable(Sequence):
+    """Read-only list of hospital dicts, materialized row by row from the columns"""
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.ids = snapshot.array('hospital_id')
+        self.lats = snapshot.array('hospital_lat')
+        self.lngs = snapshot.array('hospital_lng')
+        self.ayushman_flags = snapshot.array('hospital_ayushman')
+        self.extras = snapshot.array('hospital_extras')
+        self.key_order = snapshot.manifest['hospital_keys']
+        self.columns = {}
+        for key, kind in snapshot.manifest['columns'].items():
+            offsets = snapshot.array(f'col_{key}_offsets') if kind == 'str_list' else None
+            self.columns[key] = (kind, snapshot.array(f'col_{key}'), offsets)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        strings = self.snapshot.strings
+
+        values = {
+            'id': int(self.ids[position]),
+            'lat': float(self.lats[position]),
+            'lng': float(self.lngs[position])
+        }
+        for key, (kind, column, offsets) in self.columns.items():
+            if kind == 'str':
+                values[key] = strings.get(int(column[position]))
+            elif kind == 'str_list':
+                start, end = int(offsets[position]), int(offsets[position + 1])
+                values[key] = [strings.get(int(string_id)) for string_id in column[start:end]]
+            elif kind == 'bool':
+                values[key] = bool(column[position])
+            elif kind == 'int':
+                values[key] = int(column[position])
+            else:
+                values[key] = float(column[position])
+        values.update(json.loads(strings.get(int(self.extras[position]))))
+
+        # Same key order as the source JSON
+        return {key: values[key] for key in self.key_order if key in values}
+
+    def column_values(self, key, default=None):
+        """One field for every hospital as a list, read from its column without building rows"""
+        strings = self.snapshot.strings
+        if key == 'id':
+            return self.ids.tolist()
+        if key in ('lat', 'lng'):
+            return (self.lats if key == 'lat' else self.lngs).tolist()
+        if key not in self.columns:
+            return [row.get(key, default) for row in self]
+        kind, column, offsets = self.columns[key]
+        if kind == 'str':
+            return [strings.get(string_id) for string_id in column.tolist()]
+        if kind == 'str_list':
+            ids = column.tolist()
+            bounds = offsets.tolist()
+            return [[strings.get(string_id) for string_id in ids[start:end]]
+                    for start, end in zip(bounds, bounds[1:])]
+        return column.tolist()
+
+
+class SortedIdMapping(Mapping):
+    """id -> row lookups through a sorted id column (first occurrence wins)"""
+
+    def __init__(self, ids, order, row):
+        self.ids = ids
+        self.order = order
+        self.sorted_ids = ids[order] if len(ids) else ids
+        self.row = row
+
+    def position(self, key):
+        try:
+            key = int(key)
+        except (TypeError, ValueError):
+            return None
+        index = int(np.searchsorted(self.sorted_ids, key, side='left'))
+        if index < len(self.sorted_ids) and self.sorted_ids[index] == key:
+            return int(self.order[index])
+        return None
+
+    def __getitem__(self, key):
+        position = self.position(key)
+        if position is None:
+            raise KeyError(key)
+        return self.row(position)
+
+    def __contains__(self, key):
+        return self.position(key) is not None
+
+    def __iter__(self):
+        seen = set()
+        for hospital_id in self.ids:
+            if int(hospital_id) not in seen:
+                seen.add(int(hospital_id))
+                yield int(hospital_id)
+
+    def __len__(self):
+        return len(np.unique(self.ids))
+
+
+class EmpanelmentRows(Sequence):
+    def __init__(self, snapshot):
+        self.rows = snapshot.array('emp_row')
+        self.strings = snapshot.strings
+        self.parse = lru_cache(maxsize=4096)(self.load)
+
+    def load(self, position):
+        return json.loads(self.strings.get(int(self.rows[position])))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        return self.parse(position)
+
+
+class ExpiryIndex(Sequence):
+    """(valid_until, position) pairs sorted by expiry, for bisect"""
+
+    def __init__(self, snapshot):
+        self.order = snapshot.array('emp_expiry_order')
+        self.valid_until = snapshot.array('emp_valid_until')
+        self.strings = snapshot.strings
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        position = int(self.order[index])
+        return self.strings.get(int(self.valid_until[position])), position
+
+
+class DataSnapshot:
+    """An opened snapshot directory; arrays are memory-mapped on first access"""
+
+    def __init__(self, snapshot_dir):
+        self.snapshot_dir = snapshot_dir
+        with open(os.path.join(snapshot_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self.arrays = {}
+        self.strings = StringTable(snapshot_dir)
+        self.reference_cache = {}
+
+    def array(self, name):
+        if name not in self.arrays:
+            self.arrays[name] = np.load(os.path.join(self.snapshot_dir, f'{name}.npy'), mmap_mode='r')
+        return self.arrays[name]
+
+    def hospitals(self):
+        return HospitalTable(self)
+
+    def empanelment_rows(self):
+        return EmpanelmentRows(self)
+
+    def empanelments_by_hospital(self, rows):
+        return SortedIdMapping(self.array('emp_hospital_id'), self.array('emp_hospital_order'), rows.__getitem__)
+
+    def hospitals_by_id(self, table):
+        return SortedIdMapping(self.array('hospital_id'), self.array('hospital_id_order'), table.__getitem__)
+
+    def empanelment_expiry(self):
+        return ExpiryIndex(self)
+
+    def reference(self, name):
+        """Parsed reference JSON (symptoms_db, medications), or None"""
+        if name not in self.reference_cache:
+            string_id = self.manifest['references'].get(name)
+            self.reference_cache[name] = None if string_id is None else json.loads(self.strings.get(string_id))
+        return self.reference_cache[name]
+
+
+def open_snapshot(data_dir=None):
+    """
+    Open data/snapshot if it exists, matches this format and is not older
+    than the JSON sources. Returns None otherwise (callers fall back to JSON).
+    Set DATA_SNAPSHOT=0 to disable.
+    """
+    if os.getenv('DATA_SNAPSHOT', '1') == '0':
+        return None
+    data_dir = data_dir or default_data_dir()
+    snapshot_dir = os.path.join(data_dir, SNAPSHOT_DIRNAME)
+    if not os.path.exists(os.path.join(snapshot_dir, 'manifest.json')):
+        return None
+    try:
+        snapshot = DataSnapshot(snapshot_dir)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not open data snapshot: {e}")
+        return None
+    if snapshot.manifest.get('format_version') != FORMAT_VERSION:
+        print("❌ Data snapshot format is outdated, rebuild with: python data_snapshot.py")
+        return None
+    if snapshot.manifest.get('sources') != source_stamp(data_dir):
+        print("❌ Data snapshot is stale, rebuild with: python data_snapshot.py")
+        return None
+    return snapshot
+
+
+if __name__ == '__main__':
+    target = sys.argv[1] if len(sys.argv) > 1 else None
+    built = build_snapshot(target)
+    print(f"✅ Snapshot built: {built['hospital_count']} hospitals, "
+          f"{built['empanelment_count']} empanelments, {built['string_count']} strings")
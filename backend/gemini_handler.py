@@ -1,8 +1,17 @@
 import google.generativeai as genai
 import os
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from pathlib import Path
+from triage_cache import cache_from_env, normalize_symptoms
+from admission_control import PRIORITY_EMERGENCY, PRIORITY_NORMAL, controller_from_env, priority_for
+from symptom_rules import quick_triage, screen_symptoms
+from resilience import LatencyTracker, breaker_from_env, hedger_from_env
+from stream_parser import IncrementalJsonParser, parse_json_object
+from metrics import log_event, timed, verbose
 
 # Load environment variables from root directory
 env_path = Path(__file__).parent.parent / '.env'
@@ -18,28 +27,97 @@ else:
     print("GEMINI_API_KEY not found in environment variables")
     print("Please check your .env file in the root directory")
 
-def analyze_symptoms(symptoms, language='en'):
+MODEL_NAME = 'gemini-2.5-flash'
+# Bump whenever the prompt below changes so cached results are not reused
+PROMPT_VERSION = 'triage-v1'
+
+# Cache of successful results keyed on normalized symptoms + language + version
+triage_cache = cache_from_env(f"{MODEL_NAME}:{PROMPT_VERSION}")
+
+# Bounded outbound Gemini concurrency; suspected emergencies jump the queue
+admission = controller_from_env()
+
+# Fail fast while Gemini is erroring or slow; optional hedging for tail latency
+breaker = breaker_from_env()
+hedger = hedger_from_env()
+
+# Stream the response and surface severity before advice/reasoning are generated
+STREAMING = os.getenv('GEMINI_STREAMING', '1') == '1'
+severity_latency = LatencyTracker()
+response_latency = LatencyTracker()
+
+# Fallback response if Gemini fails
+FALLBACK_RESPONSE = {
+    'severity': 'OPD Visit',
+    'advice': 'Please consult a healthcare provider for proper diagnosis.',
+    'reasoning': 'AI analysis unavailable - defaulting to doctor consultation'
+}
+
+def analyze_symptoms(symptoms, language='en', on_severity=None):
     """
-    Analyze symptoms using Google Gemini API
+    Analyze symptoms using Google Gemini API.
+    on_severity(severity) is called as soon as the severity is known, which
+    when streaming is before advice and reasoning have been generated.
     """
-    # Fallback response if Gemini fails
-    fallback_response = {
-        'severity': 'OPD Visit',
-        'advice': 'Please consult a healthcare provider for proper diagnosis.',
-        'reasoning': 'AI analysis unavailable - defaulting to doctor consultation'
-    }
+    fallback_response = dict(FALLBACK_RESPONSE, source='fallback')
     
     # Check if API key is available
     if not GEMINI_API_KEY:
-        print("Gemini API key not available, using fallback")
+        log_event('gemini_fallback', reason='no_api_key')
         return fallback_response
     
-    try:
-        # Create the prompt for Gemini
-        prompt = f"""
+    # Suspected emergencies always reach the model: a cached answer for
+    # similar wording must never downgrade one
+    screening = screen_symptoms(symptoms)
+    suspected_emergency = screening['severity'] == 'Emergency'
+    if suspected_emergency:
+        triage_cache.count('bypassed')
+        cached = None
+    else:
+        cached = triage_cache.get(symptoms, language)
+    if cached is not None:
+        return cached
+    
+    if not breaker.allow():
+        log_event('gemini_fallback', level='warning', reason='circuit_open')
+        return fallback_response
+    
+    # Queue for a call slot; shed requests get the fallback straight away
+    priority = priority_for(screening)
+    admitted, result = admission.call(call_gemini, priority, symptoms, on_severity)
+    if not admitted:
+        log_event('gemini_fallback', level='warning', reason='shed', priority=priority)
+        return fallback_response
+    if result is None:
+        return fallback_response
+    
+    if not suspected_emergency:
+        triage_cache.put(symptoms, language, result)
+    return result
+
+def call_gemini(symptoms, on_severity=None):
+    """
+    One logical Gemini call (hedged when enabled), timed and reported to the circuit breaker
+    """
+    start = time.perf_counter()
+    request = request_gemini_triage_stream if STREAMING else request_gemini_triage
+    with timed('llm'):
+        if hedger is not None:
+            # Runs inside an admission slot; a hedge takes a second one and a
+            # primary that outlives a winning hedge keeps its slot until it ends
+            result = hedger.call(request, symptoms, on_severity, admission=admission)
+        else:
+            result = request(symptoms, on_severity)
+    breaker.record(result is not None, time.perf_counter() - start)
+    return result
+
+# Static prompt around the patient's symptoms, rendered once at import
+PROMPT_PREFIX = """
         You are a medical triage AI assistant. Analyze the following symptoms and provide a severity classification with medical reasoning.
 
-        PATIENT SYMPTOMS: {symptoms}
+        PATIENT SYMPTOMS: """
+
+PROMPT_SUFFIX = """
 
         CLASSIFY INTO ONE OF THESE THREE CATEGORIES:
         - "Emergency": Life-threatening conditions needing immediate care (heart attack, stroke, severe bleeding, difficulty breathing, unconsciousness)
@@ -47,11 +125,11 @@ def analyze_symptoms(symptoms, language='en'):
         - "Self-care": Mild symptoms that can be managed at home (common cold, minor aches, mild indigestion)
 
         RESPOND WITH THIS EXACT JSON FORMAT ONLY:
-        {{
+        {
             "severity": "Emergency/OPD Visit/Self-care",
             "advice": "Specific, actionable medical advice in 2-3 sentences",
             "reasoning": "Medical explanation for this classification in 2-3 sentences"
-        }}
+        }
 
         IMPORTANT GUIDELINES:
         - Be medically accurate and cautious
@@ -63,85 +141,365 @@ def analyze_symptoms(symptoms, language='en'):
 
         Respond only with valid JSON, no additional text or explanations.
         """
+
+GENERATION_CONFIG = {
+    "temperature": 0.5,
+    "top_p": 0.8,
+    "top_k": 40,
+    "max_output_tokens": 1024,
+}
+
+# Multi-patient prompt for bulk screening; every patient is classified independently
+BATCH_PROMPT_PREFIX = """
+        You are a medical triage AI assistant. Analyze each patient below independently and provide a severity classification with medical reasoning for every one of them.
+
+        PATIENTS (JSON array of {"id": ..., "symptoms": ...}): """
+
+BATCH_PROMPT_SUFFIX = """
+
+        CLASSIFY EACH PATIENT INTO ONE OF THESE THREE CATEGORIES:
+        - "Emergency": Life-threatening conditions needing immediate care (heart attack, stroke, severe bleeding, difficulty breathing, unconsciousness)
+        - "OPD Visit": Non-emergency but requires doctor consultation (persistent fever, ongoing pain, chronic conditions)
+        - "Self-care": Mild symptoms that can be managed at home (common cold, minor aches, mild indigestion)
+
+        RESPOND WITH THIS EXACT JSON FORMAT ONLY, ONE ENTRY PER PATIENT ID:
+        {
+            "results": [
+                {
+                    "id": 1,
+                    "severity": "Emergency/OPD Visit/Self-care",
+                    "advice": "Specific, actionable medical advice in 2-3 sentences",
+                    "reasoning": "Medical explanation for this classification in 2-3 sentences"
+                }
+            ]
+        }
+
+        IMPORTANT GUIDELINES:
+        - Be medically accurate and cautious
+        - When in doubt, recommend higher care level
+        - Never let one patient's symptoms influence another patient's result
+        - If symptoms suggest multiple possibilities, choose the most serious one
+
+        Respond only with valid JSON, no additional text or explanations.
+        """
+
+# Room for one short result per patient
+BATCH_GENERATION_CONFIG = dict(GENERATION_CONFIG, max_output_tokens=8192)
+
+BATCH_ITEMS_PER_CALL = int(os.getenv('TRIAGE_BATCH_ITEMS_PER_CALL', '20'))
+BATCH_MAX_PARALLEL = int(os.getenv('TRIAGE_BATCH_MAX_PARALLEL', '4'))
+
+SAFETY_SETTINGS = [
+    {
+        "category": "HARM_CATEGORY_HARASSMENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_HATE_SPEECH",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    },
+    {
+        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
+        "threshold": "BLOCK_MEDIUM_AND_ABOVE"
+    }
+]
+
+# One model client shared by all request threads, built on first use or warm_up()
+model = None
+model_lock = threading.Lock()
+
+def build_prompt(symptoms):
+    """Full triage prompt for one patient"""
+    return PROMPT_PREFIX + str(symptoms) + PROMPT_SUFFIX
+
+def build_model():
+    """Construct a configured Gemini model client"""
+    return genai.GenerativeModel(
+        model_name=MODEL_NAME,
+        generation_config=GENERATION_CONFIG,
+        safety_settings=SAFETY_SETTINGS
+    )
+
+def get_model():
+    """Shared model client (thread-safe lazy init)"""
+    global model
+    if model is None:
+        with model_lock:
+            if model is None:
+                model = build_model()
+    return model
+
+def reinit_after_fork():
+    """
+    Drop clients and pools inherited from a preloading parent process: the
+    gRPC channel under the model is not fork-safe and pool threads are gone.
+    """
+    global model, model_lock
+    model = None
+    model_lock = threading.Lock()
+    if hedger is not None:
+        hedger.executor = ThreadPoolExecutor(max_workers=hedger.max_workers, thread_name_prefix='hedge')
+
+def warm_up(ping=False):
+    """
+    Build the shared model at app start so the first triage does not pay for it.
+    With ping=True also open the API connection via a cheap count_tokens call.
+    """
+    if not GEMINI_API_KEY:
+        return False
+    shared = get_model()
+    if ping:
+        try:
+            shared.count_tokens(PROMPT_PREFIX)
+        except Exception as e:
+            print(f"Gemini warm-up ping failed: {str(e)}")
+            return False
+    return True
+
+def triage_fields(result):
+    """Validated triage dict from parsed model output, or None"""
+    required_fields = ['severity', 'advice', 'reasoning']
+    if not isinstance(result, dict) or not all(field in result for field in required_fields):
+        return None
+    return {field: result[field] for field in required_fields}
+
+def request_gemini_triage(symptoms, on_severity=None):
+    """
+    Run one Gemini triage call. Returns the parsed result, or None on failure.
+    """
+    try:
+        verbose(f"Sending to Gemini API: {symptoms[:100]}...")
         
-        print(f"Sending to Gemini API: {symptoms[:100]}...")
+        response = get_model().generate_content(build_prompt(symptoms))
+        response_text = response.text.strip()
         
-        # Initialize the model with safety settings
-        generation_config = {
-            "temperature": 0.5,
-            "top_p": 0.8,
-            "top_k": 40,
-            "max_output_tokens": 1024,
-        }
+        # One pass over the text, skipping any ```json fence or prose around the object
+        result = triage_fields(parse_json_object(response_text))
+        if result is None:
+            log_event('gemini_invalid_response', level='warning', chars=len(response_text))
+            verbose(f"Invalid response format from Gemini: {response_text[:200]}")
+            return None
         
-        safety_settings = [
-            {
-                "category": "HARM_CATEGORY_HARASSMENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_HATE_SPEECH",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            },
-            {
-                "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                "threshold": "BLOCK_MEDIUM_AND_ABOVE"
-            }
-        ]
+        log_event('gemini_result', severity=result['severity'])
+        if on_severity is not None:
+            on_severity(result['severity'])
+        return result
         
-        model = genai.GenerativeModel(
-            model_name='gemini-2.5-flash',
-            generation_config=generation_config,
-            safety_settings=safety_settings
-        )
+    except Exception as e:
+        log_event('gemini_error', level='error', error=type(e).__name__)
+        verbose(f"Gemini API error: {str(e)}")
+        return None
+
+def request_gemini_triage_stream(symptoms, on_severity=None):
+    """
+    Streaming Gemini triage call: fields are parsed as chunks arrive and
+    on_severity fires the moment "severity" is complete. Returns the
+    parsed result, or None on failure.
+    """
+    parser = IncrementalJsonParser()
+    chunks = []
+    start = time.perf_counter()
+    try:
+        verbose(f"Streaming from Gemini API: {symptoms[:100]}...")
         
-        # Generate response
-        response = model.generate_content(prompt)
+        for chunk in get_model().generate_content(build_prompt(symptoms), stream=True):
+            text = chunk.text
+            chunks.append(text)
+            for key, value in parser.feed(text):
+                if key == 'severity':
+                    severity_latency.add(time.perf_counter() - start)
+                    if on_severity is not None:
+                        on_severity(value)
+            if parser.complete:
+                break
         
-        # Extract the response text
-        response_text = response.text.strip()
-        print(f"Raw Gemini response: {response_text}")
+        response_latency.add(time.perf_counter() - start)
+        result = triage_fields(parser.fields if parser.complete else None)
+        if result is None:
+            log_event('gemini_invalid_response', level='warning', streamed=True, error=parser.error or 'incomplete')
+            verbose(f"Invalid streamed response from Gemini: {''.join(chunks)[:200]}")
+            return None
         
-        # Clean the response - remove markdown code blocks if present
-        if '```json' in response_text:
-            response_text = response_text.split('```json')[1].split('```')[0].strip()
-        elif '```' in response_text:
-            response_text = response_text.split('```')[1].strip()
-        elif response_text.startswith('{') and response_text.endswith('}'):
-            # Response is already clean JSON
-            pass
-        else:
-            # Try to extract JSON from text
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            if start_idx != -1 and end_idx != 0:
-                response_text = response_text[start_idx:end_idx]
+        log_event('gemini_result', severity=result['severity'])
+        return result
         
-        # Parse JSON response
-        result = json.loads(response_text)
+    except Exception as e:
+        log_event('gemini_error', level='error', error=type(e).__name__)
+        verbose(f"Gemini API error: {str(e)}")
+        return None
+
+def streaming_stats():
+    """Time to first severity vs full response, over recent streamed calls"""
+    def ms(value):
+        return round(value * 1000, 1) if value is not None else None
+    return {
+        'enabled': STREAMING,
+        'samples': len(response_latency),
+        'severity_p50_ms': ms(severity_latency.percentile(0.5)),
+        'severity_p95_ms': ms(severity_latency.percentile(0.95)),
+        'response_p50_ms': ms(response_latency.percentile(0.5)),
+        'response_p95_ms': ms(response_latency.percentile(0.95))
+    }
+
+def build_batch_prompt(items):
+    """Multi-patient prompt for [(id, symptoms)]"""
+    patients = [{'id': item_id, 'symptoms': str(symptoms)} for item_id, symptoms in items]
+    return BATCH_PROMPT_PREFIX + json.dumps(patients, ensure_ascii=False) + BATCH_PROMPT_SUFFIX
+
+def request_gemini_triage_batch(items):
+    """
+    One Gemini call for several patients. `items` is [(id, symptoms)].
+    Returns {id: result} for the items that came back valid; the call
+    itself failing returns None.
+    """
+    try:
+        verbose(f"Sending batch of {len(items)} to Gemini API...")
+        response = get_model().generate_content(
+            build_batch_prompt(items), generation_config=BATCH_GENERATION_CONFIG
+        )
+        parsed = parse_json_object(response.text.strip())
+        if parsed is None or not isinstance(parsed.get('results'), list):
+            log_event('gemini_invalid_response', level='warning', batch=len(items))
+            verbose(f"Invalid batch response format from Gemini: {response.text[:200]}")
+            return None
         
-        # Validate the response structure
-        required_fields = ['severity', 'advice', 'reasoning']
-        if all(field in result for field in required_fields):
-            print(f"Gemini analysis successful: {result['severity']}")
-            return {
-                'severity': result['severity'],
-                'advice': result['advice'],
-                'reasoning': result['reasoning']
-            }
-        else:
-            print("Invalid response format from Gemini")
-            return fallback_response
-            
-    except json.JSONDecodeError as e:
-        print(f"JSON parsing error: {e}")
-        print(f"Raw response that failed: {response_text}")
-        return fallback_response
+        wanted = {item_id for item_id, _ in items}
+        results = {}
+        for entry in parsed['results']:
+            result = triage_fields(entry)
+            item_id = entry.get('id') if isinstance(entry, dict) else None
+            if result is not None and item_id in wanted:
+                results.setdefault(item_id, result)
+        return results
         
     except Exception as e:
-        print(f"Gemini API error: {str(e)}")
-        return fallback_response
\ No newline at end of file
+        log_event('gemini_error', level='error', error=type(e).__name__)
+        verbose(f"Gemini API error: {str(e)}")
+        return None
+
+def call_gemini_batch(items, priority=PRIORITY_NORMAL):
+    """
+    Batch call behind the circuit breaker and admission control, so it
+    counts against LLM_MAX_CONCURRENCY like single calls. Shed calls return None.
+    """
+    if not breaker.allow():
+        return None
+    admitted, results = admission.call(run_gemini_batch, priority, items)
+    if not admitted:
+        log_event('gemini_fallback', level='warning', reason='shed', priority=priority, batch=len(items))
+    return results
+
+def run_gemini_batch(items):
+    start = time.perf_counter()
+    with timed('llm_batch'):
+        results = request_gemini_triage_batch(items)
+    breaker.record(results is not None, time.perf_counter() - start)
+    return results
+
+def analyze_symptoms_batch(entries, language='en', items_per_call=None, max_parallel=None):
+    """
+    Triage many symptom reports at once (health camps, offline screening).
+    Identical reports (after normalization) are triaged once; clear-cut cases
+    and cached ones skip the model; the rest are packed items_per_call to a
+    Gemini call, with at most max_parallel calls in flight. Items missing
+    from a batch response are retried once in a later batch; anything still
+    unanswered gets the fallback with an 'error'.
+
+    `entries` are symptom strings or {'symptoms': ..., 'language': ...}.
+    Returns (results, stats) with results in input order.
+    """
+    items_per_call = max(1, items_per_call or BATCH_ITEMS_PER_CALL)
+    max_parallel = max(1, max_parallel or BATCH_MAX_PARALLEL)
+    start = time.perf_counter()
+    stats = {'items': len(entries), 'unique': 0, 'rules': 0, 'cache_hits': 0, 'model_calls': 0,
+             'model_items': 0, 'failed': 0}
+    
+    # Dedupe on the same normalized key the cache uses
+    unique = {}
+    keys = []
+    for entry in entries:
+        if isinstance(entry, dict):
+            symptoms, entry_language = entry.get('symptoms', ''), entry.get('language') or language
+        else:
+            symptoms, entry_language = entry, language
+        key = (normalize_symptoms(symptoms), entry_language)
+        keys.append(key)
+        unique.setdefault(key, (symptoms, entry_language))
+    stats['unique'] = len(unique)
+    
+    resolved = {}
+    pending = []
+    priorities = {}
+    for key, (symptoms, entry_language) in unique.items():
+        result = quick_triage(symptoms)
+        if result is not None:
+            stats['rules'] += 1
+            resolved[key] = result
+            continue
+        # As in analyze_symptoms: suspected emergencies skip the cache and go first
+        screening = screen_symptoms(symptoms)
+        priorities[key] = priority_for(screening)
+        if screening['severity'] == 'Emergency' or not GEMINI_API_KEY:
+            cached = None
+        else:
+            cached = triage_cache.get(symptoms, entry_language)
+        if cached is not None:
+            stats['cache_hits'] += 1
+            resolved[key] = dict(cached, source='cache')
+            continue
+        pending.append(key)
+    
+    errors = {}
+    if pending and not GEMINI_API_KEY:
+        errors = {key: 'Gemini API key not configured' for key in pending}
+        pending = []
+    
+    ids = {key: position + 1 for position, key in enumerate(pending)}
+    for attempt in range(2):
+        if not pending:
+            break
+        groups = [pending[i:i + items_per_call] for i in range(0, len(pending), items_per_call)]
+        with ThreadPoolExecutor(max_workers=min(max_parallel, len(groups)), thread_name_prefix='triage-batch') as pool:
+            responses = list(pool.map(
+                lambda group: call_gemini_batch(
+                    [(ids[key], unique[key][0]) for key in group],
+                    min(priorities[key] for key in group)
+                ),
+                groups
+            ))
+        
+        missing = []
+        for group, response in zip(groups, responses):
+            stats['model_calls'] += 1
+            stats['model_items'] += len(group)
+            for key in group:
+                result = (response or {}).get(ids[key])
+                if result is None:
+                    missing.append(key)
+                    errors[key] = 'Gemini call failed' if response is None else 'Missing from batch response'
+                    continue
+                errors.pop(key, None)
+                if priorities[key] != PRIORITY_EMERGENCY:
+                    triage_cache.put(unique[key][0], unique[key][1], result)
+                resolved[key] = dict(result, source='gemini')
+        pending = missing
+    
+    results = []
+    for position, key in enumerate(keys):
+        if key in resolved:
+            result = dict(resolved[key])
+        else:
+            result = dict(FALLBACK_RESPONSE, source='fallback', error=errors.get(key, 'Not triaged'))
+            stats['failed'] += 1
+        result['index'] = position
+        results.append(result)
+    
+    elapsed = time.perf_counter() - start
+    stats['seconds'] = round(elapsed, 3)
+    stats['items_per_second'] = round(len(entries) / elapsed, 1) if elapsed > 0 else None
+    stats['items_per_model_call'] = round(stats['model_items'] / stats['model_calls'], 2) if stats['model_calls'] else None
+    return results, stats
@@ -0,0 +1,103 @@
+import heapq
+import math
+
+EARTH_RADIUS_KM = 6371
+
+
+class GridIndex:
+    """
+    Bucket hospital positions into lat/lng grid cells for fast radius queries.
+    Works on plain coordinate sequences (lists or memory-mapped arrays).
+    """
+
+    def __init__(self, lats, lngs, cell_size_deg=0.25):
+        self.cell_size = cell_size_deg
+        self.n_rows = int(math.ceil(180 / cell_size_deg)) + 1
+        self.n_cols = int(math.ceil(360 / cell_size_deg))
+        self.lats = lats
+        self.lngs = lngs
+        self.cells = {}
+        self.size = len(lats)
+
+        for position, (lat, lng) in enumerate(zip(lats, lngs)):
+            self.cells.setdefault(self.cell_key(lat, lng), []).append(position)
+
+    @classmethod
+    def from_hospitals(cls, hospitals, cell_size_deg=0.25):
+        return cls([h['lat'] for h in hospitals], [h['lng'] for h in hospitals], cell_size_deg)
+
+    def cell_key(self, lat, lng):
+        """Map a coordinate to its (row, col) grid cell"""
+        row = int((lat + 90) // self.cell_size)
+        col = int((lng + 180) // self.cell_size) % self.n_cols
+        return row, col
+
+    def bounding_box(self, lat, lng, radius_km):
+        """
+        Exact lat/lng bounds of a great-circle radius around a point.
+        Returns None for the longitude span when the circle covers a pole.
+        """
+        angular = radius_km / EARTH_RADIUS_KM
+        lat_rad = math.radians(lat)
+        min_lat = lat_rad - angular
+        max_lat = lat_rad + angular
+
+        if min_lat <= -math.pi / 2 or max_lat >= math.pi / 2 or angular >= math.pi / 2:
+            return math.degrees(max(min_lat, -math.pi / 2)), math.degrees(min(max_lat, math.pi / 2)), None
+
+        delta_lng = math.asin(min(1.0, math.sin(angular) / math.cos(lat_rad)))
+        return math.degrees(min_lat), math.degrees(max_lat), math.degrees(delta_lng)
+
+    def candidates(self, lat, lng, radius_km):
+        """Yield positions from every cell that can lie within radius_km"""
+        min_lat, max_lat, delta_lng = self.bounding_box(lat, lng, radius_km)
+
+        first_row = max(0, int((min_lat + 90) // self.cell_size))
+        last_row = min(self.n_rows - 1, int((max_lat + 90) // self.cell_size))
+
+        if delta_lng is None or 2 * delta_lng >= 360 - self.cell_size:
+            cols = range(self.n_cols)
+        else:
+            first_col = int((lng - delta_lng + 180) // self.cell_size)
+            last_col = int((lng + delta_lng + 180) // self.cell_size)
+            cols = [col % self.n_cols for col in range(first_col, last_col + 1)]
+
+        # Dense queries (huge radius) are cheaper as a plain walk over the buckets
+        if (last_row - first_row + 1) * len(cols) > len(self.cells):
+            for (row, col), bucket in self.cells.items():
+                if first_row <= row <= last_row:
+                    yield from bucket
+            return
+
+        for row in range(first_row, last_row + 1):
+            for col in cols:
+                bucket = self.cells.get((row, col))
+                if bucket:
+                    yield from bucket
+
+    def nearest(self, lat, lng, k, max_distance_km, distance_fn, predicate=None):
+        """
+        k nearest hospitals within max_distance_km, ordered like a full
+        stable sort on the rounded distance. `predicate` filters positions.
+        Returns (distance, position) pairs.
+        """
+        heap = []  # max-heap via negated keys, bounded at k entries
+
+        # Pad the search box slightly so float error never drops a boundary hit
+        lats, lngs = self.lats, self.lngs
+        for position in self.candidates(lat, lng, max_distance_km * (1 + 1e-9)):
+            if predicate is not None and not predicate(position):
+                continue
+
+            distance = distance_fn(lat, lng, lats[position], lngs[position])
+            if distance > max_distance_km:
+                continue
+
+            key = (-round(distance, 1), -position)
+            if len(heap) < k:
+                heapq.heappush(heap, (key, distance, position))
+            elif key > heap[0][0]:
+                heapq.heapreplace(heap, (key, distance, position))
+
+        ordered = sorted(heap, key=lambda entry: (-entry[0][0], entry[2]))
+        return [(distance, position) for _, distance, position in ordered]
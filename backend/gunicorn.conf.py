@@ -0,0 +1,52 @@
+"""
+Production server: cd backend && gunicorn -c gunicorn.conf.py
+
+The app is imported once in the master (preload_app) so hospital data, the
+snapshot and symptom rules are loaded before fork and shared copy-on-write.
+Each worker then rebuilds its network clients, pools and background
+threads (app.after_fork) and, on a graceful stop (SIGTERM / SIGHUP),
+drains queued history writes and finishes the SMS it is sending.
+
+Shared by all workers: bulk SMS jobs, their send queue and the per-sender
+rate limit (SQLite), triage history and medication schedules; reminders
+fire from one worker only. Per worker: /metrics (each scrape sees the
+worker that answered it), LLM_MAX_CONCURRENCY (the cluster-wide cap on
+Gemini calls is workers x LLM_MAX_CONCURRENCY), the circuit breaker and
+the in-memory tier of the triage cache.
+"""
+import multiprocessing
+import os
+
+# Tells app.py not to start threads at import; they are started per worker
+os.environ['SWASTHYA_PREFORK'] = '1'
+
+wsgi_app = 'app:app'
+bind = os.getenv('BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+# Processes for CPU-bound work (routing, ranking, JSON); threads for the
+# Gemini/Twilio calls that mostly wait on the network
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+preload_app = True
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+keepalive = 5
+# Leave time for app.shutdown() to drain background queues
+graceful_timeout = int(float(os.getenv('SHUTDOWN_DRAIN_SECONDS', '20'))) + 10
+# Recycle workers now and then so slow leaks cannot build up
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    import app
+    app.after_fork()
+
+
+def worker_exit(server, worker):
+    import app
+    app.shutdown()
@@ -1,38 +1,157 @@
+import bisect
+import hashlib
 import json
 import math
 import os
-from datetime import datetime
+import threading
+import time
+from datetime import date, datetime
+from geo_index import GridIndex
+from hospital_ranking import HospitalRanker
+from metrics import timed
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+# Files whose changes trigger a reload (the snapshot manifest is rewritten on every rebuild)
+WATCHED_FILES = ['hospitals.json', 'ayushman_hospitals.json', os.path.join('snapshot', 'manifest.json')]
+VERSIONED_FILES = ['hospitals.json', 'ayushman_hospitals.json']
+
+def data_stamp(data_dir):
+    """(mtime, size) of each watched file; cheap enough to poll"""
+    stamp = []
+    for name in WATCHED_FILES:
+        try:
+            stat = os.stat(os.path.join(data_dir, name))
+            stamp.append((name, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            stamp.append((name, None, None))
+    return stamp
+
+def data_checksum(data_dir):
+    """Content hash of the hospital data files, used as the data version"""
+    digest = hashlib.sha256()
+    for name in VERSIONED_FILES:
+        digest.update(name.encode('utf-8'))
+        try:
+            with open(os.path.join(data_dir, name), 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+        except FileNotFoundError:
+            digest.update(b'missing')
+    return digest.hexdigest()[:12]
+
+class JoinedHospitals:
+    """Hospital rows joined with Ayushman details on access (snapshot mode)"""
+    
+    def __init__(self, hospitals, empanelments_by_hospital):
+        self.hospitals = hospitals
+        self.empanelments_by_hospital = empanelments_by_hospital
+    
+    def __len__(self):
+        return len(self.hospitals)
+    
+    def __getitem__(self, position):
+        joined = self.hospitals[position]
+        if joined.get('ayushman', False):
+            joined['ayushman_details'] = self.empanelments_by_hospital.get(joined['id'])
+        return joined
 
 class HospitalFinder:
-    def __init__(self):
-        self.hospitals = self.load_hospitals()
-        self.ayushman_data = self.load_ayushman_data()
+    def __init__(self, data_dir=None, strict=False):
+        self.data_dir = data_dir or DEFAULT_DATA_DIR
+        # strict: raise on unreadable data instead of falling back to mock data (used by reloads)
+        self.strict = strict
+        self.batch_engine = None
+        self.ranker = None
+        
+        # Prefer the compiled snapshot (shared, memory-mapped); fall back to JSON
+        try:
+            from data_snapshot import open_snapshot
+            self.snapshot = open_snapshot(self.data_dir)
+        except ImportError:
+            self.snapshot = None
+        
+        if self.snapshot is not None:
+            self.build_snapshot_indexes()
+            print(f"✅ Loaded {len(self.hospitals)} hospitals from snapshot")
+        else:
+            self.hospitals = self.load_hospitals()
+            self.ayushman_data = self.load_ayushman_data()
+            self.build_indexes()
+    
+    def build_snapshot_indexes(self):
+        """Same lookups as build_indexes, backed by the snapshot's mapped columns"""
+        snapshot = self.snapshot
+        self.hospitals = snapshot.hospitals()
+        self.hospitals_by_id = snapshot.hospitals_by_id(self.hospitals)
+        self.empanelment_list = snapshot.empanelment_rows()
+        self.empanelments_by_hospital = snapshot.empanelments_by_hospital(self.empanelment_list)
+        self.empanelment_expiry = snapshot.empanelment_expiry()
+        self.ayushman_data = {"ayushman_empaneled": self.empanelment_list}
+        self.joined_hospitals = JoinedHospitals(self.hospitals, self.empanelments_by_hospital)
+        self.ayushman_flags = self.hospitals.ayushman_flags
+        self.spatial_index = GridIndex(self.hospitals.lats, self.hospitals.lngs)
+    
+    def build_indexes(self):
+        """Build id-keyed lookups, the joined hospital view and the spatial index"""
+        self.hospitals_by_id = {}
+        for hospital in self.hospitals:
+            self.hospitals_by_id.setdefault(hospital['id'], hospital)
+        
+        # First empanelment per hospital wins, same as the old linear scan
+        self.empanelments_by_hospital = {}
+        for empaneled in self.ayushman_data.get('ayushman_empaneled', []):
+            self.empanelments_by_hospital.setdefault(empaneled['hospital_id'], empaneled)
+        
+        # Sorted by expiry so active empanelments are a bisect away
+        self.empanelment_expiry = sorted(
+            (empaneled.get('valid_until') or '9999-12-31', position)
+            for position, empaneled in enumerate(self.empanelments_by_hospital.values())
+        )
+        self.empanelment_list = list(self.empanelments_by_hospital.values())
+        
+        # Hospitals already joined with their Ayushman details
+        self.joined_hospitals = []
+        for hospital in self.hospitals:
+            joined = hospital.copy()
+            if hospital.get('ayushman', False):
+                joined['ayushman_details'] = self.empanelments_by_hospital.get(hospital['id'])
+            self.joined_hospitals.append(joined)
+        
+        self.ayushman_flags = [bool(hospital.get('ayushman', False)) for hospital in self.hospitals]
+        self.spatial_index = GridIndex.from_hospitals(self.hospitals)
     
     def load_hospitals(self):
         """Load hospital data from JSON file"""
         try:
             # Use absolute path
-            file_path = os.path.join(os.path.dirname(__file__), 'data', 'hospitals.json')
+            file_path = os.path.join(self.data_dir, 'hospitals.json')
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 print(f"✅ Loaded {len(data.get('hospitals', []))} hospitals")
                 return data.get('hospitals', [])
         except FileNotFoundError:
+            if self.strict:
+                raise
             print("❌ Hospital data file not found, using mock data")
             return self.get_mock_hospitals()
         except Exception as e:
+            if self.strict:
+                raise
             print(f"❌ Error loading hospitals: {e}")
             return self.get_mock_hospitals()
     
     def load_ayushman_data(self):
         """Load Ayushman hospital data"""
         try:
-            file_path = os.path.join(os.path.dirname(__file__), 'data', 'ayushman_hospitals.json')
+            file_path = os.path.join(self.data_dir, 'ayushman_hospitals.json')
             with open(file_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
                 print(f"✅ Loaded {len(data.get('ayushman_empaneled', []))} Ayushman hospitals")
                 return data
         except FileNotFoundError:
+            if self.strict:
+                raise
             print("❌ Ayushman hospitals file not found")
             return {"ayushman_empaneled": []}
     
@@ -75,74 +194,265 @@ class HospitalFinder:
         
         return R * c
     
-    def find_nearest_hospitals(self, user_lat, user_lng, ayushman_only=False, max_distance_km=50):
-        """Find nearest hospitals with filters"""
-        eligible_hospitals = []
+    def find_nearest_hospitals(self, user_lat, user_lng, ayushman_only=False, max_distance_km=50, limit=10, active_on=None):
+        """
+        Find nearest hospitals with filters.
+        Pass active_on (date or 'YYYY-MM-DD') to drop expired empanelments.
+        """
+        active_on = self.normalize_date(active_on)
         
-        for hospital in self.hospitals:
-            # Calculate distance
-            distance = self.calculate_distance(
-                user_lat, user_lng,
-                hospital['lat'], hospital['lng']
-            )
-            
-            # Apply distance filter
-            if distance > max_distance_km:
-                continue
-            
-            # Apply Ayushman filter
-            if ayushman_only and not hospital.get('ayushman', False):
-                continue
-            
-            # Add distance to hospital data
-            hospital_with_distance = hospital.copy()
-            hospital_with_distance['distance_km'] = round(distance, 1)
-            hospital_with_distance['travel_time_min'] = round(distance * 2)  # Rough estimate
-            
-            # Add Ayushman details if available
-            if hospital.get('ayushman', False):
-                ayushman_info = self.get_ayushman_info(hospital['id'])
-                hospital_with_distance['ayushman_details'] = ayushman_info
-            
-            eligible_hospitals.append(hospital_with_distance)
+        ayushman_flags = self.ayushman_flags
+        predicate = None
+        if ayushman_only and active_on:
+            predicate = lambda position: (ayushman_flags[position] and
+                                          self.is_empanelment_active(self.hospitals[position]['id'], active_on))
+        elif ayushman_only:
+            predicate = lambda position: ayushman_flags[position]
+
+        nearest = self.spatial_index.nearest(
+            user_lat, user_lng, limit, max_distance_km,
+            self.calculate_distance, predicate
+        )
+
+        eligible_hospitals = [self.with_distance(position, distance, active_on) for distance, position in nearest]
+        return eligible_hospitals  # Already sorted by distance, top `limit` only
+    
+    def with_distance(self, position, distance, active_on=None):
+        """Copy of the pre-joined hospital row with distance and travel time added"""
+        hospital = self.joined_hospitals[position]
+        hospital_with_distance = hospital.copy()
+        hospital_with_distance['distance_km'] = round(distance, 1)
+        hospital_with_distance['travel_time_min'] = round(distance * 2)  # Rough estimate
         
-        # Sort by distance
-        eligible_hospitals.sort(key=lambda x: x['distance_km'])
+        if active_on and hospital_with_distance.get('ayushman_details') is not None:
+            if not self.is_empanelment_active(hospital['id'], active_on):
+                hospital_with_distance['ayushman_details'] = None
         
-        return eligible_hospitals[:10]  # Return top 10 nearest
+        return hospital_with_distance
     
-    def get_ayushman_info(self, hospital_id):
-        """Get Ayushman Bharat details for hospital"""
-        for empaneled in self.ayushman_data.get('ayushman_empaneled', []):
-            if empaneled['hospital_id'] == hospital_id:
-                return empaneled
-        return None
+    def get_ranker(self):
+        """Inverted filter indexes, built on first use"""
+        if self.ranker is None:
+            self.ranker = HospitalRanker(self.hospitals, self.spatial_index)
+        return self.ranker
     
-    def find_hospitals_by_specialty(self, specialty, user_lat, user_lng, ayushman_only=False):
-        """Find hospitals by medical specialty"""
-        all_hospitals = self.find_nearest_hospitals(user_lat, user_lng, ayushman_only)
+    def rank_hospitals(self, user_lat, user_lng, specialty=None, emergency=False, icu=False, ambulance=False,
+                       ayushman_only=False, max_distance_km=50, limit=10, weights=None, active_on=None):
+        """
+        Hospitals ranked by distance plus emergency capability, ICU beds,
+        ambulance service and rating. `weights` is a profile name from
+        RANKING_PROFILES or a {feature: weight} dict.
+        """
+        active_on = self.normalize_date(active_on)
+        predicate = None
+        if ayushman_only and active_on:
+            predicate = lambda position: self.is_empanelment_active(self.hospitals[position]['id'], active_on)
         
-        specialty_hospitals = []
-        for hospital in all_hospitals:
-            if specialty.lower() in [s.lower() for s in hospital.get('specialties', [])]:
-                specialty_hospitals.append(hospital)
+        ranked = self.get_ranker().rank(
+            user_lat, user_lng, self.calculate_distance, max_distance_km, limit, weights, predicate,
+            specialty=specialty, emergency=emergency, icu=icu, ambulance=ambulance, ayushman=ayushman_only
+        )
         
-        return specialty_hospitals
+        results = []
+        for score, distance, position in ranked:
+            hospital = self.with_distance(position, distance, active_on)
+            hospital['rank_score'] = round(score, 3)
+            results.append(hospital)
+        return results
+    
+    def find_nearest_hospitals_batch(self, points, k=10, ayushman_only=False, max_distance_km=50, chunk_size=None):
+        """
+        Nearest hospitals for many (lat, lng) points at once (offline jobs).
+        Returns (indices, distances) arrays of shape (n_points, k) where
+        indices point into self.hospitals and unused slots hold -1 / inf.
+        """
+        if self.batch_engine is None:
+            # NumPy is only needed by bulk jobs, keep it off the request path
+            from batch_distance import BatchHaversine
+            if self.snapshot is not None:
+                self.batch_engine = BatchHaversine(self.hospitals.lats, self.hospitals.lngs, self.ayushman_flags)
+            else:
+                self.batch_engine = BatchHaversine(
+                    [h['lat'] for h in self.hospitals],
+                    [h['lng'] for h in self.hospitals],
+                    self.ayushman_flags
+                )
+
+        return self.batch_engine.nearest(points, k, ayushman_only, max_distance_km, chunk_size)
+    
+    def get_ayushman_info(self, hospital_id, active_on=None):
+        """Get Ayushman Bharat details for hospital"""
+        empaneled = self.empanelments_by_hospital.get(hospital_id)
+        active_on = self.normalize_date(active_on)
+        if empaneled is not None and active_on and not self.is_empanelment_active(hospital_id, active_on):
+            return None
+        return empaneled
+    
+    def is_empanelment_active(self, hospital_id, active_on):
+        """Check if a hospital's empanelment is still valid on a date"""
+        empaneled = self.empanelments_by_hospital.get(hospital_id)
+        if empaneled is None:
+            return False
+        return (empaneled.get('valid_until') or '9999-12-31') >= self.normalize_date(active_on)
+    
+    def get_active_empanelments(self, active_on=None):
+        """All empanelments valid on a date (defaults to today)"""
+        active_on = self.normalize_date(active_on) or date.today().isoformat()
+        start = bisect.bisect_left(self.empanelment_expiry, (active_on, -1))
+        return [self.empanelment_list[position] for _, position in self.empanelment_expiry[start:]]
+    
+    def normalize_date(self, value):
+        """Dates are compared as ISO 'YYYY-MM-DD' strings"""
+        if value is None:
+            return None
+        if isinstance(value, (date, datetime)):
+            return value.strftime('%Y-%m-%d')
+        return str(value)[:10]
+    
+    def find_hospitals_by_specialty(self, specialty, user_lat, user_lng, ayushman_only=False):
+        """Find the nearest hospitals with a medical specialty"""
+        if not specialty:
+            return []
+        matches = self.get_ranker().filter_positions(specialty=specialty, ayushman=ayushman_only)
+        nearest = self.spatial_index.nearest(
+            user_lat, user_lng, 10, 50, self.calculate_distance, matches.__contains__
+        )
+        return [self.with_distance(position, distance) for distance, position in nearest]
     
     def get_emergency_contacts(self, hospital_id):
         """Get emergency contact information"""
-        for hospital in self.hospitals:
-            if hospital['id'] == hospital_id:
-                return {
-                    'emergency_phone': hospital.get('phone'),
-                    'ambulance_phone': hospital.get('ambulance_contact', hospital.get('phone')),
-                    'emergency_services': hospital.get('emergency_services', False)
-                }
-        return None
+        hospital = self.hospitals_by_id.get(hospital_id)
+        if hospital is None:
+            return None
+        return {
+            'emergency_phone': hospital.get('phone'),
+            'ambulance_phone': hospital.get('ambulance_contact', hospital.get('phone')),
+            'emergency_services': hospital.get('emergency_services', False)
+        }
+
+class HospitalDataReloader:
+    """
+    Watches the hospital data files and swaps in a freshly built HospitalFinder
+    when they change. The rebuild runs on a background thread and the swap is a
+    single reference assignment, so a request keeps the finder it started with
+    and never waits on a rebuild.
+    """
+    
+    def __init__(self, finder):
+        self.finder = finder
+        self.data_dir = finder.data_dir
+        self.stamp = data_stamp(self.data_dir)
+        # Checksum of what the finder was built from; reloads compare against it
+        self.data_version = data_checksum(self.data_dir)
+        self.reload_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.loaded_at = datetime.now().isoformat()
+        self.last_reload_seconds = None
+        self.last_error = None
+        self.reloads = 0
+        self.failures = 0
+    
+    def current_version(self):
+        return self.data_version
+    
+    def check(self):
+        """Reload if the watched files changed since the last load. Returns True on swap."""
+        if data_stamp(self.data_dir) == self.stamp:
+            return False
+        return self.reload()
+    
+    def reload(self, force=False):
+        """Build a new finder from disk and swap it in; the old one serves until then"""
+        if not self.reload_lock.acquire(blocking=False):
+            return False  # a rebuild is already running
+        try:
+            stamp = data_stamp(self.data_dir)
+            version = data_checksum(self.data_dir)
+            snapshot_changed = stamp[-1] != self.stamp[-1]
+            if not force and not snapshot_changed and version == self.current_version():
+                # Touched but the content is the same
+                self.stamp = stamp
+                return False
+            
+            start = time.perf_counter()
+            try:
+                finder = HospitalFinder(self.data_dir, strict=True)
+                finder.get_ranker()  # warm the ranking indexes before requests see it
+            except Exception as e:
+                # Keep serving the old data; a half-written file is retried on the next poll
+                self.failures += 1
+                self.last_error = str(e)
+                print(f"❌ Hospital data reload failed, keeping version {self.data_version}: {e}")
+                return False
+            elapsed = time.perf_counter() - start
+            
+            self.finder = finder
+            # Only remember the stamp if nothing changed while we were building
+            if data_stamp(self.data_dir) == stamp:
+                self.stamp = stamp
+            self.data_version = version
+            self.loaded_at = datetime.now().isoformat()
+            self.last_reload_seconds = round(elapsed, 3)
+            self.last_error = None
+            self.reloads += 1
+            print(f"✅ Hospital data reloaded in {elapsed:.2f}s (version {version})")
+            return True
+        finally:
+            self.reload_lock.release()
+    
+    def reload_async(self, force=False):
+        """Start a reload on its own thread and return immediately"""
+        thread = threading.Thread(target=self.reload, args=(force,), name='hospital-data-reload', daemon=True)
+        thread.start()
+        return thread
+    
+    def run(self, interval):
+        while not self.stop_event.wait(interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"❌ Hospital data watch failed: {str(e)}")
+    
+    def start(self, interval=30):
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, args=(interval,), name='hospital-data-watcher', daemon=True)
+            self.thread.start()
+    
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+    
+    def status(self):
+        finder = self.finder
+        return {
+            'data_version': self.current_version(),
+            'loaded_at': self.loaded_at,
+            'hospital_count': len(finder.hospitals),
+            'snapshot': finder.snapshot is not None,
+            'last_reload_seconds': self.last_reload_seconds,
+            'reloads': self.reloads,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'reloading': self.reload_lock.locked(),
+            'watching': self.thread is not None and self.thread.is_alive()
+        }
 
 # Global instance
 hospital_finder = HospitalFinder()
+hospital_data = HospitalDataReloader(hospital_finder)
+
+def get_hospital_finder():
+    """The finder serving requests now (hospital_finder is only the one built at import)"""
+    return hospital_data.finder
 
 # Updated find_nearest_hospitals function
 def find_nearest_hospitals(user_lat, user_lng, ayushman_only=False):
-    return hospital_finder.find_nearest_hospitals(user_lat, user_lng, ayushman_only)
+    with timed('hospital_search'):
+        return get_hospital_finder().find_nearest_hospitals(user_lat, user_lng, ayushman_only)
+
+def rank_hospitals(user_lat, user_lng, ayushman_only=False, **options):
+    with timed('hospital_rank'):
+        return get_hospital_finder().rank_hospitals(user_lat, user_lng, ayushman_only=ayushman_only, **options)
@@ -0,0 +1,161 @@
+import heapq
+
+# Feature weights; each feature is scaled to 0..1 before weighting
+RANKING_PROFILES = {
+    'default': {'distance': 0.6, 'rating': 0.2, 'emergency': 0.1, 'icu': 0.05, 'ambulance': 0.05},
+    'emergency': {'distance': 0.45, 'emergency': 0.2, 'icu': 0.15, 'ambulance': 0.1, 'rating': 0.1},
+}
+
+FEATURES = ['distance', 'emergency', 'icu', 'ambulance', 'rating']
+
+# icu_beds at or above this count get the full ICU score
+ICU_BEDS_SATURATION = 50
+MAX_RATING = 5.0
+# Unknown ratings score as average rather than worst
+UNKNOWN_RATING_SCORE = 0.5
+
+# Filter matches up to this size are scored directly; bigger sets are cheaper
+# to walk through the spatial grid with a membership test
+DIRECT_SCAN_LIMIT = 4096
+
+
+def number(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def column(hospitals, key, default=None):
+    """Every hospital's value for `key`; snapshot tables read the column directly"""
+    if hasattr(hospitals, 'column_values'):
+        return hospitals.column_values(key, default)
+    return [hospital.get(key, default) for hospital in hospitals]
+
+
+def resolve_weights(weights=None):
+    """A profile name or a partial {feature: weight} dict over the default profile"""
+    if weights is None:
+        return RANKING_PROFILES['default']
+    if isinstance(weights, str):
+        if weights not in RANKING_PROFILES:
+            raise ValueError(f"Unknown ranking profile: {weights}")
+        return RANKING_PROFILES[weights]
+    unknown = set(weights) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown ranking features: {', '.join(sorted(unknown))}")
+    return dict(RANKING_PROFILES['default'], **{name: float(value) for name, value in weights.items()})
+
+
+class HospitalRanker:
+    """
+    Multi-criteria hospital ranking over precomputed inverted indexes.
+    Specialty, emergency, ICU, ambulance and Ayushman filters each map to
+    a set of hospital positions; a query intersects the sets it needs,
+    smallest first, and only scores the hospitals that match.
+    """
+
+    def __init__(self, hospitals, spatial_index):
+        self.size = len(hospitals)
+        self.spatial_index = spatial_index
+        self.lats = spatial_index.lats
+        self.lngs = spatial_index.lngs
+
+        emergency = [bool(value) for value in column(hospitals, 'emergency_services', False)]
+        icu_beds = [number(value) for value in column(hospitals, 'icu_beds', 0)]
+        ambulance = [bool(value) for value in column(hospitals, 'ambulance_service', False)]
+        ayushman = [bool(value) for value in column(hospitals, 'ayushman', False)]
+        ratings = column(hospitals, 'rating', None)
+
+        self.by_specialty = {}
+        for position, names in enumerate(column(hospitals, 'specialties', None)):
+            for name in {str(name).casefold() for name in names or []}:
+                self.by_specialty.setdefault(name, set()).add(position)
+
+        self.by_feature = {
+            'emergency': {position for position, value in enumerate(emergency) if value},
+            'icu': {position for position, value in enumerate(icu_beds) if value > 0},
+            'ambulance': {position for position, value in enumerate(ambulance) if value},
+            'ayushman': {position for position, value in enumerate(ayushman) if value},
+        }
+
+        # Static per-hospital feature scores in 0..1
+        self.feature_scores = {
+            'emergency': [1.0 if value else 0.0 for value in emergency],
+            'icu': [min(1.0, value / ICU_BEDS_SATURATION) for value in icu_beds],
+            'ambulance': [1.0 if value else 0.0 for value in ambulance],
+            'rating': [
+                min(1.0, number(value) / MAX_RATING) if value is not None else UNKNOWN_RATING_SCORE
+                for value in ratings
+            ],
+        }
+
+    def specialties(self):
+        return sorted(self.by_specialty)
+
+    def filter_positions(self, specialty=None, emergency=False, icu=False, ambulance=False, ayushman=False):
+        """Positions matching every requested filter, or None when nothing is filtered"""
+        sets = []
+        if specialty:
+            sets.append(self.by_specialty.get(str(specialty).casefold(), set()))
+        for name, wanted in (('emergency', emergency), ('icu', icu), ('ambulance', ambulance), ('ayushman', ayushman)):
+            if wanted:
+                sets.append(self.by_feature[name])
+        if not sets:
+            return None
+
+        sets.sort(key=len)
+        matches = sets[0]
+        for other in sets[1:]:
+            if not matches:
+                break
+            matches = matches & other  # iterates the smaller side
+        return matches
+
+    def rank(self, lat, lng, distance_fn, max_distance_km=50, limit=10, weights=None,
+             predicate=None, **filters):
+        """
+        Best `limit` hospitals within max_distance_km by weighted score.
+        Returns (score, distance, position) tuples, best first.
+        """
+        weights = resolve_weights(weights)
+        matches = self.filter_positions(**filters)
+
+        radius = max_distance_km * (1 + 1e-9)
+        if matches is not None and len(matches) <= DIRECT_SCAN_LIMIT:
+            positions = sorted(matches)
+        else:
+            positions = self.spatial_index.candidates(lat, lng, radius)
+            if matches is not None:
+                positions = (position for position in positions if position in matches)
+
+        min_lat, max_lat, _ = self.spatial_index.bounding_box(lat, lng, radius)
+        distance_weight = weights.get('distance', 0.0)
+        static_weights = [(self.feature_scores[name], weight) for name, weight in weights.items()
+                          if name != 'distance' and weight]
+        lats, lngs = self.lats, self.lngs
+
+        heap = []  # min-heap of the best `limit` entries
+        for position in positions:
+            hospital_lat = lats[position]
+            if hospital_lat < min_lat or hospital_lat > max_lat:
+                continue
+            if predicate is not None and not predicate(position):
+                continue
+            distance = distance_fn(lat, lng, hospital_lat, lngs[position])
+            if distance > max_distance_km:
+                continue
+
+            score = distance_weight * (1 - distance / max_distance_km) if max_distance_km else 0.0
+            for scores, weight in static_weights:
+                score += weight * scores[position]
+
+            # Ties go to the closer hospital, then the earlier one in the data
+            key = (score, -distance, -position)
+            if len(heap) < limit:
+                heapq.heappush(heap, (key, position, distance))
+            elif key > heap[0][0]:
+                heapq.heapreplace(heap, (key, position, distance))
+
+        ordered = sorted(heap, reverse=True)
+        return [(key[0], distance, position) for key, position, distance in ordered]
@@ -0,0 +1,279 @@
+import bisect
+import contextvars
+import functools
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+
+# METRICS_ENABLED=0 turns timers, counters and traces into no-ops
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') == '1'
+# Free-text debug prints (may contain symptoms, phone numbers, model output); off unless asked for
+VERBOSE_LOGS = os.getenv('VERBOSE_LOGS', '0') == '1'
+# Share of info-level structured events written; warnings and errors are always written
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', '0.1'))
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def label_text(label_names, key, extra=None):
+    pairs = list(zip(label_names, key)) + (extra or [])
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            items = sorted(self.values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{label_text(self.label_names, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.series = {}  # key -> [bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        self.add(tuple(str(labels.get(name, '')) for name in self.label_names), value)
+
+    def add(self, key, value):
+        """observe() with the label tuple already built (the timer's fast path)"""
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            items = sorted((key, list(series)) for key, series in self.series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{label_text(self.label_names, key, [('le', bound)])} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{label_text(self.label_names, key, [('le', '+Inf')])} {cumulative}")
+            lines.append(f"{self.name}_sum{label_text(self.label_names, key)} {series[-1]}")
+            lines.append(f"{self.name}_count{label_text(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """
+    Value read from a callback at scrape time (queue depths, breaker state, ...).
+    kind='counter' exposes a running total kept elsewhere, e.g. in a stats() dict.
+    """
+
+    def __init__(self, name, help_text, read, kind='gauge'):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.kind = kind
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        try:
+            value = self.read()
+        except Exception:
+            return lines
+        if value is not None:
+            lines.append(f"{self.name} {float(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help_text, label_names=()):
+        return self.register(Counter(name, help_text, label_names))
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, label_names, buckets))
+
+    def gauge(self, name, help_text, read, kind='gauge'):
+        return self.register(Gauge(name, help_text, read, kind))
+
+    def render(self):
+        """Prometheus text exposition format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.histogram(
+    'swasthya_stage_seconds', 'Time spent per hot-path stage', ['stage']
+)
+stage_errors = registry.counter(
+    'swasthya_stage_errors_total', 'Stages that raised', ['stage']
+)
+http_requests = registry.counter(
+    'swasthya_http_requests_total', 'HTTP requests handled', ['endpoint', 'method', 'status']
+)
+http_seconds = registry.histogram(
+    'swasthya_http_request_seconds', 'HTTP request latency', ['endpoint']
+)
+events = registry.counter(
+    'swasthya_events_total', 'Notable events (fallbacks, sheds, drops, errors)', ['event']
+)
+
+
+# Tracing: one Trace per request, carried in a context variable so stages
+# timed on other threads (via in_context) land in the same trace
+
+current_trace = contextvars.ContextVar('current_trace', default=None)
+
+
+class Trace:
+    __slots__ = ('trace_id', 'start', 'spans')
+
+    def __init__(self, trace_id=None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.start = time.perf_counter()
+        self.spans = []  # (stage, seconds); list.append is thread-safe
+
+    def summary(self):
+        totals = {}
+        for stage, seconds in self.spans:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return {stage: round(seconds * 1000, 2) for stage, seconds in totals.items()}
+
+
+def start_trace(trace_id=None):
+    """Begin a trace for the current request; returns it (or None when disabled)"""
+    if not METRICS_ENABLED:
+        return None
+    trace = Trace(trace_id)
+    current_trace.set(trace)
+    return trace
+
+
+def in_context(fn):
+    """Wrap fn to run in a copy of the caller's context (for executor.submit)"""
+    if not METRICS_ENABLED:
+        return fn
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+class StageTimer:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        stage_seconds.add((self.stage,), elapsed)
+        if exc_type is not None:
+            stage_errors.inc(stage=self.stage)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.spans.append((self.stage, elapsed))
+        return False
+
+
+class NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_TIMER = NoopTimer()
+
+
+def timed(stage):
+    """Context manager timing one stage: `with timed('llm'): ...`"""
+    if not METRICS_ENABLED:
+        return NOOP_TIMER
+    return StageTimer(stage)
+
+
+def timed_stage(stage):
+    """Decorator form of timed()"""
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with StageTimer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# Logging
+
+def log_event(event, level='info', **fields):
+    """
+    One structured JSON log line. Info events are sampled at LOG_SAMPLE_RATE;
+    warnings and errors are always written and counted. Never pass symptoms,
+    phone numbers or model output as fields.
+    """
+    if level != 'info':
+        events.inc(event=event)
+    elif LOG_SAMPLE_RATE < 1.0 and random.random() >= LOG_SAMPLE_RATE:
+        return
+    record = {'ts': datetime.now().isoformat(), 'level': level, 'event': event}
+    trace = current_trace.get()
+    if trace is not None:
+        record['trace_id'] = trace.trace_id
+    record.update(fields)
+    print(json.dumps(record, default=str, ensure_ascii=False))
+
+
+def verbose(message):
+    """Free-text debug print, only with VERBOSE_LOGS=1"""
+    if VERBOSE_LOGS:
+        print(message)
@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 class User(AbstractUser):
@@ -29,6 +32,10 @@ class TriageSession(models.Model):
     reasoning = models.TextField()
     session_id = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        # Dashboard and history read a patient's latest sessions
+        indexes = [models.Index(fields=['patient', '-created_at'], name='triage_patient_created_idx')]
 
 class MedicationReminder(models.Model):
     FREQUENCY_CHOICES = [
@@ -45,6 +52,9 @@ class MedicationReminder(models.Model):
     reminder_time = models.TimeField()
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [models.Index(fields=['patient', 'is_active'], name='reminder_patient_active_idx')]
 
 class DoctorConsultation(models.Model):
     patient = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -53,4 +63,18 @@ class DoctorConsultation(models.Model):
     consultation_type = models.CharField(max_length=50)  # video, voice, chat
     status = models.CharField(max_length=20, default='scheduled')
     scheduled_time = models.DateTimeField()
-    created_at = models.DateTimeField(default=timezone.now)
\ No newline at end of file
+    created_at = models.DateTimeField(default=timezone.now)
+
+
+def dashboard_cache_key(patient_id):
+    return f"dashboard:{patient_id}"
+
+@receiver([post_save, post_delete], sender=TriageSession)
+@receiver([post_save, post_delete], sender=MedicationReminder)
+def invalidate_dashboard(sender, instance, **kwargs):
+    """
+    Drop the cached dashboard when a patient's sessions or reminders change.
+    Bulk writes (bulk_create, queryset.update) send no signals and must call
+    cache.delete(dashboard_cache_key(...)) themselves.
+    """
+    cache.delete(dashboard_cache_key(instance.patient_id))
@@ -1,30 +1,20 @@
 import requests
 import os
-from twilio.rest import Client
+from metrics import log_event, verbose
+from notification_transport import get_transport
 
 def send_sms_reminder(phone_number, message):
     """
     Send SMS reminder using Twilio (Free trial available)
     """
     try:
-        # For demo purposes - you can use Twilio free trial
-        account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-        auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-        twilio_number = os.getenv('TWILIO_PHONE_NUMBER')
-        
-        client = Client(account_sid, auth_token)
-        
-        message = client.messages.create(
-            body=message,
-            from_=twilio_number,
-            to=phone_number
-        )
-        
-        return {'success': True, 'message_id': message.sid}
-        
+        # Shared client and connection pool, no new TLS session per message
+        return get_transport().send('sms', phone_number, message)
+
     except Exception as e:
         # Fallback: Log the message that would be sent
-        print(f"DEMO SMS: To {phone_number}: {message}")
+        log_event('notify_demo', channel='sms')
+        verbose(f"DEMO SMS: To {phone_number}: {message}")
         return {'success': True, 'demo_mode': True, 'message': 'SMS would be sent in production'}
 
 def send_whatsapp_reminder(phone_number, message):
@@ -32,19 +22,21 @@ def send_whatsapp_reminder(phone_number, message):
     Send WhatsApp reminder (Twilio supports WhatsApp in trial)
     """
     try:
-        account_sid = os.getenv('TWILIO_ACCOUNT_SID')
-        auth_token = os.getenv('TWILIO_AUTH_TOKEN')
-        
-        client = Client(account_sid, auth_token)
-        
-        message = client.messages.create(
-            body=message,
-            from_='whatsapp:+14155238886',  # Twilio WhatsApp sandbox
-            to=f'whatsapp:{phone_number}'
-        )
-        
-        return {'success': True, 'message_id': message.sid}
-        
+        return get_transport().send('whatsapp', phone_number, message)
+
     except Exception as e:
-        print(f"DEMO WhatsApp: To {phone_number}: {message}")
-        return {'success': True, 'demo_mode': True}
\ No newline at end of file
+        log_event('notify_demo', channel='whatsapp')
+        verbose(f"DEMO WhatsApp: To {phone_number}: {message}")
+        return {'success': True, 'demo_mode': True}
+
+def send_many(channel, messages):
+    """
+    Send a batch of reminders ({'to': ..., 'body': ...}) over the shared pool
+    """
+    transport = get_transport()
+    if not transport.configured:
+        log_event('notify_demo', channel=channel, messages=len(messages))
+        for message in messages:
+            verbose(f"DEMO {channel.upper()}: To {message['to']}: {message['body']}")
+        return [{'success': True, 'demo_mode': True} for _ in messages]
+    return transport.send_many(channel, messages)
@@ -0,0 +1,108 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+from metrics import timed
+
+# Twilio WhatsApp sandbox sender
+WHATSAPP_SANDBOX_NUMBER = '+14155238886'
+
+
+class NotificationTransport:
+    """
+    One Twilio client over a keep-alive connection pool, shared by every
+    module that sends SMS or WhatsApp messages.
+    """
+
+    def __init__(self, account_sid=None, auth_token=None, sms_from=None,
+                 whatsapp_from=WHATSAPP_SANDBOX_NUMBER, pool_size=16, timeout=10, base_url=None):
+        self.sms_from = sms_from
+        self.whatsapp_from = whatsapp_from
+        self.pool_size = pool_size
+        self.executor = None
+        self.lock = threading.Lock()
+        self.client = None
+
+        if account_sid and auth_token:
+            http_client = TwilioHttpClient(pool_connections=True, timeout=timeout)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            http_client.session.mount('https://', adapter)
+            http_client.session.mount('http://', adapter)
+            self.client = Client(account_sid, auth_token, http_client=http_client)
+            if base_url:
+                # Point at a local stand-in instead of api.twilio.com
+                self.client.api.base_url = base_url
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            account_sid=os.getenv('TWILIO_ACCOUNT_SID'),
+            auth_token=os.getenv('TWILIO_AUTH_TOKEN'),
+            sms_from=os.getenv('TWILIO_PHONE_NUMBER'),
+            whatsapp_from=os.getenv('TWILIO_WHATSAPP_NUMBER', WHATSAPP_SANDBOX_NUMBER),
+            pool_size=int(os.getenv('TWILIO_POOL_SIZE', '16')),
+            base_url=os.getenv('TWILIO_API_BASE_URL') or None
+        )
+
+    @property
+    def configured(self):
+        return self.client is not None
+
+    def address(self, channel, phone_number):
+        """Sender and recipient for a channel ('sms' or 'whatsapp')"""
+        if channel == 'whatsapp':
+            return f'whatsapp:{self.whatsapp_from}', f'whatsapp:{phone_number}'
+        if channel == 'sms':
+            return self.sms_from, phone_number
+        raise ValueError(f"Unknown channel: {channel}")
+
+    def send(self, channel, phone_number, body):
+        """Send one message; raises on failure so callers decide how to degrade"""
+        if self.client is None:
+            raise RuntimeError('Twilio credentials not configured')
+        from_, to = self.address(channel, phone_number)
+        with timed(channel):
+            message = self.client.messages.create(body=body, from_=from_, to=to)
+        return {'success': True, 'message_id': message.sid, 'status': message.status}
+
+    def send_many(self, channel, messages):
+        """
+        Send many messages concurrently over the shared pool.
+        `messages` is a list of {'to': ..., 'body': ...}; results keep that order.
+        """
+        def send_one(message):
+            try:
+                return self.send(channel, message['to'], message['body'])
+            except Exception as e:
+                return {'success': False, 'error': str(e)}
+
+        return list(self.get_executor().map(send_one, messages))
+
+    def get_executor(self):
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='notify')
+            return self.executor
+
+
+transport = None
+transport_lock = threading.Lock()
+
+def reset_transport():
+    """Forget the shared transport so the next get_transport() builds a new one (after fork)"""
+    global transport
+    with transport_lock:
+        transport = None
+
+def get_transport():
+    """Shared transport, built from TWILIO_* environment variables on first use"""
+    global transport
+    if transport is None:
+        with transport_lock:
+            if transport is None:
+                transport = NotificationTransport.from_env()
+    return transport
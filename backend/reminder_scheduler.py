@@ -0,0 +1,254 @@
+import heapq
+import itertools
+import re
+import threading
+from datetime import datetime, timedelta
+
+from metrics import log_event, verbose
+
+DEFAULT_TIMES = {
+    'once_daily': ['09:00'],
+    'twice_daily': ['09:00', '21:00'],
+    'thrice_daily': ['08:00', '14:00', '20:00'],
+    'weekly': ['09:00'],
+}
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Used when nothing about the frequency can be understood (the old flat rule)
+FALLBACK_INTERVAL = timedelta(hours=8)
+
+
+def parse_time(value):
+    """'09:00' / '9:00 PM' -> (hour, minute)"""
+    match = re.search(r'(\d{1,2}):(\d{2})\s*([ap]\.?m\.?)?', value or '', re.IGNORECASE)
+    if not match:
+        return None
+    hour, minute = int(match.group(1)), int(match.group(2))
+    meridiem = (match.group(3) or '').lower().replace('.', '')
+    if meridiem == 'pm' and hour < 12:
+        hour += 12
+    elif meridiem == 'am' and hour == 12:
+        hour = 0
+    return hour % 24, minute
+
+
+def next_fire_time(medication_data, after):
+    """
+    Next reminder strictly after `after`, from the medication's frequency:
+    once/twice/thrice_daily at the given times, weekly on a day, or
+    "Every N hours" as in medications.json.
+    """
+    frequency = str(medication_data.get('frequency', '')).strip().lower()
+    times = medication_data.get('times') or []
+    if not times and medication_data.get('reminder_time'):
+        times = [medication_data['reminder_time']]
+
+    every = re.match(r'every\s+(\d+)\s*(hour|hr|h)', frequency)
+    if every:
+        return after + timedelta(hours=int(every.group(1)))
+
+    if frequency == 'weekly':
+        # Day comes from a 'day' field or the frontend's "monday at 09:00" form
+        day = str(medication_data.get('day', '')).lower()
+        for weekday in WEEKDAYS:
+            if times and weekday in str(times[0]).lower():
+                day = weekday
+        weekday = WEEKDAYS.index(day) if day in WEEKDAYS else after.weekday()
+        hour, minute = (parse_time(str(times[0])) if times else None) or (9, 0)
+        candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        candidate += timedelta(days=(weekday - after.weekday()) % 7)
+        if candidate <= after:
+            candidate += timedelta(days=7)
+        return candidate
+
+    if frequency in DEFAULT_TIMES:
+        slots = sorted(filter(None, (parse_time(str(t)) for t in times))) or \
+            [parse_time(t) for t in DEFAULT_TIMES[frequency]]
+        for day_offset in (0, 1):
+            day = after + timedelta(days=day_offset)
+            for hour, minute in slots:
+                candidate = day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+                if candidate > after:
+                    return candidate
+
+    return after + FALLBACK_INTERVAL
+
+
+def reminder_message(schedule):
+    medication = schedule.get('medication', {})
+    name = medication.get('name') or medication.get('medicine_name') or 'your medicine'
+    dosage = medication.get('dosage')
+    dose = f" ({dosage})" if dosage else ''
+    return f"💊 Swasthya Saathi reminder: time to take {name}{dose}."
+
+
+def schedule_key(schedule, position):
+    # Schedules saved before ids existed are keyed by their place in the file
+    return schedule.get('schedule_id') or f"legacy-{position}"
+
+
+class ReminderScheduler:
+    """
+    Fires medication reminders from a min-heap ordered by next fire time.
+    Each tick only pops what is due, so cost follows the number of due
+    reminders, not the number of schedules. Cancelled schedules are
+    skipped lazily when they reach the top of the heap.
+
+    persist(updates) is handed each batch of rescheduled (schedule_id,
+    schedule) pairs so the new next_reminder survives a restart. source()
+    is polled before every tick and returns only the schedules saved since
+    its last call; that is how schedules saved by other processes reach
+    the heap.
+    """
+
+    def __init__(self, send_batch=None, clock=datetime.now, batch_size=500, persist=None, source=None):
+        self.send_batch = send_batch
+        self.persist = persist
+        self.source = source
+        self.clock = clock
+        self.batch_size = batch_size
+        self.heap = []
+        self.schedules = {}
+        self.versions = {}
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.stats_counters = {'fired': 0, 'failed': 0, 'batches': 0}
+
+    def add(self, schedule_id, schedule, fire_at=None):
+        """Register (or replace) a schedule; fire_at defaults to its next slot"""
+        if fire_at is None:
+            fire_at = next_fire_time(schedule.get('medication', {}), self.clock())
+        with self.lock:
+            version = self.versions.get(schedule_id, 0) + 1
+            self.versions[schedule_id] = version
+            self.schedules[schedule_id] = schedule
+            schedule['next_reminder'] = fire_at.isoformat()
+            heapq.heappush(self.heap, (fire_at, next(self.counter), schedule_id, version))
+
+    def remove(self, schedule_id):
+        with self.lock:
+            self.schedules.pop(schedule_id, None)
+            self.versions.pop(schedule_id, None)
+
+    def load(self, schedules):
+        """Bulk-load saved schedules with one heapify"""
+        now = self.clock()
+        entries = []
+        with self.lock:
+            for position, schedule in enumerate(schedules):
+                schedule_id = schedule_key(schedule, position)
+                fire_at = self.saved_fire_time(schedule, now)
+                version = self.versions.get(schedule_id, 0) + 1
+                self.versions[schedule_id] = version
+                self.schedules[schedule_id] = schedule
+                schedule['next_reminder'] = fire_at.isoformat()
+                entries.append((fire_at, next(self.counter), schedule_id, version))
+            self.heap.extend(entries)
+            heapq.heapify(self.heap)
+        return len(entries)
+
+    def sync(self, schedules):
+        """Add newly saved schedules not already on the heap (e.g. from another worker). Returns how many."""
+        now = self.clock()
+        added = 0
+        for schedule in schedules:
+            with self.lock:
+                known = schedule['schedule_id'] in self.versions
+            if not known:
+                self.add(schedule['schedule_id'], schedule, fire_at=self.saved_fire_time(schedule, now))
+                added += 1
+        return added
+
+    def pull(self):
+        """Add what source() saved since the last pull. Returns schedules added."""
+        return self.sync(self.source()) if self.source else 0
+
+    def saved_fire_time(self, schedule, now):
+        # Keep a stored future slot; slots missed while we were down are skipped, not replayed
+        try:
+            saved = datetime.fromisoformat(schedule.get('next_reminder', ''))
+            if saved > now:
+                return saved
+        except (TypeError, ValueError):
+            pass
+        return next_fire_time(schedule.get('medication', {}), now)
+
+    def pop_due(self, now):
+        due = []
+        with self.lock:
+            while self.heap and len(due) < self.batch_size and self.heap[0][0] <= now:
+                fire_at, _, schedule_id, version = heapq.heappop(self.heap)
+                if self.versions.get(schedule_id) != version:
+                    continue  # removed or rescheduled since it was pushed
+                due.append((fire_at, schedule_id, version, self.schedules[schedule_id]))
+        return due
+
+    def tick(self):
+        """Fire everything due now in batches and reschedule it. Returns reminders fired."""
+        now = self.clock()
+        fired = 0
+        while True:
+            due = self.pop_due(now)
+            if not due:
+                return fired
+
+            messages = [
+                {'to': schedule.get('user_phone'), 'body': reminder_message(schedule)}
+                for _, _, _, schedule in due
+            ]
+            results = self.send_batch(messages) if self.send_batch else [{'success': True}] * len(due)
+            rescheduled = []
+
+            with self.lock:
+                self.stats_counters['batches'] += 1
+                for (fire_at, schedule_id, version, schedule), result in zip(due, results):
+                    self.stats_counters['fired' if result.get('success') else 'failed'] += 1
+                    if self.versions.get(schedule_id) != version:
+                        continue  # removed or replaced while sending
+                    # Next slot after this one (and never in the past)
+                    next_at = next_fire_time(schedule.get('medication', {}), max(fire_at, now))
+                    schedule['next_reminder'] = next_at.isoformat()
+                    schedule['sent_reminders'] = schedule.get('sent_reminders', 0) + 1
+                    heapq.heappush(self.heap, (next_at, next(self.counter), schedule_id, version))
+                    rescheduled.append((schedule_id, schedule))
+            if self.persist and rescheduled:
+                self.persist(rescheduled)
+            fired += len(due)
+
+    def next_due(self):
+        """Earliest pending fire time, or None"""
+        with self.lock:
+            while self.heap and self.versions.get(self.heap[0][2]) != self.heap[0][3]:
+                heapq.heappop(self.heap)
+            return self.heap[0][0] if self.heap else None
+
+    def run(self, interval=1.0):
+        while not self.stop_event.is_set():
+            try:
+                self.pull()
+                self.tick()
+            except Exception as e:
+                log_event('reminder_tick_failed', level='error', error=type(e).__name__)
+                verbose(f"Reminder tick failed: {str(e)}")
+            self.stop_event.wait(interval)
+
+    def start(self, interval=1.0):
+        if self.thread is None or not self.thread.is_alive():
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, args=(interval,), name='reminder-scheduler', daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=5):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.stats_counters)
+            stats['active_schedules'] = len(self.schedules)
+            stats['heap_size'] = len(self.heap)
+        return stats
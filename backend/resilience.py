@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a dependency is unhealthy. Tracks the outcome of the
+    last `window` calls; slow calls (over slow_call_seconds) count as
+    failures. Once at least min_calls are recorded and the failure rate
+    reaches the threshold the circuit opens and callers get an immediate
+    rejection. After open_seconds one probe call is let through at a time
+    (half-open); a success closes the circuit, a failure re-opens it. Calls
+    that started before the probe was let through do not decide it.
+    """
+
+    def __init__(self, failure_threshold=0.5, slow_call_seconds=8.0, window=20, min_calls=10,
+                 open_seconds=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.outcomes = deque(maxlen=window)  # True = failure
+        self.failures = 0
+        self.state = CLOSED
+        self.next_probe_at = 0.0
+        self.probe_started_at = 0.0
+        self.counters = {'calls': 0, 'failures': 0, 'slow_calls': 0, 'rejected': 0, 'opened': 0, 'probes': 0}
+
+    def allow(self):
+        """True if a call may go out now"""
+        if self.state == CLOSED:
+            return True  # fast path, no lock
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            now = self.clock()
+            if now >= self.next_probe_at:
+                # Half-open: one probe per open_seconds until one succeeds
+                self.state = HALF_OPEN
+                self.probe_started_at = now
+                self.next_probe_at = now + self.open_seconds
+                self.counters['probes'] += 1
+                return True
+            self.counters['rejected'] += 1
+            return False
+
+    def record(self, success, elapsed=0.0):
+        slow = elapsed > self.slow_call_seconds
+        failed = not success or slow
+        with self.lock:
+            self.counters['calls'] += 1
+            self.counters['failures'] += 0 if success else 1
+            self.counters['slow_calls'] += 1 if slow else 0
+
+            if self.state == HALF_OPEN:
+                if self.clock() - elapsed < self.probe_started_at:
+                    # Sent before the circuit opened: says nothing about recovery
+                    return
+                if failed:
+                    self.trip()
+                else:
+                    self.state = CLOSED
+                    self.outcomes.clear()
+                    self.failures = 0
+                return
+
+            if len(self.outcomes) == self.outcomes.maxlen:
+                self.failures -= self.outcomes[0]
+            self.outcomes.append(failed)
+            self.failures += failed
+            if (self.state == CLOSED and len(self.outcomes) >= self.min_calls
+                    and self.failures / len(self.outcomes) >= self.failure_threshold):
+                self.trip()
+
+    def trip(self):
+        self.state = OPEN
+        self.next_probe_at = self.clock() + self.open_seconds
+        self.counters['opened'] += 1
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats['state'] = self.state
+            stats['window_calls'] = len(self.outcomes)
+            stats['failure_rate'] = round(self.failures / len(self.outcomes), 3) if self.outcomes else 0.0
+        return stats
+
+
+class LatencyTracker:
+    """Rolling window of recent latencies with a cached percentile"""
+
+    def __init__(self, window=200, recompute_every=20):
+        self.samples = deque(maxlen=window)
+        self.recompute_every = recompute_every
+        self.added = 0
+        self.cached = {}
+        self.lock = threading.Lock()
+
+    def add(self, seconds):
+        with self.lock:
+            self.samples.append(seconds)
+            self.added += 1
+            if self.added < self.recompute_every or self.added % self.recompute_every == 0:
+                self.cached = {}
+
+    def percentile(self, q):
+        cached = self.cached.get(q)
+        if cached is not None:
+            return cached
+        with self.lock:
+            ordered = sorted(self.samples)
+            value = ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else None
+            self.cached[q] = value
+        return value
+
+    def __len__(self):
+        return len(self.samples)
+
+
+class Hedger:
+    """
+    Hedged requests: if the first attempt has not answered within the
+    recent p95 latency, send a second one and take whichever succeeds
+    first. Hedging waits until min_samples latencies have been seen.
+    With an admission controller the hedge needs a free slot of its own,
+    and both slots stay taken until their calls end (not when one wins),
+    so hedging never pushes outbound calls past the concurrency cap.
+    """
+
+    def __init__(self, percentile=0.95, min_delay=0.5, min_samples=20, max_workers=16):
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.latency = LatencyTracker()
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+        self.counters = {'calls': 0, 'hedged': 0, 'hedge_won': 0, 'hedge_skipped': 0}
+        self.lock = threading.Lock()
+
+    def increment(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def delay(self):
+        """Seconds to wait before hedging, or None while there is too little data"""
+        if len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, self.latency.percentile(self.percentile))
+
+    def call(self, fn, *args, admission=None):
+        """fn returns a result or None on failure; returns the first non-None result"""
+        self.increment('calls')
+        start = time.perf_counter()
+        delay = self.delay()
+        primary = self.executor.submit(fn, *args)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            result = primary.result()
+            if result is not None:
+                self.latency.add(time.perf_counter() - start)
+            return result  # a fast failure is not worth a hedge
+
+        if admission is not None and not admission.try_acquire():
+            # No spare slot: wait for the first attempt rather than exceed the cap
+            self.increment('hedge_skipped')
+            result = primary.result()
+            if result is not None:
+                self.latency.add(time.perf_counter() - start)
+            return result
+
+        self.increment('hedged')
+        hedge = self.executor.submit(fn, *args)
+        if admission is not None:
+            # Each slot is held until its own call actually ends, even if it loses;
+            # the primary's slot belongs to admission.call(), which would free it on return
+            hedge.add_done_callback(lambda future: admission.release())
+            release_primary = admission.hand_off()
+            if release_primary is not None:
+                primary.add_done_callback(lambda future: release_primary())
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    if future is hedge:
+                        self.increment('hedge_won')
+                    self.latency.add(time.perf_counter() - start)
+                    return result
+        return None
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+        stats['delay_seconds'] = self.delay()
+        stats['samples'] = len(self.latency)
+        return stats
+
+
+def breaker_from_env():
+    """Circuit breaker configured from GEMINI_BREAKER_* environment variables"""
+    return CircuitBreaker(
+        failure_threshold=float(os.getenv('GEMINI_BREAKER_FAILURE_RATE', '0.5')),
+        slow_call_seconds=float(os.getenv('GEMINI_BREAKER_SLOW_SECONDS', '8')),
+        window=int(os.getenv('GEMINI_BREAKER_WINDOW', '20')),
+        min_calls=int(os.getenv('GEMINI_BREAKER_MIN_CALLS', '10')),
+        open_seconds=float(os.getenv('GEMINI_BREAKER_OPEN_SECONDS', '30'))
+    )
+
+
+def hedger_from_env():
+    """Hedger when GEMINI_HEDGE=1, else None"""
+    if os.getenv('GEMINI_HEDGE') != '1':
+        return None
+    return Hedger(
+        percentile=float(os.getenv('GEMINI_HEDGE_PERCENTILE', '0.95')),
+        min_delay=float(os.getenv('GEMINI_HEDGE_MIN_DELAY', '0.5'))
+    )
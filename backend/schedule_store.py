@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import threading
+
+from reminder_scheduler import schedule_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS medication_schedules (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    schedule_id TEXT NOT NULL UNIQUE,
+    phone TEXT,
+    next_reminder TEXT,
+    sent_reminders INTEGER NOT NULL DEFAULT 0,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_schedule_phone ON medication_schedules (phone);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class MedicationScheduleStore:
+    """
+    Medication schedules backed by SQLite in WAL mode. The reminder
+    scheduler's progress (next_reminder, sent_reminders) lives in its own
+    columns, so rescheduling a batch updates only those rows.
+    """
+
+    def __init__(self, db_path, legacy_json_path=None):
+        self.db_path = db_path
+        self.local = threading.local()
+
+        self.connection().executescript(SCHEMA)
+        if legacy_json_path:
+            self.migrate_from_json(legacy_json_path)
+
+    def connection(self):
+        """One connection per thread; sqlite3 connections are not shareable"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or getattr(self.local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def row_values(self, schedule):
+        return (
+            schedule['schedule_id'],
+            schedule.get('user_phone') or None,
+            schedule.get('next_reminder'),
+            schedule.get('sent_reminders', 0),
+            json.dumps(schedule, ensure_ascii=False)
+        )
+
+    def add(self, schedule):
+        """Insert one schedule"""
+        conn = self.connection()
+        with conn:
+            conn.execute(
+                'INSERT INTO medication_schedules (schedule_id, phone, next_reminder, sent_reminders, record) '
+                'VALUES (?, ?, ?, ?, ?)',
+                self.row_values(schedule)
+            )
+
+    def update_progress(self, updates):
+        """Save (schedule_id, schedule) next_reminder / sent_reminders in one transaction"""
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'UPDATE medication_schedules SET next_reminder = ?, sent_reminders = ? WHERE schedule_id = ?',
+                ((schedule.get('next_reminder'), schedule.get('sent_reminders', 0), schedule_id)
+                 for schedule_id, schedule in updates)
+            )
+
+    def iter_rows(self, after_id=0, batch_size=1000):
+        """Stream (id, schedule) with id > after_id in id order"""
+        last_id = after_id
+        while True:
+            rows = self.connection().execute(
+                'SELECT id, next_reminder, sent_reminders, record FROM medication_schedules '
+                'WHERE id > ? ORDER BY id LIMIT ?',
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            for row_id, next_reminder, sent_reminders, record in rows:
+                schedule = json.loads(record)
+                schedule['next_reminder'] = next_reminder
+                schedule['sent_reminders'] = sent_reminders
+                yield row_id, schedule
+            last_id = rows[-1][0]
+
+    def last_id(self):
+        return self.connection().execute('SELECT COALESCE(MAX(id), 0) FROM medication_schedules').fetchone()[0]
+
+    def get(self, schedule_id):
+        row = self.connection().execute(
+            'SELECT next_reminder, sent_reminders, record FROM medication_schedules WHERE schedule_id = ?',
+            (schedule_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        schedule = json.loads(row[2])
+        schedule['next_reminder'], schedule['sent_reminders'] = row[0], row[1]
+        return schedule
+
+    def migrate_from_json(self, json_path):
+        """One-time import of the legacy medication_schedules.json file"""
+        if not os.path.exists(json_path):
+            return 0
+
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            done = conn.execute(
+                "SELECT value FROM store_meta WHERE key = 'legacy_json_migrated'"
+            ).fetchone()
+            if done:
+                conn.execute('COMMIT')
+                return 0
+
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    schedules = json.load(f)
+                if not isinstance(schedules, list):
+                    raise ValueError('expected a list of schedules')
+            except ValueError as e:  # includes json.JSONDecodeError
+                # Left unmarked so the import is retried once the file is fixed
+                conn.execute('ROLLBACK')
+                print(f"❌ Medication schedules not migrated, {os.path.basename(json_path)} is unreadable: {e}")
+                return 0
+
+            schedules = [schedule for schedule in schedules if isinstance(schedule, dict)]
+            for position, schedule in enumerate(schedules):
+                # Same key the scheduler gave schedules saved before ids existed
+                schedule['schedule_id'] = schedule_key(schedule, position)
+            conn.executemany(
+                'INSERT OR IGNORE INTO medication_schedules '
+                '(schedule_id, phone, next_reminder, sent_reminders, record) VALUES (?, ?, ?, ?, ?)',
+                (self.row_values(schedule) for schedule in schedules)
+            )
+            conn.execute(
+                "INSERT INTO store_meta (key, value) VALUES ('legacy_json_migrated', ?)",
+                (str(len(schedules)),)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        print(f"✅ Migrated {len(schedules)} medication schedules from {os.path.basename(json_path)}")
+        return len(schedules)
@@ -0,0 +1,77 @@
+import base64
+import os
+import threading
+import time
+
+# Crockford base32, as used by ULID: sortable and free of ambiguous letters
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+RANDOM_BITS = 80
+RANDOM_MAX = (1 << RANDOM_BITS) - 1
+
+# base64.b32encode uses the RFC 4648 alphabet; map it onto Crockford's
+RFC_TO_CROCKFORD = bytes.maketrans(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567', ALPHABET.encode())
+
+
+class SessionIdGenerator:
+    """
+    Monotonic ULID-style ids: 48-bit millisecond timestamp + 80 random bits.
+    Within one millisecond the random part is incremented instead of redrawn,
+    so ids from a process are strictly increasing. Separate processes start
+    from independent random points, so no coordination is needed.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_ms = -1
+        self.last_random = 0
+        self.pid = os.getpid()
+
+    def new_random(self):
+        return int.from_bytes(os.urandom(10), 'big')
+
+    def next_value(self):
+        """Next 128-bit id as an integer"""
+        now_ms = time.time_ns() // 1_000_000
+        with self.lock:
+            if self.pid != os.getpid():
+                # Forked child: never continue the parent's sequence
+                self.pid = os.getpid()
+                self.last_ms = -1
+
+            if now_ms > self.last_ms:
+                self.last_ms = now_ms
+                self.last_random = self.new_random()
+            else:
+                # Same millisecond (or clock went backwards): keep counting up
+                self.last_random += 1
+                if self.last_random > RANDOM_MAX:
+                    self.last_ms += 1
+                    self.last_random = self.new_random()
+
+            return (self.last_ms << RANDOM_BITS) | self.last_random
+
+    def generate(self):
+        """Next id as a 26-character sortable string"""
+        return encode(self.next_value())
+
+
+def encode(value):
+    """Encode a 128-bit integer as 26 Crockford base32 characters"""
+    # 20 bytes -> 32 chars without padding; the last 26 hold the low 130 bits
+    return base64.b32encode(value.to_bytes(20, 'big'))[6:].translate(RFC_TO_CROCKFORD).decode()
+
+
+def decode_timestamp(session_id):
+    """Millisecond Unix timestamp embedded in a session id"""
+    value = 0
+    for char in session_id[:10]:
+        value = value * 32 + ALPHABET.index(char)
+    return value
+
+
+# Global instance
+session_id_generator = SessionIdGenerator()
+
+
+def generate_session_id():
+    return session_id_generator.generate()
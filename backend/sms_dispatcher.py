@@ -0,0 +1,368 @@
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+from metrics import log_event, timed
+from session_ids import generate_session_id
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sms_jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    sender TEXT,
+    body TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    duplicates_removed INTEGER NOT NULL,
+    sent INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    retries INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sms_jobs_status ON sms_jobs (status, created_at);
+CREATE TABLE IF NOT EXISTS sms_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    claimed_at REAL,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_sms_messages_status ON sms_messages (status, id);
+CREATE INDEX IF NOT EXISTS idx_sms_messages_job ON sms_messages (job_id, id);
+CREATE TABLE IF NOT EXISTS sms_rate_limits (
+    sender TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+JOB_FIELDS = ('job_id', 'status', 'total', 'duplicates_removed', 'sent', 'failed', 'retries',
+              'created_at', 'finished_at')
+
+
+def normalize_phone(phone_number):
+    """Canonical form used to dedupe recipients (+91 98765-43210 == +919876543210)"""
+    return re.sub(r'[\s\-().]', '', str(phone_number or ''))
+
+
+def is_transient_error(error):
+    """Rate limits, server errors and network failures are worth retrying"""
+    status = getattr(error, 'status', None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    # ConnectionError and TimeoutError are OSError subclasses
+    return isinstance(error, OSError)
+
+
+class SmsJobStore:
+    """
+    Bulk SMS jobs, their per-recipient queue and the per-sender token
+    buckets in SQLite (WAL), shared by every server worker process: any
+    worker can report a job's progress or send its next message, and the
+    rate limit holds across all of them.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.local = threading.local()
+        self.connection().executescript(SCHEMA)
+
+    def connection(self):
+        """One connection per thread; sqlite3 connections are not shareable"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or getattr(self.local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def create_job(self, job, recipients):
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT INTO sms_jobs (job_id, status, sender, body, total, duplicates_removed, created_at, finished_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (job['job_id'], job['status'], job['sender'], job['body'], job['total'],
+                 job['duplicates_removed'], job['created_at'], job['finished_at'])
+            )
+            conn.executemany(
+                'INSERT INTO sms_messages (job_id, phone) VALUES (?, ?)',
+                ((job['job_id'], phone_number) for phone_number in recipients)
+            )
+
+    def claim(self, now, lease):
+        """
+        Take the oldest pending message, or one whose sender has held it past
+        `lease` seconds (its process died mid-send). Returns a dict or None.
+        """
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                "SELECT id FROM sms_messages WHERE status = 'pending' ORDER BY id LIMIT 1"
+            ).fetchone() or conn.execute(
+                "SELECT id FROM sms_messages WHERE status = 'sending' AND claimed_at < ? ORDER BY id LIMIT 1",
+                (now - lease,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE sms_messages SET status = 'sending', claimed_at = ? WHERE id = ?", (now, row[0]))
+            message_id, job_id, phone_number, body, sender = conn.execute(
+                'SELECT m.id, m.job_id, m.phone, j.body, j.sender FROM sms_messages m '
+                'JOIN sms_jobs j ON j.job_id = m.job_id WHERE m.id = ?',
+                (row[0],)
+            ).fetchone()
+            conn.execute("UPDATE sms_jobs SET status = 'running' WHERE job_id = ? AND status = 'queued'", (job_id,))
+        return {'id': message_id, 'job_id': job_id, 'phone': phone_number, 'body': body, 'sender': sender}
+
+    def add_retry(self, job_id):
+        conn = self.connection()
+        with conn:
+            conn.execute('UPDATE sms_jobs SET retries = retries + 1 WHERE job_id = ?', (job_id,))
+
+    def finish(self, message, result, now):
+        """Record a message's outcome once (a reclaimed duplicate is not counted twice)"""
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            updated = conn.execute(
+                "UPDATE sms_messages SET status = ?, result = ? WHERE id = ? AND status = 'sending'",
+                ('sent' if result['success'] else 'failed', json.dumps(result), message['id'])
+            ).rowcount
+            if not updated:
+                return
+            field = 'sent' if result['success'] else 'failed'
+            conn.execute(f'UPDATE sms_jobs SET {field} = {field} + 1 WHERE job_id = ?', (message['job_id'],))
+            conn.execute(
+                "UPDATE sms_jobs SET status = 'completed', finished_at = ? "
+                "WHERE job_id = ? AND sent + failed >= total",
+                (now, message['job_id'])
+            )
+
+    def take_token(self, sender, rate, capacity, now):
+        """Token bucket shared by all processes: 0 if a token was taken, else seconds to wait"""
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT tokens, updated FROM sms_rate_limits WHERE sender = ?', (sender,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            conn.execute(
+                'INSERT OR REPLACE INTO sms_rate_limits (sender, tokens, updated) VALUES (?, ?, ?)',
+                (sender, tokens, max(now, updated))
+            )
+        return wait
+
+    def get_job(self, job_id, include_results=False):
+        conn = self.connection()
+        row = conn.execute(f"SELECT {', '.join(JOB_FIELDS)} FROM sms_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_FIELDS, row))
+        job['pending'] = job['total'] - job['sent'] - job['failed']
+        if include_results:
+            job['results'] = [
+                dict(json.loads(result), phone=phone_number)
+                for phone_number, result in conn.execute(
+                    'SELECT phone, result FROM sms_messages WHERE job_id = ? AND result IS NOT NULL ORDER BY id',
+                    (job_id,)
+                )
+            ]
+        return job
+
+    def prune(self, max_jobs):
+        """Forget the oldest completed jobs once there are more than max_jobs"""
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            excess = conn.execute('SELECT COUNT(*) FROM sms_jobs').fetchone()[0] - max_jobs
+            if excess <= 0:
+                return
+            old = [row[0] for row in conn.execute(
+                "SELECT job_id FROM sms_jobs WHERE status = 'completed' ORDER BY created_at LIMIT ?", (excess,)
+            )]
+            conn.executemany('DELETE FROM sms_messages WHERE job_id = ?', ((job_id,) for job_id in old))
+            conn.executemany('DELETE FROM sms_jobs WHERE job_id = ?', ((job_id,) for job_id in old))
+
+
+class BulkSmsDispatcher:
+    """
+    Sends bulk SMS jobs in the background with a bounded pool of sender
+    threads, a token-bucket rate limit per sender number and retries with
+    backoff. Jobs, recipients and rate limits live in an SmsJobStore, so
+    under a multi-process server every worker sends from the same queue at
+    the same shared rate, and a recycled worker's jobs carry on elsewhere.
+    """
+
+    def __init__(self, client=None, from_number=None, db_path=os.path.join('data', 'sms_jobs.db'), workers=8, rate_per_sender=1.0,
+                 max_retries=3, backoff_base=0.5, max_jobs=1000, lease_seconds=300, poll_interval=1.0,
+                 clock=time.time, sleep=time.sleep):
+        self.client = client
+        self.from_number = from_number
+        self.store = SmsJobStore(db_path)
+        self.workers = workers
+        self.rate_per_sender = rate_per_sender
+        self.capacity = max(1, rate_per_sender)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_jobs = max_jobs
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+        self.reset()
+
+    def reset(self):
+        self.threads = []
+        self.pid = None
+        self.lock = threading.Lock()
+        self.work = threading.Semaphore(0)
+        self.stop_event = threading.Event()
+        self.in_flight = 0
+
+    def start(self):
+        """Start the sender threads (again, in a forked child where they are gone)"""
+        with self.lock:
+            if self.pid == os.getpid() and any(thread.is_alive() for thread in self.threads):
+                return
+            self.pid = os.getpid()
+            self.stop_event.clear()
+            self.threads = [
+                threading.Thread(target=self.run, name=f'sms-{index}', daemon=True) for index in range(self.workers)
+            ]
+            for thread in self.threads:
+                thread.start()
+
+    def submit(self, phone_numbers, message, from_number=None):
+        """Queue a bulk send and return its job id straight away"""
+        recipients = []
+        seen = set()
+        for phone_number in phone_numbers:
+            normalized = normalize_phone(phone_number)
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                recipients.append(normalized)
+
+        now = self.clock()
+        job = {
+            'job_id': generate_session_id(),
+            'status': 'queued' if recipients else 'completed',
+            'sender': from_number or self.from_number,
+            'body': message,
+            'total': len(recipients),
+            'duplicates_removed': len(phone_numbers) - len(recipients),
+            'created_at': now,
+            'finished_at': None if recipients else now
+        }
+        self.store.create_job(job, recipients)
+        self.store.prune(self.max_jobs)
+
+        self.start()
+        for _ in range(min(len(recipients), self.workers)):
+            self.work.release()
+        return job['job_id']
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                if not self.process_one():
+                    # Idle: woken by a local submit, or poll for other workers' jobs
+                    self.work.acquire(timeout=self.poll_interval)
+            except Exception as e:
+                log_event('sms_dispatch_failed', level='error', error=type(e).__name__)
+                self.stop_event.wait(self.poll_interval)
+
+    def process_one(self):
+        """Claim and send one queued message. Returns False if there was none."""
+        with self.lock:
+            if self.stop_event.is_set():
+                return False
+            self.in_flight += 1
+        try:
+            message = self.store.claim(self.clock(), self.lease_seconds)
+            if message is None:
+                return False
+            self.store.finish(message, self.send(message), self.clock())
+            return True
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def send(self, message):
+        if self.client is None:
+            return {'success': True, 'demo_mode': True, 'status': 'queued'}
+
+        attempt = 0
+        while True:
+            self.acquire_token(message['sender'])
+            try:
+                with timed('sms'):
+                    sent_message = self.client.messages.create(
+                        body=message['body'], from_=message['sender'], to=message['phone']
+                    )
+                return {'success': True, 'message_sid': sent_message.sid, 'status': sent_message.status}
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    return {'success': False, 'error': str(e)}
+                attempt += 1
+                self.store.add_retry(message['job_id'])
+                # Exponential backoff with jitter
+                self.sleep(self.backoff_base * (2 ** (attempt - 1)) * (0.5 + random.random()))
+
+    def acquire_token(self, sender):
+        """Block until the sender's shared bucket gives a token"""
+        while True:
+            wait = self.store.take_token(sender or '', self.rate_per_sender, self.capacity, self.clock())
+            if wait <= 0:
+                return
+            self.sleep(wait)
+
+    def get_job(self, job_id, include_results=False):
+        """Progress snapshot of a job, or None if unknown"""
+        return self.store.get_job(job_id, include_results=include_results)
+
+    def drain(self, timeout=None):
+        """
+        Graceful stop: claim nothing new and wait for the sends in flight.
+        Messages still queued stay in the store for the other workers (or the
+        next start). Returns False on timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.stop_event.set()
+        while True:
+            with self.lock:
+                if not self.in_flight:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+
+    def reinit_after_fork(self, client):
+        """Fresh client and sender threads in a forked server worker"""
+        self.client = client
+        self.reset()
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job finishes (used by tests and the load test)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.get_job(job_id)
+            if job is None or job['status'] == 'completed':
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(0.01)
@@ -0,0 +1,153 @@
+import json
+
+WHITESPACE = ' \t\r\n'
+
+
+class IncrementalJsonParser:
+    """
+    Incremental parser for one top-level JSON object arriving in chunks,
+    as streamed by the model. Anything before the first '{' (a ```json
+    fence, stray prose) is skipped. Each top-level field is reported as
+    soon as its value is complete, without waiting for the rest.
+
+        parser = IncrementalJsonParser()
+        for chunk in chunks:
+            for key, value in parser.feed(chunk):
+                ...
+    """
+
+    def __init__(self):
+        self.state = 'before'
+        self.fields = {}
+        self.key = None
+        self.buffer = []
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.error = None
+
+    @property
+    def complete(self):
+        return self.state == 'done'
+
+    def feed(self, chunk):
+        """Consume more text; returns [(key, value)] for fields completed by it"""
+        completed = []
+        for char in chunk:
+            if self.state in ('done', 'error'):
+                break
+            self.step(char, completed)
+        return completed
+
+    def fail(self, message):
+        self.state = 'error'
+        self.error = message
+
+    def step(self, char, completed):
+        state = self.state
+
+        if state == 'before':
+            if char == '{':
+                self.state = 'key_wait'
+
+        elif state == 'key_wait':
+            if char == '"':
+                self.state = 'key'
+                self.buffer = []
+            elif char == '}':
+                self.state = 'done'
+            elif char not in WHITESPACE and char != ',':
+                self.fail(f"unexpected {char!r} before key")
+
+        elif state == 'key':
+            if self.escaped:
+                self.escaped = False
+                self.buffer.append(char)
+            elif char == '\\':
+                self.escaped = True
+                self.buffer.append(char)
+            elif char == '"':
+                self.key = json.loads('"' + ''.join(self.buffer) + '"')
+                self.state = 'colon'
+            else:
+                self.buffer.append(char)
+
+        elif state == 'colon':
+            if char == ':':
+                self.state = 'value_wait'
+            elif char not in WHITESPACE:
+                self.fail(f"expected ':' after {self.key!r}")
+
+        elif state == 'value_wait':
+            if char in WHITESPACE:
+                return
+            self.buffer = [char]
+            if char == '"':
+                self.state = 'string'
+            else:
+                # Number, literal, nested object or array: collect until balanced
+                self.state = 'other'
+                self.depth = 1 if char in '{[' else 0
+                self.in_string = False
+
+        elif state == 'string':
+            self.buffer.append(char)
+            if self.escaped:
+                self.escaped = False
+            elif char == '\\':
+                self.escaped = True
+            elif char == '"' and self.finish_value(completed):
+                self.state = 'after_value'
+
+        elif state == 'other':
+            if self.in_string:
+                self.buffer.append(char)
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                return
+            if self.depth == 0 and (char == ',' or char == '}' or char in WHITESPACE):
+                # A bad value leaves the parser in 'error', not 'after_value'
+                if self.finish_value(completed):
+                    self.state = 'after_value'
+                    self.step(char, completed)
+                return
+            self.buffer.append(char)
+            if char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            elif char in '}]':
+                self.depth -= 1
+
+        elif state == 'after_value':
+            if char == ',':
+                self.state = 'key_wait'
+            elif char == '}':
+                self.state = 'done'
+            elif char not in WHITESPACE:
+                self.fail(f"unexpected {char!r} after {self.key!r}")
+
+    def finish_value(self, completed):
+        """Record the buffered value; False (and state 'error') if it is not valid JSON"""
+        try:
+            value = json.loads(''.join(self.buffer))
+        except json.JSONDecodeError as e:
+            self.fail(f"bad value for {self.key!r}: {e}")
+            return False
+        self.fields[self.key] = value
+        completed.append((self.key, value))
+        self.buffer = []
+        return True
+
+
+def parse_json_object(text):
+    """The first JSON object in model output (fenced or surrounded by prose), or None"""
+    parser = IncrementalJsonParser()
+    parser.feed(text)
+    if parser.complete:
+        return parser.fields
+    return None
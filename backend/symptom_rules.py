@@ -0,0 +1,179 @@
+import json
+import os
+import re
+
+# Higher-acuity categories win when a phrase is listed under several
+CATEGORY_SEVERITY = [
+    ('emergency_indicators', 'Emergency'),
+    ('opd_indicators', 'OPD Visit'),
+    ('self_care_indicators', 'Self-care'),
+]
+
+# Words that, just before a match, mean the patient is denying the symptom
+NEGATIONS = {'no', 'not', 'without', 'denies', 'never', 'nahi', 'nahin', 'bina', 'नहीं', 'ना', 'बिना'}
+
+# Words allowed between a negation and the phrase it governs ("not having any chest pain")
+NEGATION_FILLERS = {'any', 'a', 'an', 'the', 'of', 'have', 'having', 'had', 'has', 'feel', 'feeling',
+                    'experiencing', 'signs', 'sign', 'history', 'complaint', 'complaints', 'koi'}
+
+# A negation does not reach past these into the next clause ("no fever, chest pain")
+CLAUSE_BREAKS = re.compile(
+    r"[,.;:!?()\n।]|(?<!\S)(?:and|but|or|though|although|however|then|aur|lekin|magar|par|और|लेकिन|पर)(?!\S)"
+)
+
+SEVERITY_ADVICE = {
+    'Emergency': (
+        "Call 108 for an ambulance or go to the nearest emergency department immediately. "
+        "Do not drive yourself and keep someone with you until help arrives."
+    ),
+    'OPD Visit': "Please consult a healthcare provider for proper diagnosis.",
+    'Self-care': "Rest, stay hydrated and monitor your symptoms. See a doctor if they get worse."
+}
+
+
+class SymptomMatcher:
+    """
+    Compiled multi-pattern matcher over the indicators in symptoms_db.json.
+    All phrases (and their multilingual synonyms) go into one regex, longest
+    first, so a single pass over the text finds every indicator.
+    """
+
+    def __init__(self, symptoms_db=None, min_confidence=0.9):
+        self.symptoms_db = symptoms_db if symptoms_db is not None else self.load_symptoms_db()
+        self.min_confidence = min_confidence
+        self.phrase_to_indicator = {}
+        self.indicator_severity = {}
+        self.pattern = self.compile()
+
+    def load_symptoms_db(self):
+        """Load symptom patterns from the data snapshot, or the JSON file"""
+        try:
+            from data_snapshot import open_snapshot
+            snapshot = open_snapshot()
+            if snapshot is not None and snapshot.reference('symptoms_db') is not None:
+                return snapshot.reference('symptoms_db')
+        except ImportError:
+            pass
+        try:
+            file_path = os.path.join(os.path.dirname(__file__), 'data', 'symptoms_db.json')
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"❌ Could not load symptoms database: {e}")
+            return {}
+
+    def compile(self):
+        patterns = self.symptoms_db.get('symptom_patterns', {})
+
+        for category, severity in reversed(CATEGORY_SEVERITY):
+            for indicator in patterns.get(category, []):
+                indicator = indicator.casefold()
+                self.indicator_severity[indicator] = severity
+                self.phrase_to_indicator[indicator] = indicator
+
+        for indicator, synonyms in patterns.get('synonyms', {}).items():
+            indicator = indicator.casefold()
+            if indicator not in self.indicator_severity:
+                continue
+            for synonym in synonyms:
+                self.phrase_to_indicator.setdefault(synonym.casefold(), indicator)
+
+        if not self.phrase_to_indicator:
+            return None
+
+        phrases = sorted(self.phrase_to_indicator, key=len, reverse=True)
+        alternation = '|'.join(re.escape(phrase).replace(r'\ ', r'\s+') for phrase in phrases)
+        return re.compile(rf'(?<!\w)(?:{alternation})(?!\w)')
+
+    def is_negated(self, text, start):
+        """
+        True when a negation governs the phrase starting at `start`: it is in
+        the same clause and only filler words stand between them.
+        """
+        preceding = text[max(0, start - 60):start]
+        clause = CLAUSE_BREAKS.split(preceding)[-1]
+        for word in reversed(clause.split()):
+            if word in NEGATIONS:
+                return True
+            if word not in NEGATION_FILLERS:
+                return False
+        return False
+
+    def screen(self, symptoms):
+        """
+        Match indicators in the symptom text. Returns the most severe category
+        found, a confidence in [0, 1] and the matched indicators.
+        """
+        text = (symptoms or '').casefold()
+        matched = {'Emergency': [], 'OPD Visit': [], 'Self-care': []}
+
+        if self.pattern is not None:
+            for match in self.pattern.finditer(text):
+                if self.is_negated(text, match.start()):
+                    continue
+                phrase = ' '.join(match.group(0).split())
+                indicator = self.phrase_to_indicator.get(phrase)
+                if indicator is None:
+                    continue
+                found = matched[self.indicator_severity[indicator]]
+                if indicator not in found:
+                    found.append(indicator)
+
+        if matched['Emergency']:
+            severity = 'Emergency'
+            confidence = min(0.99, 0.9 + 0.05 * (len(matched['Emergency']) - 1))
+        elif matched['OPD Visit']:
+            severity, confidence = 'OPD Visit', 0.6
+        elif matched['Self-care']:
+            severity, confidence = 'Self-care', 0.5
+        else:
+            severity, confidence = None, 0.0
+
+        return {
+            'severity': severity,
+            'confidence': confidence,
+            'matched': matched
+        }
+
+    def quick_triage(self, symptoms):
+        """
+        Instant triage result for clear-cut cases, or None when the model
+        should decide (no match or confidence below min_confidence).
+        """
+        screening = self.screen(symptoms)
+        if screening['severity'] is None or screening['confidence'] < self.min_confidence:
+            return None
+
+        severity = screening['severity']
+        indicators = screening['matched'][severity]
+        advice = SEVERITY_ADVICE[severity]
+        first_aid = self.symptoms_db.get('first_aid_advice', {})
+        for indicator in indicators:
+            if indicator in first_aid:
+                advice = f"{advice} First aid: {first_aid[indicator]}".strip()
+                break
+
+        if severity == 'Emergency':
+            reasoning = f"Reported {', '.join(indicators)}: recognised emergency warning signs that need immediate care."
+        else:
+            reasoning = f"Reported {', '.join(indicators)}: typically managed as {severity}."
+
+        return {
+            'severity': severity,
+            'advice': advice,
+            'reasoning': reasoning,
+            'confidence': screening['confidence'],
+            'source': 'rules'
+        }
+
+
+# Global instance
+symptom_matcher = SymptomMatcher(
+    min_confidence=float(os.getenv('TRIAGE_FAST_PATH_MIN_CONFIDENCE', '0.9'))
+)
+
+def quick_triage(symptoms):
+    return symptom_matcher.quick_triage(symptoms)
+
+def screen_symptoms(symptoms):
+    return symptom_matcher.screen(symptoms)
@@ -0,0 +1,9 @@
+"""
+Backend modules import each other as top-level modules (run from backend/):
+
+    cd backend && python -m pytest tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,56 @@
+import threading
+import time
+
+import gemini_handler
+from admission_control import AdmissionController
+from triage_cache import TriageCache
+
+
+class FakeBatchModel:
+    """Answers every item, tracking how many calls overlap"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.items = []
+
+    def __call__(self, items):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.items.extend(symptoms for _, symptoms in items)
+        time.sleep(self.latency)
+        with self.lock:
+            self.active -= 1
+        return {item_id: {'severity': 'OPD Visit', 'advice': symptoms, 'reasoning': '-'} for item_id, symptoms in items}
+
+
+def install(monkeypatch, model, max_concurrency=8):
+    monkeypatch.setattr(gemini_handler, 'GEMINI_API_KEY', 'test')
+    monkeypatch.setattr(gemini_handler, 'request_gemini_triage_batch', model)
+    monkeypatch.setattr(gemini_handler, 'triage_cache', TriageCache('test'))
+    monkeypatch.setattr(gemini_handler, 'admission', AdmissionController(max_concurrency, max_queue=64, max_wait=5))
+
+
+def test_batch_keeps_opposite_negations_apart(monkeypatch):
+    model = FakeBatchModel()
+    install(monkeypatch, model)
+
+    results, stats = gemini_handler.analyze_symptoms_batch(['stomach ache, no vomiting', 'vomiting, no stomach ache'])
+
+    assert stats['unique'] == 2
+    assert [result['advice'] for result in results] == ['stomach ache, no vomiting', 'vomiting, no stomach ache']
+
+
+def test_batch_calls_respect_admission_limit(monkeypatch):
+    model = FakeBatchModel(latency=0.05)
+    install(monkeypatch, model, max_concurrency=1)
+
+    entries = [f'stomach ache for {day} days' for day in range(12)]
+    results, stats = gemini_handler.analyze_symptoms_batch(entries, items_per_call=2, max_parallel=6)
+
+    assert stats['model_calls'] == 6
+    assert model.max_active == 1
+    assert gemini_handler.admission.stats()['admitted'] == 6
@@ -0,0 +1,25 @@
+import gemini_handler
+from admission_control import AdmissionController
+from resilience import CircuitBreaker
+from triage_cache import TriageCache
+
+
+def test_no_api_key_fallback_is_tagged(monkeypatch):
+    monkeypatch.setattr(gemini_handler, 'GEMINI_API_KEY', None)
+
+    assert gemini_handler.analyze_symptoms('fever for two days')['source'] == 'fallback'
+
+
+def test_failed_model_call_fallback_is_tagged(monkeypatch):
+    monkeypatch.setattr(gemini_handler, 'GEMINI_API_KEY', 'test')
+    monkeypatch.setattr(gemini_handler, 'triage_cache', TriageCache('test'))
+    monkeypatch.setattr(gemini_handler, 'admission', AdmissionController(4))
+    monkeypatch.setattr(gemini_handler, 'breaker', CircuitBreaker())
+    monkeypatch.setattr(gemini_handler, 'hedger', None)
+    monkeypatch.setattr(gemini_handler, 'request_gemini_triage_stream', lambda symptoms, on_severity=None: None)
+    monkeypatch.setattr(gemini_handler, 'request_gemini_triage', lambda symptoms, on_severity=None: None)
+
+    result = gemini_handler.analyze_symptoms('fever for two days')
+
+    assert result['source'] == 'fallback'
+    assert result['severity'] == gemini_handler.FALLBACK_RESPONSE['severity']
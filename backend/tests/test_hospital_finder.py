@@ -0,0 +1,51 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.synthetic import write_data_dir
+from hospital_finder import HospitalDataReloader, HospitalFinder
+
+
+def test_first_edit_after_startup_is_reloaded(tmp_path):
+    data_dir = write_data_dir(str(tmp_path), 6)
+    reloader = HospitalDataReloader(HospitalFinder(data_dir))
+    assert len(reloader.finder.hospitals) == 6
+
+    path = os.path.join(data_dir, 'hospitals.json')
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data['hospitals'] = data['hospitals'][:4]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    assert reloader.check()
+    assert len(reloader.finder.hospitals) == 4
+
+
+@pytest.mark.parametrize('specialty', ['', None, 'Astrology'])
+def test_specialty_search_without_matches_is_empty(tmp_path, specialty):
+    finder = HospitalFinder(write_data_dir(str(tmp_path), 6))
+    hospital = finder.hospitals[0]
+    assert finder.find_hospitals_by_specialty(specialty, hospital['lat'], hospital['lng']) == []
+    assert finder.find_hospitals_by_specialty(specialty, hospital['lat'], hospital['lng'], ayushman_only=True) == []
+
+
+def test_specialty_search_is_case_insensitive(tmp_path):
+    finder = HospitalFinder(write_data_dir(str(tmp_path), 6))
+    hospital = finder.hospitals[0]
+    results = finder.find_hospitals_by_specialty(hospital['specialties'][0].upper(), hospital['lat'], hospital['lng'])
+    assert results[0]['id'] == hospital['id']
+
+
+def test_batch_nearest_pads_to_k(tmp_path):
+    finder = HospitalFinder(write_data_dir(str(tmp_path), 6))
+    hospital = finder.hospitals[0]
+    indices, distances = finder.find_nearest_hospitals_batch([(hospital['lat'], hospital['lng'])], k=10,
+                                                             max_distance_km=10000)
+
+    assert indices.shape == distances.shape == (1, 10)
+    assert sorted(indices[0, :6]) == list(range(6))
+    assert (indices[0, 6:] == -1).all() and (distances[0, 6:] == float('inf')).all()
@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, timedelta
+
+from data_manager import DataManager
+from reminder_scheduler import ReminderScheduler
+from schedule_store import MedicationScheduleStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime.now()
+
+    def __call__(self):
+        return self.now
+
+
+def test_schedules_from_other_workers_fire_and_progress_is_saved(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    scheduler_worker, other_worker = DataManager(), DataManager()
+    clock = FakeClock()
+    sent = []
+    scheduler = ReminderScheduler(
+        send_batch=lambda messages: sent.extend(messages) or [{'success': True}] * len(messages),
+        clock=clock,
+        persist=scheduler_worker.save_reminder_progress,
+        source=scheduler_worker.new_medication_schedules
+    )
+    assert scheduler.load(scheduler_worker.new_medication_schedules()) == 0
+    scheduler_worker.reminder_scheduler = scheduler
+
+    schedule = other_worker.save_medication_schedule('+911', {'name': 'Metformin', 'frequency': 'Every 4 hours'})
+    assert scheduler.pull() == 1
+    assert scheduler.pull() == 0
+
+    # The scheduler worker's own schedules are on the heap already and not added twice
+    scheduler_worker.save_medication_schedule('+912', {'name': 'Amlodipine', 'frequency': 'once_daily'})
+    assert scheduler.pull() == 0
+    assert scheduler.stats()['active_schedules'] == 2
+
+    clock.now += timedelta(hours=5)
+    assert scheduler.tick() >= 1
+    assert '+911' in [message['to'] for message in sent]
+    # Saving progress does not make the next pull re-read anything
+    assert scheduler.pull() == 0
+
+    saved = other_worker.schedule_store.get(schedule['schedule_id'])
+    assert saved['sent_reminders'] == 1
+    assert datetime.fromisoformat(saved['next_reminder']) > clock.now
+
+
+def test_legacy_schedules_import_once_with_position_keys(tmp_path):
+    json_path = tmp_path / 'medication_schedules.json'
+    json_path.write_text(json.dumps([
+        {'user_phone': '+911', 'medication': {'name': 'A'}},
+        {'schedule_id': 'S2', 'user_phone': '+912', 'medication': {'name': 'B'}},
+    ]), encoding='utf-8')
+    store = MedicationScheduleStore(str(tmp_path / 'schedules.db'), legacy_json_path=str(json_path))
+
+    assert [schedule['schedule_id'] for _, schedule in store.iter_rows()] == ['legacy-0', 'S2']
+    assert store.migrate_from_json(str(json_path)) == 0
+
+    store.update_progress([('S2', {'next_reminder': '2026-01-05T09:00:00', 'sent_reminders': 3})])
+    assert store.get('S2')['sent_reminders'] == 3
+    assert store.get('legacy-0')['sent_reminders'] == 0
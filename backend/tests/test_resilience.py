@@ -0,0 +1,93 @@
+import threading
+import time
+
+from admission_control import PRIORITY_NORMAL, AdmissionController
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, Hedger
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def tripped_breaker(clock):
+    breaker = CircuitBreaker(window=4, min_calls=4, open_seconds=30, clock=clock)
+    for _ in range(4):
+        breaker.record(False)
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_stale_success_does_not_close_half_open_breaker():
+    clock = FakeClock()
+    breaker = tripped_breaker(clock)
+    clock.now += 30
+    assert breaker.allow() and breaker.state == HALF_OPEN
+
+    # Started 40s ago, before the circuit opened
+    clock.now += 1
+    breaker.record(True, elapsed=40)
+    assert breaker.state == HALF_OPEN
+
+    # The probe itself
+    breaker.record(True, elapsed=0.5)
+    assert breaker.state == CLOSED
+
+
+def test_stale_failure_does_not_reopen_half_open_breaker():
+    clock = FakeClock()
+    breaker = tripped_breaker(clock)
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record(False, elapsed=35)
+    assert breaker.state == HALF_OPEN
+
+
+def slow_then_fast():
+    calls = []
+    lock = threading.Lock()
+
+    def fn():
+        with lock:
+            calls.append(time.perf_counter())
+            first = len(calls) == 1
+        time.sleep(0.3 if first else 0.01)
+        return 'first' if first else 'hedge'
+    return fn, calls
+
+
+def warmed_hedger():
+    hedger = Hedger(min_delay=0.05, min_samples=1)
+    hedger.latency.add(0.01)
+    return hedger
+
+
+def test_hedge_needs_its_own_admission_slot():
+    admission = AdmissionController(max_concurrency=1)
+    hedger = warmed_hedger()
+    fn, calls = slow_then_fast()
+
+    assert admission.call(hedger.call, PRIORITY_NORMAL, fn, admission=admission) == (True, 'first')
+    assert len(calls) == 1
+    assert hedger.stats()['hedge_skipped'] == 1
+    assert admission.stats()['active'] == 0
+
+
+def test_slots_held_until_each_call_ends():
+    admission = AdmissionController(max_concurrency=2)
+    hedger = warmed_hedger()
+    fn, calls = slow_then_fast()
+
+    assert admission.call(hedger.call, PRIORITY_NORMAL, fn, admission=admission) == (True, 'hedge')
+    assert len(calls) == 2
+    # The hedge won, but the primary is still running and keeps its slot
+    time.sleep(0.05)
+    assert admission.stats()['active'] == 1
+
+    deadline = time.monotonic() + 1
+    while admission.stats()['active'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert admission.stats()['active'] == 0
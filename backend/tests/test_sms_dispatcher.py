@@ -0,0 +1,76 @@
+import threading
+
+from benchmarks.fakes import FakeTwilioClient
+from sms_dispatcher import BulkSmsDispatcher
+
+
+class FakeClock:
+    """Clock whose sleep() only advances time, recording each wait"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+def dispatcher(tmp_path, client, clock, **kwargs):
+    kwargs.setdefault('rate_per_sender', 1000)
+    return BulkSmsDispatcher(client, '+15005550006', db_path=str(tmp_path / 'sms.db'), workers=1,
+                             poll_interval=0.01, clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def run_job(sms, phone_numbers):
+    job_id = sms.submit(phone_numbers, 'Health camp tomorrow at 10 AM')
+    job = sms.wait(job_id, timeout=5)
+    sms.drain(timeout=5)
+    return sms.get_job(job_id, include_results=True) if job else None
+
+
+def test_duplicate_numbers_are_sent_once(tmp_path):
+    client, clock = FakeTwilioClient(), FakeClock()
+    job = run_job(dispatcher(tmp_path, client, clock),
+                  ['+91 98765-43210', '+919876543210', '+91 (98765) 43210', '+911234567890'])
+
+    assert (job['total'], job['duplicates_removed'], job['sent']) == (2, 2, 2)
+    assert sorted(to for _, to, _ in client.sent) == ['+911234567890', '+919876543210']
+
+
+def test_transient_error_is_retried_with_backoff(tmp_path):
+    client, clock = FakeTwilioClient(failures={'+911': [503, 503]}), FakeClock()
+    job = run_job(dispatcher(tmp_path, client, clock, backoff_base=0.5), ['+911'])
+
+    assert (job['status'], job['sent'], job['failed'], job['retries']) == ('completed', 1, 0, 2)
+    assert client.attempts == ['+911'] * 3
+    # Exponential backoff with 0.5x-1.5x jitter
+    assert 0.25 <= clock.sleeps[0] <= 0.75
+    assert 0.5 <= clock.sleeps[1] <= 1.5
+
+
+def test_permanent_error_is_not_retried(tmp_path):
+    client, clock = FakeTwilioClient(failures={'+912': [400]}), FakeClock()
+    job = run_job(dispatcher(tmp_path, client, clock), ['+911', '+912'])
+
+    assert (job['sent'], job['failed'], job['retries']) == (1, 1, 0)
+    assert client.attempts.count('+912') == 1
+    assert clock.sleeps == []
+    failed = [result for result in job['results'] if not result['success']]
+    assert [result['phone'] for result in failed] == ['+912']
+
+
+def test_sends_are_rate_limited_per_sender(tmp_path):
+    client, clock = FakeTwilioClient(), FakeClock()
+    start = clock()
+    job = run_job(dispatcher(tmp_path, client, clock, rate_per_sender=2), [f'+91{i}' for i in range(7)])
+
+    assert job['sent'] == 7
+    # A burst of 2, then one every 0.5s
+    assert abs((clock() - start) - 2.5) < 1e-6
@@ -0,0 +1,34 @@
+import pytest
+
+from stream_parser import IncrementalJsonParser, parse_json_object
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalJsonParser()
+    completed = []
+    for i in range(0, len(text), size):
+        completed.extend(parser.feed(text[i:i + size]))
+    return parser, completed
+
+
+@pytest.mark.parametrize('size', [1, 3, 1000])
+def test_fields_reported_as_they_complete(size):
+    text = '```json\n{"severity": "Emergency", "n": 12, "tags": ["a", "}"], "advice": "Call 108"}\n```'
+    parser, completed = feed_in_chunks(text, size)
+    assert parser.complete
+    assert completed == [('severity', 'Emergency'), ('n', 12), ('tags', ['a', '}']), ('advice', 'Call 108')]
+
+
+@pytest.mark.parametrize('text', [
+    '{"severity":"Emergency","n":1x2,"advice":"Call 108"}',
+    '{"severity":"Emergency","n":tru,"advice":"Call 108"}',
+    '{"severity":"Emergency","n":1x2}',
+])
+@pytest.mark.parametrize('size', [1, 1000])
+def test_malformed_value_is_an_error(text, size):
+    parser, completed = feed_in_chunks(text, size)
+    assert parser.state == 'error'
+    assert not parser.complete
+    assert 'n' in parser.error
+    assert completed == [('severity', 'Emergency')]
+    assert parse_json_object(text) is None
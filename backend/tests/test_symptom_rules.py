@@ -0,0 +1,34 @@
+import pytest
+
+from symptom_rules import quick_triage, screen_symptoms
+
+
+@pytest.mark.parametrize('symptoms', [
+    'no fever, chest pain',
+    'I do not feel well, chest pain since morning',
+    'no fever and chest pain',
+    'mujhe bukhar nahi, chest pain',
+])
+def test_negation_stays_in_its_clause(symptoms):
+    assert screen_symptoms(symptoms)['severity'] == 'Emergency'
+    assert quick_triage(symptoms)['severity'] == 'Emergency'
+
+
+@pytest.mark.parametrize('symptoms', [
+    'no chest pain',
+    'not having any chest pain',
+    'fever but no chest pain',
+    'denies chest pain',
+    'without any chest pain',
+])
+def test_negation_governing_the_phrase(symptoms):
+    assert 'chest pain' not in screen_symptoms(symptoms)['matched']['Emergency']
+
+
+@pytest.mark.parametrize('symptoms', ['fits well', 'the shirt fits perfectly, mild cold'])
+def test_no_match_on_unrelated_words(symptoms):
+    assert screen_symptoms(symptoms)['matched']['Emergency'] == []
+
+
+def test_seizure_phrases_still_match():
+    assert screen_symptoms('having fits since morning')['matched']['Emergency'] == ['seizure']
@@ -0,0 +1,26 @@
+import json
+
+from triage_store import TriageHistoryStore
+
+
+def record(session_id):
+    return {
+        'timestamp': '2026-01-05T10:00:00',
+        'user_data': {'phone': '+911'},
+        'symptoms': 'fever',
+        'triage_result': {'severity': 'Home Care'},
+        'session_id': session_id,
+    }
+
+
+def test_corrupt_legacy_json_is_retried_not_marked_migrated(tmp_path):
+    json_path = tmp_path / 'triage_history.json'
+    json_path.write_text('[{"session_id": "a"', encoding='utf-8')
+
+    store = TriageHistoryStore(str(tmp_path / 'history.db'), legacy_json_path=str(json_path))
+    assert store.get_by_session_id('a') == []
+
+    json_path.write_text(json.dumps([record('a'), record('b')]), encoding='utf-8')
+    assert store.migrate_from_json(str(json_path)) == 2
+    assert store.get_by_session_id('b')[0]['symptoms'] == 'fever'
+    assert store.migrate_from_json(str(json_path)) == 0
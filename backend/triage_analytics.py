@@ -0,0 +1,139 @@
+"""
+Triage counts rolled up by time bucket, geohash cell, severity and language.
+
+Two tiers live in the triage history database, hourly for recent/short
+ranges and daily for everything longer, and both are updated in the same
+transaction as each history insert. Outbreak dashboards then read a few
+thousand pre-aggregated rows instead of the full history. Records written
+before the rollups existed are counted by
+TriageHistoryStore.backfill_rollups(), which streams the old rows.
+
+    cd backend && python triage_analytics.py        # run the backfill now
+"""
+import os
+from collections import Counter
+
+# Cells of about 39 x 20 km (block level) at precision 4; queries can group
+# coarser. Finer cells multiply the rollup rows, since few triages share one
+GEOHASH_PRECISION = int(os.getenv('ANALYTICS_GEOHASH_PRECISION', '4'))
+BACKFILL_BATCH_SIZE = int(os.getenv('ANALYTICS_BACKFILL_BATCH_SIZE', '5000'))
+GROUP_FIELDS = ('severity', 'language', 'cell', 'hour', 'day')
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# Bucket is 'YYYY-MM-DDTHH' (hourly) or 'YYYY-MM-DD' (daily), local time like the history
+ROLLUP_TABLES = {'hour': 'triage_rollups_hourly', 'day': 'triage_rollups_daily'}
+
+ROLLUP_SCHEMA = ''.join(f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    bucket TEXT NOT NULL,
+    cell TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    language TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (bucket, cell, severity, language)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_{table}_cell ON {table} (cell, bucket);
+""" for table in ROLLUP_TABLES.values())
+
+UPSERT = """
+INSERT INTO {table} (bucket, cell, severity, language, count) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (bucket, cell, severity, language) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def geohash_encode(lat, lng, precision=GEOHASH_PRECISION):
+    """Standard base-32 geohash of a point"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, lng) if even else (lat_range, lat)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def location_cell(location, precision=GEOHASH_PRECISION):
+    """Geohash cell of a {'lat', 'lng'} dict, or '' when missing or invalid"""
+    try:
+        lat, lng = float(location['lat']), float(location['lng'])
+    except (KeyError, TypeError, ValueError):
+        return ''
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        return ''
+    return geohash_encode(lat, lng, precision)
+
+
+def rollup_key(record):
+    """(hour, cell, severity, language) a history record is counted under"""
+    user_data = record.get('user_data') or {}
+    triage_result = record.get('triage_result') or {}
+    return (
+        str(record.get('timestamp') or '')[:13],
+        location_cell(user_data.get('location') or {}),
+        triage_result.get('severity') or 'Unknown',
+        user_data.get('language') or 'unknown'
+    )
+
+
+def add_rollups(conn, records):
+    """Count records into the rollups; call inside the transaction that inserts them"""
+    hourly = Counter(rollup_key(record) for record in records)
+    daily = Counter()
+    for (hour, *rest), count in hourly.items():
+        daily[(hour[:10], *rest)] += count
+    for period, counts in (('hour', hourly), ('day', daily)):
+        conn.executemany(UPSERT.format(table=ROLLUP_TABLES[period]), ((*key, count) for key, count in counts.items()))
+
+
+def day_aligned(bound):
+    """True for '2025-10-01', '2025-10-01T00:00:00' and the like"""
+    return not bound or set(bound[10:]) <= set('T0:.')
+
+
+def query_rollups(conn, start=None, end=None, cell=None, group_by=('severity',), precision=None):
+    """
+    Summed counts for start <= time < end (ISO dates or datetimes, compared
+    at hour granularity) inside the geohash prefix `cell`, grouped by any of
+    GROUP_FIELDS. Cells are cut to `precision` characters when grouping.
+    Whole-day ranges not grouped by hour are read from the daily tier.
+    """
+    period = 'day' if 'hour' not in group_by and day_aligned(start) and day_aligned(end) else 'hour'
+    width = 10 if period == 'day' else 13
+    columns = {
+        'severity': 'severity',
+        'language': 'language',
+        'cell': f'substr(cell, 1, {int(precision or GEOHASH_PRECISION)})',
+        'hour': 'bucket',
+        'day': 'substr(bucket, 1, 10)'
+    }
+    where, params = ['bucket >= ?', 'bucket < ?'], [start[:width] if start else '', end[:width] if end else '\uffff']
+    if cell:
+        # Prefix match as a range so the (cell, bucket) index is used
+        where += ['cell >= ?', 'cell < ?']
+        params += [cell, cell + '\uffff']
+    selected = [columns[field] for field in group_by]
+    sql = f"SELECT {', '.join(selected + ['SUM(count)'])} FROM {ROLLUP_TABLES[period]} WHERE {' AND '.join(where)}"
+    if selected:
+        sql += f" GROUP BY {', '.join(selected)} ORDER BY {', '.join(selected)}"
+    return [
+        dict(zip(group_by, row[:-1]), count=row[-1])
+        for row in conn.execute(sql, params).fetchall()
+        if row[-1]
+    ]
+
+
+if __name__ == '__main__':
+    from data_manager import data_manager
+    counted = data_manager.triage_store.backfill_rollups()
+    print(f"✅ Backfilled rollups for {counted} triage records")
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_symptoms(symptoms):
+    """
+    Canonical form of free-text symptoms: case-folded, punctuation removed and
+    whitespace collapsed, so "Fever,  headache!" == "fever headache". Word
+    order is kept: "no fever, chest pain" and "fever, no chest pain" differ.
+    """
+    text = unicodedata.normalize('NFKC', symptoms or '').casefold()
+    text = ''.join(' ' if unicodedata.category(char).startswith('P') else char for char in text)
+    return ' '.join(text.split())
+
+
+class TriageCache:
+    """
+    LRU + TTL cache for triage results with an optional SQLite disk tier.
+    Keys combine normalized symptoms, language and the model/prompt version.
+    """
+
+    def __init__(self, version, max_entries=1024, ttl=3600, emergency_ttl=0,
+                 disk_path=None, clock=time.time):
+        self.version = version
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # 0 = never cache Emergency results, >0 = cache them for a shorter time
+        self.emergency_ttl = emergency_ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats_counters = {
+            'hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'bypassed': 0,
+            'evictions': 0,
+            'expired': 0
+        }
+
+        self.disk_path = disk_path
+        self.local = threading.local()
+        if disk_path:
+            self.disk().execute(
+                'CREATE TABLE IF NOT EXISTS triage_cache ('
+                'key TEXT PRIMARY KEY, result TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+
+    def disk(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or getattr(self.local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.disk_path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def make_key(self, symptoms, language):
+        raw = f"{self.version}|{language or 'en'}|{normalize_symptoms(symptoms)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def count(self, name):
+        with self.lock:
+            self.stats_counters[name] += 1
+
+    def get(self, symptoms, language='en'):
+        """Cached result for these symptoms, or None"""
+        key = self.make_key(symptoms, language)
+        now = self.clock()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                expires_at, result = entry
+                if expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.stats_counters['hits'] += 1
+                    return dict(result)
+                del self.entries[key]
+                self.stats_counters['expired'] += 1
+
+        if self.disk_path:
+            row = self.disk().execute(
+                'SELECT result, expires_at FROM triage_cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row and row[1] > now:
+                result = json.loads(row[0])
+                self.remember(key, result, row[1])
+                self.count('disk_hits')
+                return dict(result)
+
+        self.count('misses')
+        return None
+
+    def put(self, symptoms, language, result):
+        """Store a successful triage result"""
+        ttl = self.ttl
+        if result.get('severity') == 'Emergency':
+            ttl = self.emergency_ttl
+        if not ttl or ttl <= 0:
+            self.count('bypassed')
+            return
+
+        key = self.make_key(symptoms, language)
+        expires_at = self.clock() + ttl
+        self.remember(key, dict(result), expires_at)
+        self.count('stores')
+
+        if self.disk_path:
+            self.disk().execute(
+                'INSERT OR REPLACE INTO triage_cache (key, result, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(result, ensure_ascii=False), expires_at)
+            )
+
+    def remember(self, key, result, expires_at):
+        with self.lock:
+            self.entries[key] = (expires_at, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats_counters['evictions'] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        if self.disk_path:
+            self.disk().execute('DELETE FROM triage_cache')
+
+    def stats(self):
+        """Counters plus hit rate, for monitoring"""
+        with self.lock:
+            stats = dict(self.stats_counters)
+            stats['size'] = len(self.entries)
+        lookups = stats['hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((stats['hits'] + stats['disk_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def cache_from_env(version):
+    """Build the triage cache from TRIAGE_CACHE_* environment variables"""
+    return TriageCache(
+        version,
+        max_entries=int(os.getenv('TRIAGE_CACHE_SIZE', '1024')),
+        ttl=float(os.getenv('TRIAGE_CACHE_TTL', '3600')),
+        emergency_ttl=float(os.getenv('TRIAGE_CACHE_EMERGENCY_TTL', '0')),
+        disk_path=os.getenv('TRIAGE_CACHE_PATH') or None
+    )
@@ -0,0 +1,96 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from gemini_handler import FALLBACK_RESPONSE, analyze_symptoms
+from hospital_finder import find_nearest_hospitals, rank_hospitals
+from metrics import in_context, log_event
+from symptom_rules import quick_triage
+
+# Severities that come with a hospital list
+HOSPITAL_SEVERITIES = ['Emergency', 'OPD Visit']
+
+# Hard limit on the model step; past it the fallback result is returned
+LLM_DEADLINE_SECONDS = float(os.getenv('TRIAGE_LLM_DEADLINE', '10'))
+
+# Longest wait for a speculative hospital lookup before doing it inline
+HOSPITAL_WAIT_SECONDS = float(os.getenv('TRIAGE_HOSPITAL_WAIT', '2'))
+
+def build_executor():
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv('TRIAGE_PIPELINE_WORKERS', '32')),
+        thread_name_prefix='triage'
+    )
+
+def build_hospital_executor():
+    # Separate pool: model calls that outlive their deadline must not hold up hospital lookups
+    return ThreadPoolExecutor(
+        max_workers=int(os.getenv('TRIAGE_HOSPITAL_WORKERS', '8')),
+        thread_name_prefix='triage-hospitals'
+    )
+
+executor = build_executor()
+hospital_executor = build_hospital_executor()
+
+
+def reinit_after_fork():
+    """Fresh worker pools in a forked server worker (pool threads don't survive fork)"""
+    global executor, hospital_executor
+    executor = build_executor()
+    hospital_executor = build_hospital_executor()
+
+
+def hospital_result(future, lookup, *args, **kwargs):
+    """The speculative lookup's result, or the lookup run inline if it is not done in time"""
+    try:
+        return future.result(timeout=HOSPITAL_WAIT_SECONDS)
+    except TimeoutError:
+        future.cancel()
+        log_event('hospital_lookup_inline', level='warning', wait=HOSPITAL_WAIT_SECONDS)
+        return lookup(*args, **kwargs)
+
+
+def run_triage(symptoms, language, user_lat, user_lng, ayushman_card, deadline=None):
+    """
+    Triage with the hospital lookup running speculatively alongside the model
+    call. Returns (triage_result, hospitals).
+    """
+    deadline = LLM_DEADLINE_SECONDS if deadline is None else deadline
+
+    # Start the hospital search now; it is cheap and usually needed
+    # in_context carries the request's trace onto the worker threads
+    hospital_future = hospital_executor.submit(in_context(find_nearest_hospitals), user_lat, user_lng, ayushman_card)
+    emergency_futures = []
+
+    def on_severity(severity):
+        # Streamed severity arrives before advice/reasoning: start the emergency ranking now
+        if severity == 'Emergency' and not emergency_futures:
+            emergency_futures.append(hospital_executor.submit(
+                in_context(rank_hospitals), user_lat, user_lng, ayushman_card, weights='emergency'
+            ))
+
+    triage_result = quick_triage(symptoms)
+    if triage_result is None:
+        llm_future = executor.submit(in_context(analyze_symptoms), symptoms, language, on_severity)
+        try:
+            triage_result = llm_future.result(timeout=deadline)
+        except TimeoutError:
+            # Drops the call if it never got a thread; a running one finishes on its own
+            llm_future.cancel()
+            log_event('gemini_fallback', level='warning', reason='deadline', deadline=deadline)
+            triage_result = dict(FALLBACK_RESPONSE, source='fallback')
+
+    hospitals = []
+    if triage_result['severity'] == 'Emergency':
+        # Weigh emergency capability, ICU beds and ambulances, not just distance
+        hospital_future.cancel()
+        if emergency_futures:
+            hospitals = hospital_result(emergency_futures[0], rank_hospitals, user_lat, user_lng,
+                                        ayushman_card, weights='emergency')
+        else:
+            hospitals = rank_hospitals(user_lat, user_lng, ayushman_card, weights='emergency')
+    elif triage_result['severity'] in HOSPITAL_SEVERITIES:
+        hospitals = hospital_result(hospital_future, find_nearest_hospitals, user_lat, user_lng, ayushman_card)
+    else:
+        hospital_future.cancel()
+
+    return triage_result, hospitals
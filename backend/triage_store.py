@@ -0,0 +1,230 @@
+import json
+import os
+import sqlite3
+import threading
+from itertools import islice
+
+from triage_analytics import BACKFILL_BATCH_SIZE, ROLLUP_SCHEMA, add_rollups, query_rollups
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS triage_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    phone TEXT,
+    timestamp TEXT NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_triage_session ON triage_history (session_id);
+CREATE INDEX IF NOT EXISTS idx_triage_phone ON triage_history (phone, timestamp);
+CREATE INDEX IF NOT EXISTS idx_triage_timestamp ON triage_history (timestamp);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class TriageHistoryStore:
+    """
+    Append-only triage history backed by SQLite in WAL mode.
+    Each save is a single indexed INSERT plus its analytics rollup upsert in
+    one transaction, safe across threads and worker processes.
+    """
+
+    def __init__(self, db_path, legacy_json_path=None):
+        self.db_path = db_path
+        self.local = threading.local()
+
+        conn = self.connection()
+        conn.executescript(SCHEMA + ROLLUP_SCHEMA)
+        self.init_rollup_backfill()
+        if legacy_json_path:
+            self.migrate_from_json(legacy_json_path)
+
+    def connection(self):
+        """One connection per thread; sqlite3 connections are not shareable"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or getattr(self.local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA busy_timeout=30000')
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def row_values(self, record):
+        user_data = record.get('user_data') or {}
+        return (
+            record['session_id'],
+            user_data.get('phone') or None,
+            record['timestamp'],
+            json.dumps(record, ensure_ascii=False)
+        )
+
+    def append(self, record):
+        """Append one triage record"""
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT INTO triage_history (session_id, phone, timestamp, record) VALUES (?, ?, ?, ?)',
+                self.row_values(record)
+            )
+            add_rollups(conn, (record,))
+
+    def append_many(self, records):
+        """Append many records in a single transaction"""
+        records = list(records)
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany(
+                'INSERT INTO triage_history (session_id, phone, timestamp, record) VALUES (?, ?, ?, ?)',
+                (self.row_values(record) for record in records)
+            )
+            add_rollups(conn, records)
+
+    def migrate_from_json(self, json_path):
+        """One-time import of the legacy triage_history.json file"""
+        if not os.path.exists(json_path):
+            return 0
+
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            done = conn.execute(
+                "SELECT value FROM store_meta WHERE key = 'legacy_json_migrated'"
+            ).fetchone()
+            if done:
+                conn.execute('COMMIT')
+                return 0
+
+            try:
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    history = json.load(f)
+                if not isinstance(history, list):
+                    raise ValueError('expected a list of records')
+            except ValueError as e:  # includes json.JSONDecodeError
+                # Left unmarked so the import is retried once the file is fixed
+                conn.execute('ROLLBACK')
+                print(f"❌ Triage history not migrated, {os.path.basename(json_path)} is unreadable: {e}")
+                return 0
+
+            history = [record for record in history if isinstance(record, dict)]
+            conn.executemany(
+                'INSERT INTO triage_history (session_id, phone, timestamp, record) VALUES (?, ?, ?, ?)',
+                (self.row_values(record) for record in history)
+            )
+            add_rollups(conn, history)
+            conn.execute(
+                "INSERT INTO store_meta (key, value) VALUES ('legacy_json_migrated', ?)",
+                (str(len(history)),)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        print(f"✅ Migrated {len(history)} triage records from {os.path.basename(json_path)}")
+        return len(history)
+
+    def query(self, sql, params=()):
+        rows = self.connection().execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_by_session_id(self, session_id):
+        """All records for a session id (legacy ids may repeat)"""
+        return self.query('SELECT record FROM triage_history WHERE session_id = ? ORDER BY id', (session_id,))
+
+    def get_by_phone(self, phone, limit=50):
+        """Most recent records for a phone number"""
+        return self.query(
+            'SELECT record FROM triage_history WHERE phone = ? ORDER BY timestamp DESC LIMIT ?',
+            (phone, limit)
+        )
+
+    def get_between(self, start=None, end=None, limit=None):
+        """Records with start <= timestamp < end (ISO strings), oldest first"""
+        sql = 'SELECT record FROM triage_history WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp'
+        params = [start or '', end or '\uffff']
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return self.query(sql, params)
+
+    def iter_records(self, batch_size=1000):
+        """Stream every record in insertion order without loading them all"""
+        for _, record in self.iter_rows(batch_size=batch_size):
+            yield record
+
+    def iter_rows(self, after_id=0, until_id=None, batch_size=1000):
+        """Stream (id, record) for after_id < id <= until_id in id order"""
+        last_id = after_id
+        until_id = until_id if until_id is not None else 2 ** 63 - 1
+        while True:
+            rows = self.connection().execute(
+                'SELECT id, record FROM triage_history WHERE id > ? AND id <= ? ORDER BY id LIMIT ?',
+                (last_id, until_id, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            for row_id, record in rows:
+                yield row_id, json.loads(record)
+            last_id = rows[-1][0]
+
+    def meta_int(self, key):
+        row = self.connection().execute('SELECT value FROM store_meta WHERE key = ?', (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def init_rollup_backfill(self):
+        """
+        The first time rollups are enabled, remember the last record written
+        without them: appends from now on count themselves, and
+        backfill_rollups() counts ids up to that mark.
+        """
+        conn = self.connection()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                "INSERT OR IGNORE INTO store_meta (key, value) "
+                "SELECT 'rollup_backfill_until', COALESCE(MAX(id), 0) FROM triage_history"
+            )
+            conn.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('rollup_backfilled_id', '0')")
+
+    def rollup_status(self):
+        done, until = self.meta_int('rollup_backfilled_id'), self.meta_int('rollup_backfill_until')
+        return {'backfilled_id': done, 'backfill_until': until, 'backfill_pending': done < until}
+
+    def backfill_rollups(self, batch_size=BACKFILL_BATCH_SIZE):
+        """
+        Count records written before the rollups existed, streaming them in
+        batches. Each batch commits with its checkpoint, so the job resumes
+        where it stopped and concurrent runs never count a record twice.
+        Returns the number of records counted by this call.
+        """
+        conn = self.connection()
+        counted = 0
+        while True:
+            done, until = self.meta_int('rollup_backfilled_id'), self.meta_int('rollup_backfill_until')
+            if done >= until:
+                return counted
+            rows = list(islice(self.iter_rows(done, until, batch_size), batch_size))
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                if self.meta_int('rollup_backfilled_id') != done:
+                    # Another process moved the checkpoint; start again from it
+                    continue
+                add_rollups(conn, [record for _, record in rows])
+                conn.execute(
+                    "UPDATE store_meta SET value = ? WHERE key = 'rollup_backfilled_id'",
+                    (str(rows[-1][0] if rows else until),)
+                )
+            counted += len(rows)
+
+    def query_rollups(self, **filters):
+        """Aggregated counts, see triage_analytics.query_rollups"""
+        return query_rollups(self.connection(), **filters)
+
+    def count(self):
+        return self.connection().execute('SELECT COUNT(*) FROM triage_history').fetchone()[0]
@@ -1,10 +1,36 @@
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.contrib.auth import authenticate, login, logout
+from django.contrib.auth.hashers import make_password
 from django.views.decorators.csrf import csrf_exempt
-from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Substr
+from django.utils.dateparse import parse_time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+import codecs
+import csv
 import json
-from .models import User, PatientProfile, TriageSession, MedicationReminder
+import os
+import time
+from .models import User, PatientProfile, TriageSession, MedicationReminder, dashboard_cache_key
+
+# Dashboards are cached per user until a triage or reminder write invalidates them
+DASHBOARD_CACHE_SECONDS = int(os.getenv('DASHBOARD_CACHE_SECONDS', '300'))
+SYMPTOM_PREVIEW_CHARS = 100
+FREQUENCY_LABELS = dict(MedicationReminder.FREQUENCY_CHOICES)
+
+# Bulk onboarding: rows per transaction, and threads for password hashing
+# (PBKDF2 runs in OpenSSL without the GIL, so threads use every core)
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', '500'))
+BULK_HASH_WORKERS = int(os.getenv('BULK_HASH_WORKERS', str(os.cpu_count() or 4)))
+
+staff_required = user_passes_test(lambda user: user.is_active and user.is_staff)
 
 @csrf_exempt
 def register_user(request):
@@ -35,35 +61,55 @@ def login_user(request):
 
 @login_required
 def get_user_dashboard(request):
-    triage_sessions = TriageSession.objects.filter(patient=request.user).order_by('-created_at')[:10]
-    reminders = MedicationReminder.objects.filter(patient=request.user, is_active=True)
+    key = dashboard_cache_key(request.user.id)
+    data = cache.get(key)
+    if data is None:
+        data = build_dashboard(request.user)
+        cache.set(key, data, DASHBOARD_CACHE_SECONDS)
+    return JsonResponse(data)
+
+def build_dashboard(user):
+    """
+    Two index-backed queries fetching only the columns shown; symptoms are
+    cut to a preview in the database instead of loading the full text.
+    """
+    triage_sessions = (
+        TriageSession.objects.filter(patient_id=user.id)
+        .order_by('-created_at')
+        .annotate(symptoms_preview=Substr('symptoms', 1, SYMPTOM_PREVIEW_CHARS + 1))
+        .values('symptoms_preview', 'severity', 'created_at', 'session_id')[:10]
+    )
+    reminders = MedicationReminder.objects.filter(patient_id=user.id, is_active=True).values(
+        'medicine_name', 'dosage', 'reminder_time', 'frequency'
+    )
     
-    data = {
+    return {
         'user': {
-            'name': request.user.first_name,
-            'email': request.user.email,
-            'phone': request.user.phone_number
+            'name': user.first_name,
+            'email': user.email,
+            'phone': user.phone_number
         },
         'triage_history': [
             {
-                'symptoms': session.symptoms[:100] + '...' if len(session.symptoms) > 100 else session.symptoms,
-                'severity': session.severity,
-                'date': session.created_at.strftime('%Y-%m-%d %H:%M'),
-                'session_id': session.session_id
+                'symptoms': (session['symptoms_preview'][:SYMPTOM_PREVIEW_CHARS] + '...'
+                             if len(session['symptoms_preview']) > SYMPTOM_PREVIEW_CHARS
+                             else session['symptoms_preview']),
+                'severity': session['severity'],
+                'date': session['created_at'].strftime('%Y-%m-%d %H:%M'),
+                'session_id': session['session_id']
             }
             for session in triage_sessions
         ],
         'active_reminders': [
             {
-                'medicine_name': reminder.medicine_name,
-                'dosage': reminder.dosage,
-                'time': reminder.reminder_time.strftime('%H:%M'),
-                'frequency': reminder.get_frequency_display()
+                'medicine_name': reminder['medicine_name'],
+                'dosage': reminder['dosage'],
+                'time': reminder['reminder_time'].strftime('%H:%M'),
+                'frequency': FREQUENCY_LABELS.get(reminder['frequency'], reminder['frequency'])
             }
             for reminder in reminders
         ]
     }
-    return JsonResponse(data)
 
 @csrf_exempt
 @login_required
@@ -77,4 +123,202 @@ def set_medication_reminder(request):
             frequency=data['frequency'],
             reminder_time=data['reminder_time']
         )
-        return JsonResponse({'success': True, 'reminder_id': reminder.id})
\ No newline at end of file
+        return JsonResponse({'success': True, 'reminder_id': reminder.id})
+
+# Bulk onboarding for ASHA-worker village rosters. Uploads are CSV (with a
+# header row) or JSON Lines, sent as a multipart "file" or as the raw body;
+# rows are validated and inserted chunk by chunk, and a bad row is reported
+# with its line number instead of failing the whole upload.
+
+def iter_upload_rows(request):
+    """Yield (line_number, row) without reading the whole upload into memory; row is None if unparseable"""
+    upload = request.FILES.get('file')
+    name = upload.name.lower() if upload else ''
+    content_type = (upload.content_type if upload else request.content_type) or ''
+    upload_format = request.GET.get('format') or ('csv' if name.endswith('.csv') or 'csv' in content_type else 'jsonl')
+    lines = codecs.iterdecode(upload if upload else request, 'utf-8-sig')
+
+    if upload_format == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, {key.strip(): (value or '').strip() for key, value in row.items() if key}
+        return
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_number, row if isinstance(row, dict) else None
+
+def chunked(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def save_chunk(entries, bulk_save, save_one, errors):
+    """
+    Insert a validated chunk in one transaction. If it hits a constraint
+    (say a concurrent sign-up took a phone number), redo it one savepoint
+    per row so only the offending rows fail. Returns the number saved.
+    """
+    try:
+        with transaction.atomic():
+            bulk_save([obj for _, obj in entries])
+        return len(entries)
+    except IntegrityError:
+        saved = 0
+        for line_number, obj in entries:
+            try:
+                with transaction.atomic():
+                    save_one(obj)
+                saved += 1
+            except IntegrityError as e:
+                errors.append({'row': line_number, 'error': str(e)})
+        return saved
+
+def bulk_response(rows, saved, errors, started):
+    elapsed = time.perf_counter() - started
+    return JsonResponse({
+        'success': True,
+        'rows': rows,
+        'created': saved,
+        'failed': len(errors),
+        'errors': errors,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 1) if elapsed > 0 else None
+    })
+
+def validate_user_row(row):
+    email = User.objects.normalize_email(str(row.get('email') or '').strip())
+    password = str(row.get('password') or '')
+    phone = str(row.get('phone') or '').strip()
+    validate_email(email)
+    if not password:
+        raise ValidationError('password is required')
+    if not phone:
+        raise ValidationError('phone is required')
+    if len(phone) > User._meta.get_field('phone_number').max_length:
+        raise ValidationError('phone is too long')
+    return User(
+        username=User.normalize_username(email),
+        email=email,
+        password=password,
+        first_name=str(row.get('name') or '').strip(),
+        phone_number=phone
+    )
+
+def create_users(users):
+    created = User.objects.bulk_create(users)
+    if created and created[0].pk is None:
+        # Backends without RETURNING (MySQL) do not set primary keys
+        ids = dict(User.objects.filter(username__in=[user.username for user in created]).values_list('username', 'id'))
+        for user in created:
+            user.pk = ids[user.username]
+    PatientProfile.objects.bulk_create([PatientProfile(user=user) for user in created])
+
+def create_user(user):
+    user.save()
+    PatientProfile.objects.create(user=user)
+
+@csrf_exempt
+@require_POST
+@staff_required
+def bulk_register_users(request):
+    """Register a roster of patients (email, password, phone, name) and their profiles"""
+    started = time.perf_counter()
+    rows, saved, errors = 0, 0, []
+    with ThreadPoolExecutor(max_workers=BULK_HASH_WORKERS) as hashers:
+        for chunk in chunked(iter_upload_rows(request), BULK_CHUNK_SIZE):
+            rows += len(chunk)
+            entries, emails, phones = [], set(), set()
+            for line_number, row in chunk:
+                try:
+                    if row is None:
+                        raise ValidationError('could not parse row')
+                    user = validate_user_row(row)
+                    if user.username in emails or user.phone_number in phones:
+                        raise ValidationError('duplicate email or phone in upload')
+                except ValidationError as e:
+                    errors.append({'row': line_number, 'error': '; '.join(e.messages)})
+                    continue
+                emails.add(user.username)
+                phones.add(user.phone_number)
+                entries.append((line_number, user))
+
+            # One query each for rows that already exist, rather than failing the insert
+            taken_emails = set(User.objects.filter(username__in=emails).values_list('username', flat=True))
+            taken_phones = set(User.objects.filter(phone_number__in=phones).values_list('phone_number', flat=True))
+            fresh = []
+            for line_number, user in entries:
+                if user.username in taken_emails:
+                    errors.append({'row': line_number, 'error': 'email already registered'})
+                elif user.phone_number in taken_phones:
+                    errors.append({'row': line_number, 'error': 'phone already registered'})
+                else:
+                    fresh.append((line_number, user))
+
+            for (_, user), hashed in zip(fresh, hashers.map(make_password, [user.password for _, user in fresh])):
+                user.password = hashed
+            saved += save_chunk(fresh, create_users, create_user, errors)
+
+    errors.sort(key=lambda error: error['row'])
+    return bulk_response(rows, saved, errors, started)
+
+def validate_reminder_row(row):
+    medicine_name = str(row.get('medicine_name') or '').strip()
+    dosage = str(row.get('dosage') or '').strip()
+    frequency = str(row.get('frequency') or '').strip()
+    try:
+        reminder_time = parse_time(str(row.get('reminder_time') or '').strip())
+    except ValueError:
+        reminder_time = None
+    if not medicine_name or len(medicine_name) > MedicationReminder._meta.get_field('medicine_name').max_length:
+        raise ValidationError('medicine_name is missing or too long')
+    if not dosage or len(dosage) > MedicationReminder._meta.get_field('dosage').max_length:
+        raise ValidationError('dosage is missing or too long')
+    if frequency not in FREQUENCY_LABELS:
+        raise ValidationError(f"frequency must be one of {', '.join(FREQUENCY_LABELS)}")
+    if reminder_time is None:
+        raise ValidationError('reminder_time must be HH:MM')
+    return MedicationReminder(medicine_name=medicine_name, dosage=dosage, frequency=frequency, reminder_time=reminder_time)
+
+@csrf_exempt
+@require_POST
+@staff_required
+def bulk_set_medication_reminders(request):
+    """Create reminders (phone, medicine_name, dosage, frequency, reminder_time) for registered patients"""
+    started = time.perf_counter()
+    rows, saved, errors = 0, 0, []
+    for chunk in chunked(iter_upload_rows(request), BULK_CHUNK_SIZE):
+        rows += len(chunk)
+        parsed = []
+        for line_number, row in chunk:
+            try:
+                if row is None:
+                    raise ValidationError('could not parse row')
+                parsed.append((line_number, str(row.get('phone') or '').strip(), validate_reminder_row(row)))
+            except ValidationError as e:
+                errors.append({'row': line_number, 'error': '; '.join(e.messages)})
+
+        patient_ids = dict(User.objects.filter(phone_number__in={phone for _, phone, _ in parsed})
+                           .values_list('phone_number', 'id'))
+        entries = []
+        for line_number, phone, reminder in parsed:
+            if phone not in patient_ids:
+                errors.append({'row': line_number, 'error': 'no patient with this phone'})
+                continue
+            reminder.patient_id = patient_ids[phone]
+            entries.append((line_number, reminder))
+
+        saved += save_chunk(entries, MedicationReminder.objects.bulk_create, lambda reminder: reminder.save(), errors)
+        # bulk_create sends no post_save, so invalidate_dashboard does not run
+        cache.delete_many([dashboard_cache_key(reminder.patient_id) for _, reminder in entries])
+
+    errors.sort(key=lambda error: error['row'])
+    return bulk_response(rows, saved, errors, started)